@@ -0,0 +1,87 @@
+"""
+Measure how many lines per second each output controller handles,
+when script's output is delivered to it in batches of events.
+
+Terminal output is sent to /dev/null and logs are written to
+a temporary directory. With one line per event encoding cost of
+`jsonl` controller is measured at its worst, executors usually
+pass many lines in one event.
+
+Usage:
+        python -m benchmarks.controller_throughput [LINES] [LINES_PER_EVENT]
+"""
+
+from types import SimpleNamespace
+from pathlib import Path
+import tempfile
+import time
+import sys
+import os
+
+from src.output_input_controllers.events import Event, STDERR, STDOUT
+from src.output_input_controllers.base import OutputInputController
+from src.output_input_controllers.controllers import (
+    TerminalOutputInputColor,
+    TerminalFileOutputInput,
+    TerminalOutputInput,
+    JsonlOutputInput,
+)
+from src.output_input_controllers import utils
+
+LINE = "Unpacking xserver-xorg-core (2:1.20.11-1+deb11u1) ...\n"
+
+# Events delivered at once, like in one loop iteration of executor
+BATCH_SIZE = 16
+
+
+def measure(
+    controller: OutputInputController, lines: int, lines_per_event: int
+) -> float:
+    """Pass lines to controller in batches and return lines per second"""
+    # Controllers need only script name of executor
+    script_executor = SimpleNamespace(
+        script=f"benchmark_{controller.command_line_argument}.sh"
+    )
+    value = LINE * lines_per_event
+    batch = [
+        Event(
+            STDERR if i % 8 == 7 else STDOUT, script_executor, value, time.monotonic()
+        )
+        for i in range(BATCH_SIZE)
+    ]
+
+    start = time.perf_counter()
+    for _ in range(lines // (lines_per_event * BATCH_SIZE)):
+        controller.handle_events(batch)
+    utils.flush_terminal()
+    utils.close_logs()
+
+    return lines / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    lines_per_event = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    org_stdout = sys.stdout
+
+    with tempfile.TemporaryDirectory() as logs_dir, open(os.devnull, "w") as devnull:
+        utils.LOGS_DIR_PATH = Path(logs_dir)
+        sys.stdout = devnull
+        try:
+            results = {
+                controller.command_line_argument: measure(
+                    controller(), lines, lines_per_event
+                )
+                for controller in (
+                    TerminalOutputInput,
+                    TerminalOutputInputColor,
+                    TerminalFileOutputInput,
+                    JsonlOutputInput,
+                )
+            }
+        finally:
+            sys.stdout = org_stdout
+
+    for controller, lines_per_second in results.items():
+        print(f"{controller:<15}{lines_per_second:>15,.0f} lines/s")
@@ -0,0 +1,78 @@
+"""
+Measure how many lines per second pass through
+file descriptors of `terminalfile` output controller.
+
+Terminal output is sent to /dev/null and logs are written
+to a temporary directory, so mostly logging cost is measured.
+Logs are compressed by COMPRESSION codec, like `-z` option of
+`start.py`, and theirs size on disk is reported.
+
+Usage:
+        python -m benchmarks.log_throughput [LINES] [COMPRESSION]
+"""
+
+from types import SimpleNamespace
+from pathlib import Path
+import tempfile
+import random
+import time
+import sys
+import os
+
+from src.output_input_controllers.controllers import TerminalFileOutputInput
+from src.output_input_controllers.log_codecs import LogCodec
+from src.output_input_controllers import utils
+
+# Lines of apt output, with different packages and versions
+_random = random.Random(0)
+LINES = [
+    f"{_random.choice(('Unpacking', 'Setting up', 'Selecting previously unselected package'))} "
+    f"{_random.choice(('xserver-xorg', 'libgtk-3', 'xfce4', 'lightdm', 'python3'))}"
+    f"-{_random.choice(('core', 'common', 'data', 'bin'))}"
+    f" ({_random.randint(1, 9)}:{_random.randint(0, 20)}.{_random.randint(0, 99)}-{_random.randint(1, 9)}) ...\n"
+    for _ in range(1000)
+]
+
+
+def measure(stream: str, lines: int) -> float:
+    """Pass lines to controller's stream and return lines per second"""
+    controller = TerminalFileOutputInput()
+    # Descriptors need only script name of executor
+    script_executor = SimpleNamespace(script=f"benchmark_{stream}.sh")
+
+    start = time.perf_counter()
+    for i in range(lines):
+        setattr(controller, stream, (script_executor, LINES[i % len(LINES)]))
+    utils.flush_terminal()
+    utils.close_log(str(script_executor.script))
+
+    return lines / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    compression = sys.argv[2] if len(sys.argv) > 2 else LogCodec.command_line_argument
+
+    utils.LOG_SINK.codec = next(
+        codec
+        for codec in (LogCodec, *LogCodec.__subclasses__())
+        if codec.command_line_argument == compression
+    )
+
+    org_stdout = sys.stdout
+
+    with tempfile.TemporaryDirectory() as logs_dir, open(os.devnull, "w") as devnull:
+        utils.LOGS_DIR_PATH = Path(logs_dir)
+        sys.stdout = devnull
+        try:
+            results = {
+                stream: measure(stream, lines) for stream in ("stdout", "stderr")
+            }
+        finally:
+            sys.stdout = org_stdout
+
+        logs_size = sum(path.stat().st_size for path in Path(logs_dir).iterdir())
+
+    for stream, lines_per_second in results.items():
+        print(f"{stream:<10}{lines_per_second:>15,.0f} lines/s")
+    print(f"{'logs':<10}{logs_size:>15,} bytes")
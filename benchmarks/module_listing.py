@@ -0,0 +1,51 @@
+"""
+Measure how long listing of a big scripts directory takes,
+with all scripts' shebangs and annotations read, without
+manifest cache, with cold cache and with warm cache.
+
+Usage:
+        python -m benchmarks.module_listing [SCRIPTS]
+"""
+from pathlib import Path
+import tempfile
+import time
+import sys
+import os
+
+from src.module import Module
+
+SCRIPT = "#!/bin/bash\n# needs: script_0.sh\n\necho {number}\n"
+
+
+def measure(scripts_folder: Path, use_manifest: bool) -> float:
+    """List module as scheduler does and return seconds"""
+    start = time.perf_counter()
+    for script in Module(scripts_folder, use_manifest):
+        script.find_shebang_path()
+        script.find_dependencies()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    scripts = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        scripts_folder = Path(temp_dir, "scripts")
+        scripts_folder.mkdir()
+
+        for number in range(scripts):
+            scripts_folder.joinpath(f"script_{number}.sh").write_text(
+                SCRIPT.format(number=number)
+            )
+            # Recently modified scripts are not trusted by manifest
+            os.utime(scripts_folder.joinpath(f"script_{number}.sh"), (0, 0))
+        os.utime(scripts_folder, (0, 0))
+
+        results = {
+            "no cache": measure(scripts_folder, use_manifest=False),
+            "cold cache": measure(scripts_folder, use_manifest=True),
+            "warm cache": measure(scripts_folder, use_manifest=True),
+        }
+
+    for name, seconds in results.items():
+        print(f"{name:<15}{seconds * 1000:>10.1f} ms")
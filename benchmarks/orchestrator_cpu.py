@@ -0,0 +1,91 @@
+"""
+Measure CPU time consumed by the orchestrator itself while scripts run.
+
+Every script of the module is executed in one shell, like by `start.py`.
+For each script wall time and orchestrator's CPU time (user + system of
+this process only, scripts run in other processes) are reported.
+
+Usage:
+        python -m benchmarks.orchestrator_cpu [SCRIPTS_DIRECTORY]
+
+Without SCRIPTS_DIRECTORY a module with an idle, a chatty and a short
+script is generated. To compare with older executor, run the same
+command on its checkout.
+"""
+from contextlib import contextmanager
+from pathlib import Path
+import tempfile
+import time
+import sys
+import os
+
+from src.output_input_controllers.controllers import TerminalOutputInput
+from src.output_input_controllers.utils import flush_terminal
+from src.temporary_errors_buffer import TempErrorFile
+from src.script_executor import ScriptExecutor
+from src.shell import BashShell
+from src.module import Module
+
+SAMPLE_SCRIPTS = {
+    "idle_0.sh": "sleep 3\n",
+    "chatty_1.sh": "for i in $(seq 20000); do echo line $i; done\n",
+    "short_2.sh": "echo done\n",
+}
+
+
+def create_sample_module(directory: Path) -> Path:
+    for name, body in SAMPLE_SCRIPTS.items():
+        directory.joinpath(name).write_text("#!/bin/bash\n" + body)
+    return directory
+
+
+@contextmanager
+def quiet_terminal():
+    """Send scripts output to /dev/null and give them stdin,
+    which stays open but never receives any input"""
+    org_stdout, org_stdin = sys.stdout, sys.stdin
+    read_fd, write_fd = os.pipe()
+
+    with open(os.devnull, "w") as devnull, open(read_fd) as stdin:
+        sys.stdout, sys.stdin = devnull, stdin
+        try:
+            yield org_stdout
+        finally:
+            flush_terminal()
+            sys.stdout, sys.stdin = org_stdout, org_stdin
+            os.close(write_fd)
+
+
+def measure(scripts_directory: Path) -> list:
+    results = []
+    errors_buffer = TempErrorFile(Path(tempfile.gettempdir()))
+    oi_controller = TerminalOutputInput()
+
+    with quiet_terminal(), BashShell()(0.1) as shell:
+        for script in Module(scripts_directory):
+            executor = ScriptExecutor(script, shell, oi_controller, errors_buffer)
+
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            executor.execute_script()
+            wall, cpu = (
+                time.perf_counter() - wall_start,
+                time.process_time() - cpu_start,
+            )
+
+            results.append((str(script), wall, cpu))
+
+    return results
+
+
+def report(results: list):
+    print(f"{'script':<30}{'wall [s]':>12}{'cpu [s]':>12}{'cpu/wall':>12}")
+    for name, wall, cpu in results:
+        print(f"{name:<30}{wall:>12.3f}{cpu:>12.3f}{cpu / wall:>12.1%}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        report(measure(Path(sys.argv[1])))
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            report(measure(create_sample_module(Path(directory))))
@@ -0,0 +1,73 @@
+"""
+Compare executing scripts through shell and terminal with
+executing them through pipes, like scripts marked by
+`# interactive: no` annotation are executed.
+
+Output throughput is measured with a chatty script and
+per script overhead with a script doing nothing.
+
+Usage:
+        python -m benchmarks.pipe_executor [LINES]
+"""
+from pathlib import Path
+import tempfile
+import time
+import sys
+
+from src.output_input_controllers.controllers import TerminalOutputInput
+from src.script_executor import PipeScriptExecutor, ScriptExecutor
+from src.temporary_errors_buffer import TempErrorFile
+from benchmarks.orchestrator_cpu import quiet_terminal
+from src.shell import BashShell
+from src.script import Script
+
+ROUNDS = 20
+
+
+def execute_in_shell(scripts: list) -> float:
+    """Execute scripts in one shell and return seconds"""
+    errors_buffer = TempErrorFile(Path(tempfile.gettempdir()))
+
+    with BashShell()(0.1) as shell:
+        start = time.perf_counter()
+        for script in scripts:
+            ScriptExecutor(
+                script, shell, TerminalOutputInput(), errors_buffer
+            ).execute_script()
+        return time.perf_counter() - start
+
+
+def execute_through_pipes(scripts: list) -> float:
+    """Execute scripts without shell and return seconds"""
+    start = time.perf_counter()
+    for script in scripts:
+        PipeScriptExecutor(script, TerminalOutputInput()).execute_script()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        scripts_folder = Path(directory)
+        scripts_folder.joinpath("chatty_0.sh").write_text(
+            f"#!/bin/bash\nseq -f 'line %g' {lines}\n"
+        )
+        scripts_folder.joinpath("short_1.sh").write_text("#!/bin/bash\n")
+        chatty = Script("chatty_0.sh", scripts_folder)
+        short = Script("short_1.sh", scripts_folder)
+
+        results = {}
+        with quiet_terminal():
+            for name, execute in (
+                ("shell", execute_in_shell),
+                ("pipes", execute_through_pipes),
+            ):
+                results[name] = (
+                    lines / execute([chatty]),
+                    execute([short] * ROUNDS) / ROUNDS,
+                )
+
+    print(f"{'executor':<10}{'lines/s':>15}{'overhead [ms]':>16}")
+    for name, (lines_per_second, overhead) in results.items():
+        print(f"{name:<10}{lines_per_second:>15,.0f}{overhead * 1000:>16.1f}")
@@ -0,0 +1,47 @@
+"""
+Compare cost of spawning and terminating a new shell for
+every script with cost of checking warm shell out of shell
+pool and giving it back.
+
+Usage:
+        python -m benchmarks.shell_pool [ROUNDS]
+"""
+import time
+import sys
+
+from src.control_channel import ControlChannel
+from src.shell_pool import ShellPool
+from src.shell import BashShell
+
+
+def measure_spawn(rounds: int) -> float:
+    """Spawn shell, like for script executed in its own shell, wait
+    until it answers and terminate it, return seconds per round"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        with BashShell()(0.1) as shell:
+            shell.send_command(shell.create_control_ready_command())
+            shell.control_channel.wait_for(ControlChannel.READY)
+    return (time.perf_counter() - start) / rounds
+
+
+def measure_checkout(rounds: int) -> float:
+    """Check shell out and in, return seconds per round"""
+    with ShellPool(BashShell, 1) as pool:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            with pool.shell():
+                pass
+        return (time.perf_counter() - start) / rounds
+
+
+if __name__ == "__main__":
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    results = {
+        "spawn": measure_spawn(rounds),
+        "checkout": measure_checkout(rounds),
+    }
+
+    for name, seconds in results.items():
+        print(f"{name:<10}{seconds * 1000:>10.2f} ms")
@@ -0,0 +1,50 @@
+"""
+Measure how many lines per second pass from a script executed
+in shell, through terminal, to output input controller.
+
+Script emits LINES lines at once, terminal output is sent
+to /dev/null, so mostly reading cost is measured.
+
+Usage:
+        python -m benchmarks.shell_throughput [LINES]
+"""
+from pathlib import Path
+import tempfile
+import time
+import sys
+
+from src.output_input_controllers.controllers import TerminalOutputInput
+from src.temporary_errors_buffer import TempErrorFile
+from src.script_executor import ScriptExecutor
+from benchmarks.orchestrator_cpu import quiet_terminal
+from src.shell import BashShell
+from src.script import Script
+
+
+def measure(script: Script, lines: int) -> tuple:
+    """Execute script and return lines per second and CPU time"""
+    errors_buffer = TempErrorFile(Path(tempfile.gettempdir()))
+
+    with quiet_terminal(), BashShell()(0.1) as shell:
+        executor = ScriptExecutor(script, shell, TerminalOutputInput(), errors_buffer)
+
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        executor.execute_script()
+        wall, cpu = (
+            time.perf_counter() - wall_start,
+            time.process_time() - cpu_start,
+        )
+
+    return lines / wall, cpu
+
+
+if __name__ == "__main__":
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        Path(directory, "emit_0.sh").write_text(
+            f"#!/bin/bash\nseq -f 'line %g' {lines}\n"
+        )
+        lines_per_second, cpu = measure(Script("emit_0.sh", Path(directory)), lines)
+
+    print(f"{lines:,} lines: {lines_per_second:,.0f} lines/s, {cpu:.2f} s CPU")
@@ -1,10 +1,25 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Sequence, Type
 from pathlib import Path
+import sys
 
+from src.temporary_errors_buffer import ErrorsBuffer, TempErrorFile
 from src.output_input_controllers.base import OutputInputController
-from src.temporary_errors_buffer import TempErrorFile
-from src.script_executor import ScriptExecutor
+from src.output_input_controllers.utils import LOG_SINK, remove_old_logs
+from src.output_input_controllers.log_codecs import LogCodec
+from src.output_input_controllers.responder import Responder
+from src.log_store import LogReader, LogStore
+from src.output_buffer import OutputBuffer
+from src.cli_utils import notify_mistake
+from src.scheduler import DependencyGraph, Scheduler
+from src.ledger import RunLedger
+from src.script_executor import PipeScriptExecutor, ScriptExecutor
+from src.shell_pool import ShellPool
+from src.profiler import Profiler
+from src.tracer import TRACER
 from src.module import Module
 from src.shell import SubShell
+from src.script import Script
 
 
 def main(
@@ -12,13 +27,248 @@ def main(
     script_folder_path: Path,
     oi_controller: OutputInputController,
     errors_buffer_path: Path,
+    parallel: bool = False,
+    jobs: Optional[int] = None,
+    errors_buffer_class: Type[ErrorsBuffer] = TempErrorFile,
+    incremental_summary: bool = False,
+    ledger_path: Optional[Path] = None,
+    resume: bool = False,
+    memory_limit: int = OutputBuffer.MEMORY_LIMIT,
+    log_codec: Type[LogCodec] = LogCodec,
+    rotate_size: Optional[int] = None,
+    rotate_age: Optional[float] = None,
+    keep_size: Optional[int] = None,
+    keep_age: Optional[float] = None,
+    trace_path: Optional[Path] = None,
+    profile_path: Optional[Path] = None,
+    timeout: Optional[float] = None,
+    responder: Optional[Responder] = None,
 ):
 
-    errors_buffer = TempErrorFile(errors_buffer_path)
+    if trace_path is not None:
+        TRACER.enable()
 
-    with shell(0.1) as sh:
-        for script in Module(script_folder_path):
+    # Shells are spawned by profiled app, so their CPU time
+    #   is counted as scripts time once they are terminated
+    profiler = Profiler(profile_path) if profile_path is not None else None
+    if profiler is not None:
+        profiler.start()
 
-            sc_ex = ScriptExecutor(script, sh, oi_controller, errors_buffer)
+    # Statuses are shown by controller's class methods
+    type(oi_controller).incremental_summary = incremental_summary
 
-            sc_ex.execute_script()
+    # Prompts are answered by rules instead of user
+    if responder is not None:
+        type(oi_controller).responder = responder  # type:ignore
+
+    # Output waiting for being written to logs is bounded as well
+    LOG_SINK.memory_limit = memory_limit
+
+    LOG_SINK.codec = log_codec
+    LOG_SINK.rotate_size = rotate_size
+    LOG_SINK.rotate_age = rotate_age
+
+    # Logs of previous runs are removed before new ones are written
+    if keep_size is not None or keep_age is not None:
+        remove_old_logs(keep_age, keep_size)
+
+    ledger = RunLedger(ledger_path, resume, script_folder_path) if ledger_path else None
+
+    # Scripts executed next to each other reuse warm shells
+    shell_pool = ShellPool(type(shell), jobs or 1) if jobs or parallel else None
+
+    runner = Runner(
+        shell,
+        oi_controller,
+        errors_buffer_path,
+        errors_buffer_class,
+        ledger,
+        shell_pool,
+        memory_limit,
+        timeout,
+    )
+
+    module = Module(script_folder_path)
+
+    try:
+        with TRACER.span("run"):
+            if jobs:
+                runner.execute_graph(module, jobs)
+            elif parallel:
+                runner.execute_stages(module)
+            else:
+                runner.execute_sequentially(module)
+    finally:
+        with TRACER.span("show_summary"):
+            oi_controller.show_summary()
+        if ledger is not None:
+            ledger.close()
+        if shell_pool is not None:
+            shell_pool.close()
+        if trace_path is not None:
+            TRACER.save(trace_path)
+        if profiler is not None:
+            profiler.stop()
+            profiler.save()
+
+
+def show_logs(
+    logs_directory: Path,
+    run: str,
+    script_name: Optional[str] = None,
+    streams: Sequence[str] = LogStore.STREAMS,
+    tail: Optional[int] = None,
+):
+    """Write output of script, stored by `terminalstore` controller,
+    to stdout. Without script name, scripts of the run are listed
+    with sizes of theirs streams."""
+    with LogReader(logs_directory.joinpath(run)) as reader:
+        if script_name is None:
+            for name in reader.script_ids:
+                sizes = reader.find_sizes(name)
+                print(
+                    f"{name}    stdout: {sizes['stdout']} B    stderr: {sizes['stderr']} B"
+                )
+            return
+
+        if script_name not in reader.script_ids:
+            notify_mistake(
+                "Logs of script ",
+                f'"{script_name}"',
+                f" were not found in {run} run!!!",
+            )
+            exit(127)
+
+        output = (
+            reader.read(script_name, streams)
+            if tail is None
+            else reader.tail(script_name, tail, streams)
+        )
+
+    sys.stdout.buffer.write(output)
+    sys.stdout.flush()
+
+
+class Runner:
+    """Decide which scripts are executed
+    at the same time and in which shells"""
+
+    def __init__(
+        self,
+        shell: SubShell,
+        oi_controller: OutputInputController,
+        errors_buffer_path: Path,
+        errors_buffer_class: Type[ErrorsBuffer] = TempErrorFile,
+        ledger: Optional[RunLedger] = None,
+        shell_pool: Optional[ShellPool] = None,
+        memory_limit: int = OutputBuffer.MEMORY_LIMIT,
+        timeout: Optional[float] = None,
+    ):
+        """Timeout is used for scripts without timeout annotation"""
+        self.shell = shell
+        self.oi_controller = oi_controller
+        self.errors_buffer_path = errors_buffer_path
+        self.errors_buffer_class = errors_buffer_class
+        self.ledger = ledger
+        self.shell_pool = shell_pool
+        self.memory_limit = memory_limit
+        self.timeout = timeout
+
+    def create_errors_buffer(self, script: Optional[Script] = None) -> ErrorsBuffer:
+        """Create errors buffer, buffer of script executed next
+        to other scripts has to have its own name"""
+        file_name = f"{script}_{self.errors_buffer_class.FILE_NAME}" if script else None
+        return self.errors_buffer_class(
+            self.errors_buffer_path, file_name, self.memory_limit
+        )
+
+    def is_done(self, script: Script) -> bool:
+        """Check did script already succeed in resumed run"""
+        if self.ledger is not None and self.ledger.is_succeeded(script):
+            self.oi_controller.show_skip(str(script))
+            return True
+        return False
+
+    def execute_sequentially(self, module: Module):
+        """Execute scripts one after another within one shell"""
+
+        errors_buffer = self.create_errors_buffer()
+
+        with self.shell(0.1) as sh:
+            for script in module:
+
+                if self.is_done(script):
+                    continue
+
+                if not script.is_interactive():
+                    self.execute_without_shell(script)
+                    continue
+
+                sc_ex = ScriptExecutor(
+                    script,
+                    sh,
+                    self.oi_controller,
+                    errors_buffer,
+                    self.ledger,
+                    self.timeout,
+                )
+
+                sc_ex.execute_script()
+
+    def execute_stages(self, module: Module):
+        """Execute scripts sharing the same number at the same time.
+        Next stage is started when all scripts from previous one are done."""
+
+        for stage in module.stages():
+
+            with ThreadPoolExecutor(max_workers=len(stage)) as pool:
+                futures = [
+                    pool.submit(self.execute_in_own_shell, script) for script in stage
+                ]
+
+            # Re-raise errors (and exit requests) from stage's scripts
+            for future in futures:
+                future.result()
+
+    def execute_graph(self, module: Module, jobs: int):
+        """Execute every script as soon as scripts it needs are done,
+        using at most `jobs` shells at the same time."""
+
+        with TRACER.span("resolve_dependencies"):
+            graph = DependencyGraph(module)
+
+        Scheduler(graph, jobs).run(self.execute_in_own_shell)
+
+    def execute_in_own_shell(self, script: Script):
+        """Execute script in its own shell of the same type as `shell`,
+        with its own errors buffer, so it can run next to other scripts.
+        Shell is taken from shell pool if there is one."""
+
+        if self.is_done(script):
+            return
+
+        if not script.is_interactive():
+            self.execute_without_shell(script)
+            return
+
+        errors_buffer = self.create_errors_buffer(script)
+
+        with (
+            self.shell_pool.shell() if self.shell_pool else type(self.shell)()(0.1)
+        ) as sh:
+            ScriptExecutor(
+                script,
+                sh,
+                self.oi_controller,
+                errors_buffer,
+                self.ledger,
+                self.timeout,
+            ).execute_script()
+
+    def execute_without_shell(self, script: Script):
+        """Execute script, which does not read user input,
+        through pipes instead of shell and terminal"""
+
+        PipeScriptExecutor(
+            script, self.oi_controller, self.ledger, self.timeout
+        ).execute_script()
@@ -1,11 +1,18 @@
 """ Utilities for parsing cli arguments"""
-from typing import Optional
+
+from typing import Optional, Tuple, Type
 from pathlib import Path
+import re
 
 from colorama import Fore, Style
 
+from src.output_input_controllers.controllers import AutoResponderOutputInput
+from src.output_input_controllers.log_codecs import LogCodec
+from src.output_input_controllers.responder import Responder
 from src.output_input_controllers.base import OutputInputController
+from src.temporary_errors_buffer import ErrorsBuffer
 from src.exceptions import FileNotExecutable, FileNotFound
+from src.log_store import LogStore
 from src.shell import SubShell
 
 
@@ -111,3 +118,180 @@ def parse_cli_errors_directory(args: dict) -> Optional[Path]:
             exit(127)
         return path
     return None
+
+
+def parse_cli_jobs(args: dict) -> Optional[int]:
+    if args["-j"]:
+        try:
+            jobs = int(args["-j"])
+        except ValueError:
+            jobs = 0
+
+        if jobs < 1:
+            notify_mistake("Jobs number ", f'"{args["-j"]}"', " is not positive!!!")
+            exit(127)
+        return jobs
+    return None
+
+
+def parse_cli_errors_buffer(args: dict) -> Optional[Type[ErrorsBuffer]]:
+    if args["-b"]:
+        for subclass in ErrorsBuffer.__subclasses__():
+            if args["-b"] == subclass.command_line_argument:
+                return subclass
+
+        notify_mistake("Errors buffer ", f'"{args["-b"]}"', " was not found!!!")
+        exit(127)
+
+    return None
+
+
+def parse_cli_size(args: dict, option: str, name: str) -> Optional[int]:
+    """Parse size in bytes, with optional K, M or G suffix"""
+    if args[option]:
+        units = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+
+        size = re.fullmatch(r"(\d+)([KMG]?)", args[option].upper())
+        size_in_bytes = int(size[1]) * units[size[2]] if size else 0
+
+        if size_in_bytes < 1:
+            notify_mistake(
+                f"{name} ", f'"{args[option]}"', " is not a positive size!!!"
+            )
+            exit(127)
+        return size_in_bytes
+    return None
+
+
+def parse_cli_age(args: dict, option: str, name: str) -> Optional[float]:
+    """Parse age in seconds, with optional s, m, h or d suffix"""
+    if args[option]:
+        units = {"": 1, "S": 1, "M": 60, "H": 60 * 60, "D": 24 * 60 * 60}
+
+        age = re.fullmatch(r"(\d+)([SMHD]?)", args[option].upper())
+        age_in_seconds = int(age[1]) * units[age[2]] if age else 0
+
+        if age_in_seconds < 1:
+            notify_mistake(f"{name} ", f'"{args[option]}"', " is not a positive age!!!")
+            exit(127)
+        return age_in_seconds
+    return None
+
+
+def parse_cli_memory_limit(args: dict) -> Optional[int]:
+    return parse_cli_size(args, "-m", "Memory limit")
+
+
+def parse_cli_log_codec(args: dict) -> Optional[Type[LogCodec]]:
+    if args["-z"]:
+        for subclass in LogCodec.__subclasses__():
+            if args["-z"] == subclass.command_line_argument:
+                if not subclass.is_available():
+                    notify_mistake(
+                        "Logs compression ", f'"{args["-z"]}"', " is not installed!!!"
+                    )
+                    exit(127)
+                return subclass
+
+        notify_mistake("Logs compression ", f'"{args["-z"]}"', " was not found!!!")
+        exit(127)
+
+    return None
+
+
+def parse_cli_logs_run(args: dict, logs_directory: Path) -> str:
+    """Find run which logs are shown, the latest one by default"""
+    runs = LogStore.list_runs(logs_directory)
+
+    if args["--run"]:
+        if args["--run"] not in runs:
+            notify_mistake("Logs of run ", f'"{args["--run"]}"', " were not found!!!")
+            exit(127)
+        return args["--run"]
+
+    if not runs:
+        notify_mistake("There are no ", "stored logs", " inside logs directory!!!")
+        exit(127)
+    return runs[-1]
+
+
+def parse_cli_logs_streams(args: dict) -> Tuple[str, ...]:
+    if args["--stdout"]:
+        return ("stdout",)
+    if args["--stderr"]:
+        return ("stderr",)
+    return LogStore.STREAMS
+
+
+def parse_cli_tail(args: dict) -> Optional[int]:
+    if args["--tail"]:
+        try:
+            lines = int(args["--tail"])
+        except ValueError:
+            lines = 0
+
+        if lines < 1:
+            notify_mistake(
+                "Tail lines number ", f'"{args["--tail"]}"', " is not positive!!!"
+            )
+            exit(127)
+        return lines
+    return None
+
+
+def parse_cli_trace(args: dict) -> Optional[Path]:
+    if args["--trace"]:
+        path = Path(args["--trace"])
+        if not path.parent.is_dir():
+            notify_mistake(
+                "Trace directory ",
+                f'"{path.parent}"',
+                " is not present inside file system!!!",
+            )
+            exit(127)
+        return path
+    return None
+
+
+def parse_cli_responder(args: dict) -> Optional[Responder]:
+    """Load rules answering prompts of scripts, with policy of unmatched ones"""
+    options = ("--rules", "--prompt-timeout", "--unmatched")
+    if not any(args[option] for option in options):
+        return None
+
+    if args["-o"] != AutoResponderOutputInput.command_line_argument:
+        notify_mistake(
+            "Options ",
+            ", ".join(options),
+            f" require {AutoResponderOutputInput.command_line_argument} controller!!!",
+        )
+        exit(127)
+
+    policy = args["--unmatched"] or Responder.POLICIES[0]
+    if policy not in Responder.POLICIES:
+        notify_mistake(
+            "Policy of unmatched prompts ", f'"{policy}"', " was not found!!!"
+        )
+        exit(127)
+
+    prompt_timeout = (
+        parse_cli_age(args, "--prompt-timeout", "Prompt timeout")
+        or Responder.PROMPT_TIMEOUT
+    )
+
+    if not args["--rules"]:
+        return Responder(prompt_timeout=prompt_timeout, policy=policy)
+
+    path = Path(args["--rules"])
+    if not path.is_file():
+        notify_mistake(
+            "Rules file ", f'"{path}"', " is not present inside file system!!!"
+        )
+        exit(127)
+
+    try:
+        return Responder.from_file(path, prompt_timeout, policy)
+    except ValueError as error:
+        # JSON errors are value errors as well
+        notify_mistake("Rules file ", f'"{path}"', f" is not valid: {error}!!!")
+        exit(127)
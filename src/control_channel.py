@@ -0,0 +1,122 @@
+"""
+Channel through which subshell reports control messages,
+apart from output of the script it executes.
+"""
+from typing import Deque, NamedTuple, Optional, Union
+from collections import deque
+from select import select
+from pathlib import Path
+import tempfile
+import shutil
+import time
+import os
+
+
+class ControlRecord(NamedTuple):
+    kind: str
+    value: int
+    timestamp: Optional[float]
+
+
+class ControlChannel:
+    """FIFO, to which subshell writes fixed format records:
+            <KIND> <value> [<timestamp>]
+
+    Record example:
+            PID 4321 1650000000.123456
+
+    Reading end is open as long as channel exists,
+    so subshell never blocks on writing a record.
+    """
+
+    FILE_NAME = "control.fifo"
+
+    PID = "PID"
+
+    EXIT_CODE = "EXIT"
+
+    READY = "READY"
+
+    def __init__(self):
+        self.directory = Path(tempfile.mkdtemp(prefix="script_executor_"))
+        self.path = self.directory.joinpath(self.FILE_NAME)
+
+        os.mkfifo(self.path, 0o600)
+
+        self._read_fd: Optional[int] = os.open(self.path, os.O_RDONLY | os.O_NONBLOCK)
+        # Keep channel open for writing, so reader never gets end of file
+        #   between subshells' records
+        self._write_fd: Optional[int] = os.open(self.path, os.O_WRONLY | os.O_NONBLOCK)
+
+        self._partial_record = b""
+        self._records: Deque[ControlRecord] = deque()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _exc_type, _exc_value, _exc_traceback):
+        self.close()
+
+    def fileno(self) -> int:
+        if self._read_fd is None:
+            raise ValueError("Control channel is closed")
+        return self._read_fd
+
+    @classmethod
+    def parse_record(cls, line: str) -> ControlRecord:
+        kind, value, *timestamp = line.split()
+        return ControlRecord(
+            kind,
+            int(value),
+            # Some locales use comma as decimal separator
+            float(timestamp[0].replace(",", ".")) if timestamp else None,
+        )
+
+    def read_records(self):
+        """Read all records which are waiting in channel"""
+        while True:
+            try:
+                chunk = os.read(self.fileno(), 4096)
+            except BlockingIOError:
+                break
+            if not chunk:
+                break
+
+            *lines, self._partial_record = (self._partial_record + chunk).split(b"\n")
+
+            for line in lines:
+                if line.strip():
+                    self._records.append(self.parse_record(line.decode()))
+
+    def wait_for(
+        self, kind: str, timeout: Optional[Union[int, float]] = None
+    ) -> Optional[ControlRecord]:
+        """Return first record of given kind, waiting for it at most
+        `timeout` seconds. If record does not come return None."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            self.read_records()
+
+            for record in self._records:
+                if record.kind == kind:
+                    self._records.remove(record)
+                    return record
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+
+            select([self], [], [], remaining)
+
+    def clear(self):
+        """Drop records, which are left from previous subshells"""
+        self.read_records()
+        self._records.clear()
+
+    def close(self):
+        for fd in (self._read_fd, self._write_fd):
+            if fd is not None:
+                os.close(fd)
+        self._read_fd = self._write_fd = None
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -28,3 +28,11 @@ class NoExitCodeError(Exception):
 
 class ShellNotSpawned(Exception):
     """Passed not spawned shell to class which require spawned one"""
+
+
+class DependencyNotFound(Exception):
+    """Script needs other script which is not part of the module"""
+
+
+class DependencyCycleError(Exception):
+    """Scripts dependencies create a cycle, so they cannot be ordered"""
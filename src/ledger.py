@@ -0,0 +1,122 @@
+"""
+Durable record of executed scripts, which allows to resume a run.
+"""
+from typing import Dict, Optional
+from pathlib import Path
+import threading
+import json
+import os
+
+from src.script import Script
+
+
+class RunLedger:
+    """Append-only file with one JSON record per executed script:
+            {"path": "/scripts/update_0.sh", "hash": "9f86...", "exit_code": 0}
+
+    Every record is flushed and synced to disk as soon as it is written,
+    so ledger survives a crash or reboot in the middle of a run.
+
+    Run which is not resumed drops records of scripts from its
+    `scripts_directory`, records of other directories are kept.
+    Without the directory, all records are dropped.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        resume: bool = False,
+        scripts_directory: Optional[Path] = None,
+    ):
+        self.path = path
+
+        # Paths of succeeded scripts with hashes of theirs content
+        self._succeeded: Dict[str, str] = {}
+
+        if resume:
+            self._load()
+        elif scripts_directory is not None:
+            self._drop_records(scripts_directory)
+
+        # Run which is not resumed starts a new ledger
+        self._file = open(
+            self.path, "a" if resume or scripts_directory is not None else "w"
+        )
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _exc_type, _exc_value, _exc_traceback):
+        self.close()
+
+    @classmethod
+    def _create_script_key(cls, script: Script) -> str:
+        return str(script.path.resolve())
+
+    def _load(self):
+        if not self.path.exists():
+            return
+
+        with open(self.path) as ledger:
+            for line in ledger:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Record interrupted by a crash
+                    continue
+
+                if record["exit_code"] == 0:
+                    self._succeeded[record["path"]] = record["hash"]
+                else:
+                    self._succeeded.pop(record["path"], None)
+
+    def _drop_records(self, scripts_directory: Path):
+        """Rewrite ledger without records of scripts from directory"""
+        if not self.path.exists():
+            return
+
+        directory = scripts_directory.resolve()
+        with open(self.path) as ledger:
+            kept = []
+            for line in ledger:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Record interrupted by a crash
+                    continue
+                if directory not in Path(record["path"]).parents:
+                    kept.append(line)
+
+        # Ledger is replaced at once, so a crash does not lose other records
+        rewritten_path = self.path.with_name(self.path.name + ".tmp")
+        with open(rewritten_path, "w") as rewritten:
+            rewritten.writelines(kept)
+            rewritten.flush()
+            os.fsync(rewritten.fileno())
+        os.replace(rewritten_path, self.path)
+
+    def is_succeeded(self, script: Script) -> bool:
+        """Decide did script succeed in previous run,
+        and is its content still the same"""
+        key = self._create_script_key(script)
+        return key in self._succeeded and (
+            self._succeeded[key] == script.find_content_hash()
+        )
+
+    def record(self, script: Script, exit_code: int):
+        line = json.dumps(
+            {
+                "path": self._create_script_key(script),
+                "hash": script.find_content_hash(),
+                "exit_code": exit_code,
+            }
+        )
+
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
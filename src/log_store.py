@@ -0,0 +1,279 @@
+"""
+Single file store of scripts output of one run, with index
+which allows to extract output of any script without scanning it.
+"""
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence
+from pathlib import Path
+import threading
+import struct
+import mmap
+import time
+import os
+
+
+class IndexEntry(NamedTuple):
+    script_id: int
+    stream_id: int
+    offset: int
+    length: int
+    timestamp: float
+
+
+class LogStore:
+    """Append-only segment file with output of all scripts of one run,
+    and index file with fixed size binary entry per written chunk:
+            (script id, stream id, byte offset, length, Unix timestamp)
+
+    Run `2022-04-18T10:00:00` is stored in `2022-04-18T10:00:00.segment`
+    and `2022-04-18T10:00:00.index` files. Script's name is written to
+    segment once, and indexed with `NAME` stream id, other entries refer
+    to the script by its id.
+
+    Chunk is written to segment before its index entry, so after a crash
+    index never points to missing output. Writes are buffered, and flushed
+    when buffer grows over `flush_size` bytes or when script is done.
+    """
+
+    SEGMENT_SUFFIX = ".segment"
+
+    INDEX_SUFFIX = ".index"
+
+    ENTRY = struct.Struct("<IBQId")
+
+    STREAMS = ("stdout", "stderr")
+
+    # Stream id of entry, which names a script
+    NAME = 255
+
+    FLUSH_SIZE = 64 * 1024
+
+    def __init__(self, path: Path, flush_size: int = FLUSH_SIZE):
+        self.path = path
+        self.segment_path = path.with_name(path.name + self.SEGMENT_SUFFIX)
+        self.index_path = path.with_name(path.name + self.INDEX_SUFFIX)
+        self.flush_size = flush_size
+
+        self._segment = None
+        self._index = None
+
+        # Offset at which next chunk will be written
+        self._size = 0
+        self._script_ids: Dict[str, int] = {}
+
+        self._segment_buffer: List[bytes] = []
+        self._index_buffer: List[bytes] = []
+        self._buffered_size = 0
+
+        # Scripts executed at the same time write to one store
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _exc_type, _exc_value, _exc_traceback):
+        self.close()
+
+    def _open(self):
+        self.segment_path.parent.mkdir(parents=True, exist_ok=True)
+        self._segment = open(self.segment_path, "ab")
+        self._index = open(self.index_path, "ab")
+        self._size = self._segment.tell()
+
+        if index_size := self._index.tell():
+            # Interrupted store is continued after its last whole entry
+            self._index.truncate(index_size - index_size % self.ENTRY.size)
+            with LogReader(self.path) as reader:
+                self._script_ids = dict(reader.script_ids)
+
+    def _add_chunk(self, script_id: int, stream_id: int, data: bytes, timestamp: float):
+        self._segment_buffer.append(data)
+        self._index_buffer.append(
+            self.ENTRY.pack(script_id, stream_id, self._size, len(data), timestamp)
+        )
+        self._size += len(data)
+        self._buffered_size += len(data)
+
+    def _find_script_id(self, script_name: str, timestamp: float) -> int:
+        if (script_id := self._script_ids.get(script_name)) is None:
+            script_id = self._script_ids[script_name] = len(self._script_ids)
+            self._add_chunk(script_id, self.NAME, script_name.encode(), timestamp)
+        return script_id
+
+    def append(self, script_name: str, stream: str, output: str):
+        """Buffer output of script's stream, like "stdout" or "stderr" """
+        data = output.encode()
+        if not data:
+            return
+
+        timestamp = time.time()
+
+        with self._lock:
+            if self._segment is None:
+                self._open()
+
+            self._add_chunk(
+                self._find_script_id(script_name, timestamp),
+                self.STREAMS.index(stream),
+                data,
+                timestamp,
+            )
+
+            if self._buffered_size >= self.flush_size:
+                self._flush()
+
+    def _flush(self):
+        if not self._segment_buffer:
+            return
+
+        self._segment.write(b"".join(self._segment_buffer))  # type:ignore
+        self._segment.flush()  # type:ignore
+        self._index.write(b"".join(self._index_buffer))  # type:ignore
+        self._index.flush()  # type:ignore
+
+        self._segment_buffer, self._index_buffer = [], []
+        self._buffered_size = 0
+
+    def flush(self):
+        """Write buffered output to segment and index files"""
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        with self._lock:
+            if self._segment is not None:
+                self._flush()
+                self._segment.close()
+                self._index.close()  # type:ignore
+                self._segment = self._index = None
+
+    @classmethod
+    def list_runs(cls, directory: Path) -> List[str]:
+        """List names of runs stored in directory, from the oldest"""
+        if not directory.is_dir():
+            return []
+
+        return sorted(
+            path.name[: -len(cls.SEGMENT_SUFFIX)]
+            for path in directory.iterdir()
+            if path.name.endswith(cls.SEGMENT_SUFFIX)
+        )
+
+
+class LogReader:
+    """Read output of scripts from log store of one run. Segment and index
+    are memory-mapped, so output of one script is extracted without
+    reading output of other scripts, and tail is found from the end."""
+
+    def __init__(self, path: Path):
+        self.segment_path = path.with_name(path.name + LogStore.SEGMENT_SUFFIX)
+        self.index_path = path.with_name(path.name + LogStore.INDEX_SUFFIX)
+
+        self._segment = self._map(self.segment_path)
+        self._entries = self._load_entries(self._map(self.index_path))
+
+        self.script_ids: Dict[str, int] = {
+            self._read_chunk(entry).decode(): entry.script_id
+            for entry in self._entries
+            if entry.stream_id == LogStore.NAME
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _exc_type, _exc_value, _exc_traceback):
+        self.close()
+
+    @classmethod
+    def _map(cls, path: Path) -> Optional[mmap.mmap]:
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                # Empty file cannot be mapped
+                return None
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _load_entries(self, index: Optional[mmap.mmap]) -> List[IndexEntry]:
+        if index is None:
+            return []
+
+        segment_size = len(self._segment) if self._segment is not None else 0
+        # Entry interrupted by a crash is skipped
+        entries_size = len(index) - len(index) % LogStore.ENTRY.size
+
+        entries = [
+            IndexEntry(*entry)
+            for entry in LogStore.ENTRY.iter_unpack(index[:entries_size])
+        ]
+        index.close()
+
+        # Output of entry could be lost with unflushed buffers
+        return [
+            entry for entry in entries if entry.offset + entry.length <= segment_size
+        ]
+
+    def _read_chunk(self, entry: IndexEntry) -> bytes:
+        return self._segment[entry.offset : entry.offset + entry.length]  # type:ignore
+
+    def _find_entries(
+        self, script_name: str, streams: Sequence[str] = LogStore.STREAMS
+    ) -> Iterator[IndexEntry]:
+        script_id = self.script_ids.get(script_name)
+        stream_ids = {LogStore.STREAMS.index(stream) for stream in streams}
+
+        return (
+            entry
+            for entry in self._entries
+            if entry.script_id == script_id and entry.stream_id in stream_ids
+        )
+
+    def find_sizes(self, script_name: str) -> Dict[str, int]:
+        """Count bytes written by script to each stream"""
+        sizes = dict.fromkeys(LogStore.STREAMS, 0)
+        for entry in self._find_entries(script_name):
+            sizes[LogStore.STREAMS[entry.stream_id]] += entry.length
+        return sizes
+
+    def read(
+        self, script_name: str, streams: Sequence[str] = LogStore.STREAMS
+    ) -> bytes:
+        """Read whole output of script's streams, in order it was written"""
+        return b"".join(
+            self._read_chunk(entry)
+            for entry in self._find_entries(script_name, streams)
+        )
+
+    def tail(
+        self,
+        script_name: str,
+        lines: int,
+        streams: Sequence[str] = LogStore.STREAMS,
+    ) -> bytes:
+        """Read last `lines` lines of script's streams. Chunks are read
+        from the end, until enough lines are found."""
+        if lines <= 0:
+            return b""
+
+        chunks: List[bytes] = []
+        line_breaks = 0
+
+        for entry in reversed(list(self._find_entries(script_name, streams))):
+            chunk = self._read_chunk(entry)
+            chunks.append(chunk)
+            line_breaks += chunk.count(b"\n")
+            # Line break before the first line of tail has to be found too
+            if line_breaks > lines:
+                break
+
+        output = b"".join(reversed(chunks))
+
+        # Line break at the end of output does not start a new line
+        start = len(output) - 1 if output.endswith(b"\n") else len(output)
+        for _ in range(lines):
+            start = output.rfind(b"\n", 0, start)
+            if start < 0:
+                return output
+        return output[start + 1 :]
+
+    def close(self):
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
@@ -0,0 +1,156 @@
+"""
+Cache of scripts directory, which allows to list thousands
+of scripts without reading them on every start.
+"""
+
+from typing import Any, Dict, List, Tuple
+from pathlib import Path
+import json
+import time
+import os
+
+from src.script import Script, _ScriptName
+
+
+class Manifest:
+    """Hidden JSON file next to scripts directory, holding for every script
+    its number, shebang, annotations, size, mtime and content hash:
+            {"mtime_ns": ..., "written_ns": ..., "scripts": {"update_0.sh": {...}}}
+
+    Manifest of `scripts` directory is stored in `.scripts.manifest.json`
+    file. It is not kept inside the directory, because writing it would
+    change directory's mtime.
+
+    Manifest is revalidated by `stat` alone. Listing is trusted while
+    directory mtime is unchanged, script is read again only when its size
+    or mtime changes. Like in git index, file modified shortly before
+    manifest was written is not trusted, because mtime could miss the change.
+    """
+
+    FILE_SUFFIX = ".manifest.json"
+
+    VERSION = 1
+
+    # Filesystems store mtime with limited precision, up to 2 seconds on FAT
+    RACY_INTERVAL_NS = 2 * 10**9
+
+    def __init__(self, scripts_folder: Path):
+        self.scripts_folder = scripts_folder
+
+        folder_path = scripts_folder.resolve()
+        self.path = folder_path.parent.joinpath(
+            f".{folder_path.name}{self.FILE_SUFFIX}"
+        )
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path) as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError):
+            return {}
+
+        if manifest.get("version") != self.VERSION:
+            return {}
+        return manifest
+
+    def _save(self, manifest: Dict[str, Any]):
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(temp_path, "w") as manifest_file:
+                json.dump(manifest, manifest_file)
+            # Other process never reads half written manifest
+            os.replace(temp_path, self.path)
+        except OSError:
+            # Read only scripts directory is listed without a cache
+            pass
+
+    def _list_names(self) -> List[str]:
+        return [
+            entry.name
+            for entry in os.scandir(self.scripts_folder)
+            # Avoid executing hidden files and listing subdirectories
+            if entry.name[0] != "." and entry.is_file()
+        ]
+
+    @classmethod
+    def _is_racy(cls, mtime_ns: int, written_ns: int) -> bool:
+        """Decide could file be modified again within the same mtime"""
+        return mtime_ns >= written_ns - cls.RACY_INTERVAL_NS
+
+    @classmethod
+    def _is_entry_valid(
+        cls, entry: Dict[str, Any], stat: os.stat_result, written_ns: int
+    ) -> bool:
+        return (
+            entry["size"] == stat.st_size
+            and entry["mtime_ns"] == stat.st_mtime_ns
+            and not cls._is_racy(stat.st_mtime_ns, written_ns)
+        )
+
+    def _create_entry(self, name: str, stat: os.stat_result) -> Dict[str, Any]:
+        script = Script(name, self.scripts_folder)
+
+        return {
+            "number": _ScriptName(name).find_script_number(),
+            "shebang": script.read_shebang_path(),
+            "annotations": script.find_annotations(),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": script.find_content_hash(),
+        }
+
+    def list_sorted_scripts(self) -> List[Tuple[int, Script]]:
+        """List scripts with theirs numbers, sorted by number.
+        Scripts which changed since last start are read again
+        and manifest is updated."""
+        manifest = self._load()
+        entries = manifest.get("scripts", {})
+        written_ns = manifest.get("written_ns", 0)
+
+        folder_mtime_ns = os.stat(self.scripts_folder).st_mtime_ns
+        is_changed = manifest.get("mtime_ns") != folder_mtime_ns or self._is_racy(
+            folder_mtime_ns, written_ns
+        )
+
+        names = self._list_names() if is_changed else list(entries)
+
+        new_entries = {}
+        # Plain str paths are much faster to build than `Path` ones
+        folder = os.fspath(self.scripts_folder)
+
+        for name in names:
+            stat = os.stat(os.path.join(folder, name))
+            entry = entries.get(name)
+
+            if entry is None or not self._is_entry_valid(entry, stat, written_ns):
+                entry = self._create_entry(name, stat)
+                is_changed = True
+
+            new_entries[name] = entry
+
+        # Keep scripts with the same number in listing order
+        sorted_names = sorted(new_entries, key=lambda name: new_entries[name]["number"])
+
+        if is_changed:
+            self._save(
+                {
+                    "version": self.VERSION,
+                    "mtime_ns": folder_mtime_ns,
+                    "written_ns": time.time_ns(),
+                    "scripts": {name: new_entries[name] for name in sorted_names},
+                }
+            )
+
+        return [
+            (
+                new_entries[name]["number"],
+                Script(
+                    name,
+                    self.scripts_folder,
+                    shebang_path=new_entries[name]["shebang"],
+                    annotations=new_entries[name]["annotations"],
+                    content_hash=new_entries[name]["hash"],
+                ),
+            )
+            for name in sorted_names
+        ]
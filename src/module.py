@@ -1,19 +1,27 @@
-from typing import Any
+from typing import Any, Generator, List, Optional
+from itertools import groupby
 import pathlib
 import os
 
 
+from src.manifest import Manifest
+from src.tracer import TRACER
 from src.script import Script
 
 
 class Module:
     """Collection of scripts"""
 
-    def __init__(self, scripts_folder: pathlib.Path):
+    def __init__(self, scripts_folder: pathlib.Path, use_manifest: bool = True):
         self.scripts_folder = scripts_folder
+        self.manifest: Optional[Manifest] = (
+            Manifest(scripts_folder) if use_manifest else None
+        )
 
     def __iter__(self):
-        return (script[1] for script in self._list_sorted_scripts())
+        with TRACER.span("list_scripts"):
+            scripts = self._list_sorted_scripts()
+        return (script[1] for script in scripts)
 
     @classmethod
     def _get_first_element(cls, collection: Any) -> Any:
@@ -29,6 +37,9 @@ class Module:
         ]
 
     def _list_sorted_scripts(self) -> list:
+        if self.manifest is not None:
+            return self.manifest.list_sorted_scripts()
+
         scripts_list = self._list_scripts()
 
         for i, script in enumerate(scripts_list):
@@ -41,3 +52,13 @@ class Module:
         scripts_list.sort(key=self._get_first_element)
 
         return scripts_list
+
+    def stages(self) -> Generator[List[Script], None, None]:
+        """Yield groups of scripts sharing the same number.
+        Stages are yielded in scripts order, so scripts
+        from one stage can be executed at the same time."""
+        with TRACER.span("list_scripts"):
+            scripts = self._list_sorted_scripts()
+
+        for _number, stage in groupby(scripts, key=self._get_first_element):
+            yield [script for _, script in stage]
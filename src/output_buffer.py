@@ -0,0 +1,101 @@
+"""
+Buffer for script's output with bounded memory usage.
+"""
+from typing import Deque, IO, Optional
+from collections import deque
+import threading
+import tempfile
+
+
+class OutputBuffer:
+    """First in, first out buffer for script's output, which keeps at
+    most `memory_limit` bytes in memory. Output over the limit spills
+    to a temporary file and is read back from it in order, so script
+    producing output faster than it is consumed does not grow memory.
+
+    Buffer is safe to be written and read by different threads.
+    """
+
+    MEMORY_LIMIT = 1024 * 1024
+
+    def __init__(self, memory_limit: int = MEMORY_LIMIT):
+        self.memory_limit = memory_limit
+
+        self._memory: Deque[bytes] = deque()
+        self._memory_size = 0
+
+        self._spill: Optional[IO[bytes]] = None
+        self._spill_read_offset = 0
+        self._spill_write_offset = 0
+
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _exc_type, _exc_value, _exc_traceback):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._memory_size + self._spill_write_offset - self._spill_read_offset
+
+    @property
+    def is_spilled(self) -> bool:
+        """Decide is any output waiting in temporary file"""
+        return self._spill_write_offset > self._spill_read_offset
+
+    def write(self, data: bytes):
+        with self._lock:
+            # Once output spills, it goes to file until file is read,
+            #   to keep output in order
+            if not self.is_spilled and (
+                self._memory_size + len(data) <= self.memory_limit
+            ):
+                self._memory.append(data)
+                self._memory_size += len(data)
+                return
+
+            if self._spill is None:
+                self._spill = tempfile.TemporaryFile(prefix="script_output_")
+
+            self._spill.seek(self._spill_write_offset)
+            self._spill.write(data)
+            self._spill_write_offset += len(data)
+
+    def read(self, size: int = -1) -> bytes:
+        """Read at most `size` bytes of the oldest output,
+        or all of it when size is negative"""
+        with self._lock:
+            size = len(self) if size < 0 else min(size, len(self))
+            chunks = []
+
+            while size and self._memory:
+                chunk = self._memory.popleft()
+                if len(chunk) > size:
+                    chunk, rest = chunk[:size], chunk[size:]
+                    self._memory.appendleft(rest)
+                chunks.append(chunk)
+                self._memory_size -= len(chunk)
+                size -= len(chunk)
+
+            if size and self._spill is not None:
+                self._spill.seek(self._spill_read_offset)
+                chunk = self._spill.read(size)
+                chunks.append(chunk)
+                self._spill_read_offset += len(chunk)
+
+                if not self.is_spilled:
+                    # File is drained, it can be reused from the beginning
+                    self._spill.truncate(0)
+                    self._spill_read_offset = self._spill_write_offset = 0
+
+            return b"".join(chunks)
+
+    def close(self):
+        with self._lock:
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
+            self._memory.clear()
+            self._memory_size = 0
+            self._spill_read_offset = self._spill_write_offset = 0
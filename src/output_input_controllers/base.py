@@ -1,16 +1,35 @@
 from typing import TYPE_CHECKING
 from typing import Tuple, List, Dict
+from itertools import groupby
+import threading
 import abc
 
+from src.output_input_controllers.events import (
+    Event,
+    ORPHANS,
+    STATUS,
+    STDERR,
+    STDOUT,
+    TIMEOUT,
+    USAGE,
+)
+from src.output_input_controllers.terminal_reader import LineRequest
 from src.output_input_controllers.utils import (
     format_success,
     format_failure,
+    format_timeout,
+    format_orphans,
+    format_usage,
+    format_skip,
+    TERMINAL_READER,
+    flush_terminal,
     ask_to_exit,
     print_,
 )
 
 if TYPE_CHECKING:
     from src.script_executor import ScriptExecutor
+    from src.process import ResourceUsage
 
 
 class BaseDescriptor(abc.ABC):
@@ -48,6 +67,22 @@ class OutputInputController(abc.ABC):
 
     scripts_statuses: List[Dict[str, int]] = []
 
+    # Resources used by scripts, by script name
+    scripts_usages: Dict[str, "ResourceUsage"] = {}
+
+    # Timeouts of scripts killed by deadline, by script name
+    scripts_timeouts: Dict[str, float] = {}
+
+    # Descendants left running by scripts, by script name
+    scripts_orphans: Dict[str, List[str]] = {}
+
+    # Show only the latest status after each script,
+    #   statuses of all scripts are shown once at the end
+    incremental_summary = False
+
+    # Scripts executed at the same time report statuses one by one
+    _status_lock = threading.Lock()
+
     @classmethod
     def show_success(cls, script_name: str):
         print_(format_success(script_name))
@@ -56,6 +91,46 @@ class OutputInputController(abc.ABC):
     def show_failure(cls, script_name: str):
         print_(format_failure(script_name))
 
+    @classmethod
+    def format_details(cls, script_name: str) -> str:
+        """Format timeout, resources usage and orphans
+        of script, which are shown below its status"""
+        details = ""
+        if (timeout := cls.scripts_timeouts.get(script_name)) is not None:
+            details += format_timeout(timeout)
+        if usage := cls.scripts_usages.get(script_name):
+            details += format_usage(usage)
+        if orphans := cls.scripts_orphans.get(script_name):
+            details += format_orphans(orphans)
+        return details
+
+    @classmethod
+    def show_details(cls, script_name: str):
+        if details := cls.format_details(script_name):
+            print_(details)
+
+    @classmethod
+    def show_prompt(cls, script_executor: "ScriptExecutor"):
+        """Script waits for user input, so its output is shown at once"""
+        flush_terminal()
+
+    def request_input(self, script_executor: "ScriptExecutor") -> LineRequest:
+        """Request line of input for script, which waits for it. Request
+        is awaited by script executor and answered in background, empty
+        line ends script's input. By default user answers in terminal."""
+        self.show_prompt(script_executor)
+        return TERMINAL_READER.request()
+
+    def cancel_input(self, script_executor: "ScriptExecutor", request: LineRequest):
+        """Close request, which script does not wait for anymore. Line
+        typed by user in the meantime is kept for the next request."""
+        TERMINAL_READER.cancel(request)
+
+    @classmethod
+    def show_skip(cls, script_name: str):
+        print_(format_skip(script_name))
+        flush_terminal()
+
     @classmethod
     def ask_to_exit(cls, script_name: str):
         if ask_to_exit():
@@ -63,7 +138,7 @@ class OutputInputController(abc.ABC):
 
     @classmethod
     def show_progress(cls):
-        print("\n" * 2 + "Scripts Summary:")
+        print_("\n" * 2 + "Scripts Summary:" + "\n")
 
         for script in cls.scripts_statuses:
             for script_name, exit_code in script.items():
@@ -71,8 +146,26 @@ class OutputInputController(abc.ABC):
                     cls.show_success(script_name)
                 else:
                     cls.show_failure(script_name)
+                cls.show_details(script_name)
+
+        print_("\n" * 2)
 
-        print(end="\n" * 2)
+    @classmethod
+    def show_last_status(cls):
+        for script_name, exit_code in cls.scripts_statuses[-1].items():
+            if exit_code == 0:
+                cls.show_success(script_name)
+            else:
+                cls.show_failure(script_name)
+            cls.show_details(script_name)
+
+    @classmethod
+    def show_summary(cls):
+        """Show statuses of all scripts when execution is over.
+        In incremental mode it is the only time they are shown."""
+        if cls.incremental_summary:
+            cls.show_progress()
+        flush_terminal()
 
     @classmethod
     def show_status(cls, script_executor: "ScriptExecutor"):
@@ -80,12 +173,51 @@ class OutputInputController(abc.ABC):
         script_name = str(script_executor.script)
         exit_code = script_executor.exit_code
 
-        cls.scripts_statuses.append({script_name: exit_code})
-
-        cls.show_progress()
-
-        if exit_code != 0:
-            cls.ask_to_exit(script_name)
+        with cls._status_lock:
+            cls.scripts_statuses.append({script_name: exit_code})
+
+            if cls.incremental_summary:
+                cls.show_last_status()
+            else:
+                cls.show_progress()
+
+            flush_terminal()
+
+            if exit_code != 0:
+                cls.ask_to_exit(script_name)
+
+    def handle_events(self, events: List[Event]):
+        """Receive batch of script's events. Batch is adapted to
+        descriptors and `show_status`, so controllers written for
+        single values keep working. Controllers which handle whole
+        batches override it.
+
+        Neighbouring output events of the same script are joined,
+        so descriptor is called once per batch, not once per line.
+        Timeout, resources usage and orphans are shown with status
+        of script, timing events are not shown by default."""
+        # Details shown with status of script, by kind of event
+        details: Dict[str, dict] = {
+            USAGE: self.scripts_usages,
+            TIMEOUT: self.scripts_timeouts,
+            ORPHANS: self.scripts_orphans,
+        }
+
+        for (kind, script_executor), group in groupby(
+            events, key=lambda event: event[:2]
+        ):
+            if kind in (STDOUT, STDERR):
+                setattr(
+                    self,
+                    kind,
+                    (script_executor, "".join(event.value for event in group)),
+                )
+            elif kind in details:
+                for event in group:
+                    details[kind][str(script_executor.script)] = event.value
+            elif kind == STATUS:
+                for _event in group:
+                    self.show_status(script_executor)
 
     @property
     @classmethod
@@ -1,21 +1,52 @@
-from src.output_input_controllers.base import OutputInputController
+from typing import TYPE_CHECKING
+from typing import Dict, List, Optional
+import threading
+import time
+
+from src.output_input_controllers.base import BaseDescriptor, OutputInputController
+from src.output_input_controllers.terminal_reader import LineRequest
+from src.output_input_controllers.responder import Responder
+from src.output_input_controllers.events import (
+    Event,
+    ORPHANS,
+    STATUS,
+    STDERR,
+    STDOUT,
+    TIMEOUT,
+    TIMING,
+    USAGE,
+)
 from src.output_input_controllers.descriptors import (
     SimpleTerminalInputDescriptor,
     TerminalOutputDescriptorColor,
+    TerminalStoreOutputDescriptor,
     TerminalFileOutputDescriptor,
+    TerminalStoreErrorDescriptor,
     TerminalErrorDescriptorColor,
     TerminalFileErrorDescriptor,
     TerminalOutputDescriptor,
     TerminalErrorDescriptor,
 )
 from src.output_input_controllers.utils import (
+    format_event_record,
+    write_to_events_log,
+    close_events_log,
+    flush_log_store,
+    append_to_summary,
     write_to_summary,
+    close_log,
     format_success,
     format_failure,
+    EXIT_QUESTION,
     print_success,
     print_error,
+    print_info,
+    print_,
 )
 
+if TYPE_CHECKING:
+    from src.script_executor import ScriptExecutor
+
 
 class TerminalOutputInput(OutputInputController):
     stdin = SimpleTerminalInputDescriptor()
@@ -48,10 +79,33 @@ class TerminalFileOutputInput(OutputInputController):
 
     command_line_argument = "terminalfile"
 
+    @classmethod
+    def show_status(cls, script_executor):
+        # Script is done, so its log can be completed
+        close_log(str(script_executor.script))
+
+        super().show_status(script_executor)
+
+    @classmethod
+    def show_last_status(cls):
+        super().show_last_status()
+
+        for script_name, exit_code in cls.scripts_statuses[-1].items():
+            if exit_code == 0:
+                append_to_summary(format_success(script_name))
+            else:
+                append_to_summary(format_failure(script_name))
+            if details := cls.format_details(script_name):
+                append_to_summary(details)
+
     @classmethod
     def show_progress(cls):
         super().show_progress()
 
+        if cls.incremental_summary:
+            # Summary file is already completed by `show_last_status`
+            return
+
         output = "Scripts Summary:" + "\n" * 2
 
         for script in cls.scripts_statuses:
@@ -60,5 +114,232 @@ class TerminalFileOutputInput(OutputInputController):
                     output += format_success(script_name)
                 else:
                     output += format_failure(script_name)
+                output += cls.format_details(script_name)
 
         write_to_summary(output)
+
+
+class TerminalStoreOutputInput(OutputInputController):
+    """Print output to terminal and append it to log store of the run,
+    which keeps output of all scripts in one indexed file. Output is
+    read back by `start.py logs` command."""
+
+    stdin = SimpleTerminalInputDescriptor()
+    stdout = TerminalStoreOutputDescriptor()
+    stderr = TerminalStoreErrorDescriptor()
+
+    command_line_argument = "terminalstore"
+
+    @classmethod
+    def show_status(cls, script_executor):
+        # Output of done script can be read by `start.py logs` at once
+        flush_log_store()
+
+        super().show_status(script_executor)
+
+
+class JsonlOutputInput(OutputInputController):
+    """Append every event of scripts, as one compact JSON record,
+    to a single events log file:
+            {"script":"update_0.sh","stream":"stdout","timestamp":12.5,"data":"line\\n"}
+
+    Timestamps are taken from `time.monotonic`. When execution is
+    over, summary record with exit code, duration, resources usage,
+    timeout and orphans of every script is appended. Only statuses
+    are shown on terminal."""
+
+    stdin = SimpleTerminalInputDescriptor()
+    stdout = BaseDescriptor()
+    stderr = BaseDescriptor()
+
+    command_line_argument = "jsonl"
+
+    scripts_durations: Dict[str, Optional[float]] = {}
+
+    def handle_events(self, events: List[Event]):
+        records = []
+        statuses = []
+
+        for event in events:
+            if event.value == "":
+                # Shell was read before any whole line was written
+                continue
+
+            script_name = str(event.script_executor.script)
+            value = event.value
+
+            if event.kind == TIMING:
+                started_at, finished_at = event.value
+                self.scripts_durations[script_name] = (
+                    None
+                    if started_at is None or finished_at is None
+                    else finished_at - started_at
+                )
+            elif event.kind == USAGE:
+                # Usage is kept for summary, and written with names of fields
+                self.scripts_usages[script_name] = value
+                value = value._asdict()
+            elif event.kind == TIMEOUT:
+                self.scripts_timeouts[script_name] = value
+            elif event.kind == ORPHANS:
+                self.scripts_orphans[script_name] = value
+            elif event.kind == STATUS:
+                statuses.append(event)
+
+            records.append(
+                format_event_record(script_name, event.kind, event.timestamp, value)
+            )
+
+        write_to_events_log("".join(records))
+
+        # Records are written before user is asked whether to stop execution
+        super().handle_events(statuses)
+
+    @classmethod
+    def show_summary(cls):
+        super().show_summary()
+
+        scripts = [
+            {
+                "script": script_name,
+                "exit_code": exit_code,
+                "duration": cls.scripts_durations.get(script_name),
+                "usage": (
+                    usage._asdict()
+                    if (usage := cls.scripts_usages.get(script_name))
+                    else None
+                ),
+                "timeout": cls.scripts_timeouts.get(script_name),
+                "orphans": cls.scripts_orphans.get(script_name, []),
+            }
+            for script in cls.scripts_statuses
+            for script_name, exit_code in script.items()
+        ]
+
+        summary = {
+            "scripts": scripts,
+            "succeeded": sum(script["exit_code"] == 0 for script in scripts),
+            "failed": sum(script["exit_code"] != 0 for script in scripts),
+        }
+
+        write_to_events_log(
+            format_event_record(None, "summary", time.monotonic(), summary)
+        )
+        close_events_log()
+
+
+class AutoResponderOutputInput(OutputInputController):
+    """Print output to terminal and answer prompts of scripts by
+    responder's rules, so run does not wait for user. Prompt which
+    no rule matches is handled by responder's policy, after its
+    timeout. The question whether to stop execution after failure
+    is answered by rules as well, without rule execution is stopped
+    unless policy is to send empty line, which keeps it going.
+
+    Policy is applied only to script, which shows unfinished line,
+    so script waiting for something else than answer is left alone."""
+
+    stdin = SimpleTerminalInputDescriptor()
+    stdout = TerminalOutputDescriptor()
+    stderr = TerminalErrorDescriptor()
+
+    command_line_argument = "autoresponder"
+
+    responder = Responder()
+
+    # Requests of scripts waiting for input and timers
+    #   of their unmatched prompts, by script name
+    pending_requests: Dict[str, LineRequest] = {}
+    prompt_timers: Dict[str, threading.Timer] = {}
+
+    def handle_events(self, events: List[Event]):
+        # Prompts could be written to any of the streams
+        for event in events:
+            if event.kind in (STDOUT, STDERR) and event.value:
+                script_name = str(event.script_executor.script)
+                self.responder.feed(script_name, event.value, event.kind)
+                # Prompt could come after script started to wait
+                if not self._answer_pending(script_name):
+                    # Script which writes is not waiting for its prompt
+                    self._stop_prompt_timer(script_name)
+
+        super().handle_events(events)
+
+    def request_input(self, script_executor: "ScriptExecutor") -> LineRequest:
+        script_name = str(script_executor.script)
+        request = LineRequest()
+
+        self.pending_requests[script_name] = request
+        if self._answer_pending(script_name):
+            return request
+
+        timer = threading.Timer(
+            self.responder.prompt_timeout,
+            self._handle_unmatched_prompt,
+            (script_executor, request),
+        )
+        # Prompt left without answer does not keep the app running
+        timer.daemon = True
+        timer.start()
+        self.prompt_timers[script_name] = timer
+        return request
+
+    def cancel_input(self, script_executor: "ScriptExecutor", request: LineRequest):
+        script_name = str(script_executor.script)
+        if self.pending_requests.get(script_name) is request:
+            del self.pending_requests[script_name]
+        self._stop_prompt_timer(script_name)
+        request.close()
+
+    def _stop_prompt_timer(self, script_name: str):
+        if (timer := self.prompt_timers.pop(script_name, None)) is not None:
+            timer.cancel()
+
+    def _answer_pending(self, script_name: str) -> bool:
+        request = self.pending_requests.get(script_name)
+        if request is None or request.closed or request.line is not None:
+            return False
+
+        if (response := self.responder.take_response(script_name)) is None:
+            return False
+
+        request.answer(response)
+        return True
+
+    def _handle_unmatched_prompt(
+        self, script_executor: "ScriptExecutor", request: LineRequest
+    ):
+        if request.closed or request.line is not None:
+            # Prompt was answered or script is already done
+            return
+
+        prompt = self.responder.find_prompt(str(script_executor.script))
+        if prompt is None:
+            # Script waits without prompt, like for network, so it is left alone
+            return
+
+        policy = self.responder.policy
+        print_error(
+            f"No rule answers prompt of {script_executor.script}: "
+            + f"{prompt!r}, {policy} after {self.responder.prompt_timeout:g}s"
+            + "\n"
+        )
+
+        if policy == "enter":
+            request.answer("\n")
+        elif policy == "eof":
+            request.answer("")
+        else:
+            script_executor.kill_process_tree()
+
+    @classmethod
+    def ask_to_exit(cls, script_name: str):
+        response = cls.responder.respond(EXIT_QUESTION)
+        if response is None:
+            response = "n" if cls.responder.policy == "enter" else "y"
+
+        print_(EXIT_QUESTION)
+        print_info(response + "\n")
+
+        if response.strip().lower() == "y":
+            exit(-1)
@@ -1,10 +1,12 @@
-from typing import Tuple, TYPE_CHECKING
-import sys
+from typing import Optional, Tuple, TYPE_CHECKING
 
 
 from src.output_input_controllers.base import BaseDescriptor
 from src.output_input_controllers.utils import (
     format_error_output,
+    TERMINAL_READER,
+    flush_terminal,
+    write_to_store,
     write_to_log,
     print_error,
     print_info,
@@ -16,12 +18,18 @@ if TYPE_CHECKING:
 
 
 class SimpleTerminalInputDescriptor(BaseDescriptor):
-    def __set__(self, instance, values: Tuple["ScriptExecutor", str]):
-        script_executor, _ = values
+    def __set__(self, instance, values: Tuple["ScriptExecutor", Optional[str]]):
+        """Pass line of user input to shell. Without line
+        it is read from terminal."""
+        script_executor, line = values
 
-        line = sys.stdin.readline()
+        if line is None:
+            # Prompt has to be visible before user answers it
+            flush_terminal()
+            line = TERMINAL_READER.readline()
 
-        script_executor.shell.send_command(line)  # type:ignore
+        # Shell ends line by itself
+        script_executor.shell.send_command(line.removesuffix("\n"))  # type:ignore
 
         instance.__dict__[self.name] = line
 
@@ -84,3 +92,26 @@ class TerminalFileErrorDescriptor(BaseDescriptor):
         print_(errors)
 
         instance.__dict__[self.name] = str_value
+
+
+class TerminalStoreOutputDescriptor(BaseDescriptor):
+    def __set__(self, instance, values: Tuple["ScriptExecutor", str]):
+        script_executor, str_value = values
+
+        write_to_store(str(script_executor.script), self.name, str_value)
+
+        print_(str_value)
+
+        instance.__dict__[self.name] = str_value
+
+
+class TerminalStoreErrorDescriptor(BaseDescriptor):
+    def __set__(self, instance, values: Tuple["ScriptExecutor", str]):
+        script_executor, str_value = values
+
+        # Store keeps streams apart, so errors are stored as they are
+        write_to_store(str(script_executor.script), self.name, str_value)
+
+        print_(format_error_output(str_value))
+
+        instance.__dict__[self.name] = str_value
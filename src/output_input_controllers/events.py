@@ -0,0 +1,41 @@
+from typing import TYPE_CHECKING
+from typing import Any, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    from src.script_executor import ScriptExecutor
+
+
+# Kinds of stream events are named after controller's descriptors
+STDOUT = "stdout"
+
+STDERR = "stderr"
+
+# Value is script's exit code
+STATUS = "status"
+
+# Value is ResourceUsage of script's process tree
+USAGE = "usage"
+
+# Value is seconds after which script's process tree was killed
+TIMEOUT = "timeout"
+
+# Value is list of script's descendants left running after its
+#   exit, described like "dbus-launch (1234)"
+ORPHANS = "orphans"
+
+# Value is (started_at, finished_at) pair of timestamps, any of them
+#   could be None if it was not reported
+TIMING = "timing"
+
+
+class Event(NamedTuple):
+    """Something that happened to executed script, stamped with
+    `time.monotonic`. Script executor passes events to output input
+    controller in batches:
+            [Event("stdout", executor, "line\\n", 12.5), Event("status", executor, 0, 12.6)]
+    """
+
+    kind: str
+    script_executor: "ScriptExecutor"
+    value: Any
+    timestamp: Optional[float] = None
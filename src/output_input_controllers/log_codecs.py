@@ -0,0 +1,67 @@
+from typing import IO
+from pathlib import Path
+import gzip
+
+try:
+    import zstandard  # type:ignore
+except ImportError:
+    # Faster codec is optional
+    zstandard = None
+
+
+class LogCodec:
+    """Codec of log files, which writes them as plain text.
+    Subclasses compress logs, streams are opened in binary
+    mode and compressed stream is appended as a new member
+    or frame, so log can be written in many parts."""
+
+    command_line_argument = "none"
+
+    suffix = ""
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return True
+
+    @classmethod
+    def find_path(cls, path: Path) -> Path:
+        """Add codec's suffix to log path"""
+        return path.with_name(path.name + cls.suffix)
+
+    @classmethod
+    def open(cls, path: Path, mode: str = "ab") -> IO[bytes]:
+        return open(path, mode)
+
+
+class GzipLogCodec(LogCodec):
+    command_line_argument = "gzip"
+
+    suffix = ".gz"
+
+    # Logs are compressed in background, ratio is worth the time
+    COMPRESS_LEVEL = 6
+
+    @classmethod
+    def open(cls, path: Path, mode: str = "ab") -> IO[bytes]:
+        return gzip.open(path, mode, compresslevel=cls.COMPRESS_LEVEL)  # type:ignore
+
+
+class ZstdLogCodec(LogCodec):
+    """Many times faster than gzip with similar ratio,
+    available if zstandard package is installed."""
+
+    command_line_argument = "zstd"
+
+    suffix = ".zst"
+
+    COMPRESS_LEVEL = 3
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return zstandard is not None
+
+    @classmethod
+    def open(cls, path: Path, mode: str = "ab") -> IO[bytes]:
+        return zstandard.ZstdCompressor(level=cls.COMPRESS_LEVEL).stream_writer(
+            open(path, mode), closefd=True
+        )
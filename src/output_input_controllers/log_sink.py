@@ -0,0 +1,165 @@
+from typing import Dict, IO, List, Optional, Type
+from pathlib import Path
+import threading
+import time
+import os
+
+from src.output_input_controllers.log_codecs import LogCodec
+
+
+class LogSink:
+    """Buffer logs in memory and write them by a background thread,
+    keeping one open handle per log file. Buffer is flushed when it
+    grows over `flush_size` characters, every `flush_interval`
+    seconds and when log is closed. If disk is slower than scripts,
+    buffer which grows over `memory_limit` characters is flushed by
+    the writing thread itself.
+
+    Logs are written by `codec`, so compression is done by the
+    background thread as well. Log which got over `rotate_size`
+    bytes of output, or was open for over `rotate_age` seconds,
+    is rotated: `script.log.gz` is renamed to `script.log.1.gz`
+    and output goes to a new `script.log.gz` file."""
+
+    FLUSH_SIZE = 64 * 1024
+
+    FLUSH_INTERVAL = 1.0
+
+    MEMORY_LIMIT = 1024 * 1024
+
+    def __init__(
+        self,
+        flush_size: int = FLUSH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+        memory_limit: int = MEMORY_LIMIT,
+        codec: Type[LogCodec] = LogCodec,
+        rotate_size: Optional[int] = None,
+        rotate_age: Optional[float] = None,
+    ):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.memory_limit = memory_limit
+        self.codec = codec
+        self.rotate_size = rotate_size
+        self.rotate_age = rotate_age
+
+        self._buffers: Dict[Path, List[str]] = {}
+        self._buffered_size = 0
+        self._handles: Dict[Path, IO[bytes]] = {}
+        # Bytes of output written to log file and time it was opened at
+        self._written: Dict[Path, int] = {}
+        self._opened_at: Dict[Path, float] = {}
+
+        # Guards buffers, which are filled by many threads
+        self._buffers_lock = threading.Lock()
+        # Keeps writes to one file in order
+        self._files_lock = threading.Lock()
+
+        self._flush_requested = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        # Set to stop the writing thread, each thread has its own
+        self._stop_requested = threading.Event()
+
+    def write(self, path: Path, output: str):
+        with self._buffers_lock:
+            self._buffers.setdefault(path, []).append(output)
+            self._buffered_size += len(output)
+
+            if self._writer is None:
+                self._stop_requested = threading.Event()
+                self._writer = threading.Thread(
+                    target=self._write_logs, args=(self._stop_requested,), daemon=True
+                )
+                self._writer.start()
+
+            if self._buffered_size >= self.flush_size:
+                self._flush_requested.set()
+
+            is_over_limit = self._buffered_size >= self.memory_limit
+
+        if is_over_limit:
+            self.flush()
+
+    def _write_logs(self, stop_requested: threading.Event):
+        while not stop_requested.is_set():
+            self._flush_requested.wait(self.flush_interval)
+            self._flush_requested.clear()
+            self.flush()
+
+    def _stop_writer(self):
+        """Stop the writing thread and wait until it is done"""
+        with self._buffers_lock:
+            writer, self._writer = self._writer, None
+            self._stop_requested.set()
+        self._flush_requested.set()
+
+        if writer is not None:
+            writer.join()
+
+    def _open(self, path: Path) -> IO[bytes]:
+        if path not in self._handles:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._handles[path] = self.codec.open(self.codec.find_path(path))
+            self._written[path] = 0
+            self._opened_at[path] = time.monotonic()
+        return self._handles[path]
+
+    def _close(self, path: Path):
+        if log := self._handles.pop(path, None):
+            log.close()
+            del self._written[path], self._opened_at[path]
+
+    def _is_rotation_due(self, path: Path) -> bool:
+        return (
+            self.rotate_size is not None and self._written[path] >= self.rotate_size
+        ) or (
+            self.rotate_age is not None
+            and time.monotonic() - self._opened_at[path] >= self.rotate_age
+        )
+
+    def _rotate(self, path: Path):
+        self._close(path)
+
+        number = 1
+        while self.codec.find_path(rotated_path := Path(f"{path}.{number}")).exists():
+            number += 1
+
+        os.rename(self.codec.find_path(path), self.codec.find_path(rotated_path))
+
+    def flush(self, path: Optional[Path] = None):
+        """Write buffered logs of `path`, or all of them, to files"""
+        with self._files_lock:
+            with self._buffers_lock:
+                if path is None:
+                    buffers, self._buffers = self._buffers, {}
+                else:
+                    buffers = {path: self._buffers.pop(path, [])}
+                self._buffered_size -= sum(
+                    len(output) for outputs in buffers.values() for output in outputs
+                )
+
+            for log_path, outputs in buffers.items():
+                if outputs:
+                    log = self._open(log_path)
+                    output = "".join(outputs).encode()
+                    log.write(output)
+                    if self.codec is LogCodec:
+                        # Flushing compressed stream would worsen its ratio
+                        log.flush()
+
+                    self._written[log_path] += len(output)
+                    if self._is_rotation_due(log_path):
+                        self._rotate(log_path)
+
+    def close(self, path: Optional[Path] = None):
+        """Flush logs of `path`, or all of them, and close theirs files.
+        Closing all of them stops the writing thread as well, it is
+        started again by the next write."""
+        if path is None:
+            self._stop_writer()
+        self.flush(path)
+
+        with self._files_lock:
+            paths = list(self._handles) if path is None else [path]
+            for log_path in paths:
+                self._close(log_path)
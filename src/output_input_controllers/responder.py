@@ -0,0 +1,136 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from pathlib import Path
+import threading
+import json
+import re
+
+
+class Responder:
+    """Answer prompts found in output of scripts, by rules of prompt
+    pattern and response, loaded from JSON file:
+            [{"prompt": "Do you want to continue\\\\? \\\\[Y/n\\\\]", "response": "y"}]
+
+    Prompts of all rules are compiled to one regex, so output is
+    searched once, whatever the number of rules. Output of each script
+    is matched incrementally, as it comes. Only its end after the last
+    match, up to `MATCH_WINDOW` characters, is kept, so prompt split
+    between two chunks is found as well.
+
+    Response is given when script waits for input after its prompt.
+    Unfinished line written after the prompt, which is probably another
+    prompt, cancels the response. Whole lines, like output of background
+    processes, do not.
+
+    Prompt which no rule matches, shown as unfinished line, is handled
+    by `policy`, when script waits for `prompt_timeout` seconds:
+            enter   send empty line, so prompt takes its default answer
+            eof     end script's input
+            kill    kill processes of script
+    """
+
+    POLICIES = ("enter", "eof", "kill")
+
+    PROMPT_TIMEOUT = 60
+
+    MATCH_WINDOW = 4096
+
+    def __init__(
+        self,
+        rules: Sequence[Tuple[str, str]] = (),
+        prompt_timeout: float = PROMPT_TIMEOUT,
+        policy: str = POLICIES[0],
+    ):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown policy of unmatched prompts: {policy}")
+
+        self.prompt_timeout = prompt_timeout
+        self.policy = policy
+
+        # Group of the rule which matched tells its response
+        self.responses = {
+            f"rule_{i}": response for i, (_, response) in enumerate(rules)
+        }
+        self.regex = (
+            re.compile(
+                "|".join(
+                    f"(?P<rule_{i}>{prompt})" for i, (prompt, _) in enumerate(rules)
+                )
+            )
+            if rules
+            else None
+        )
+
+        # Output after the last match by script name and stream, the latest
+        #   written stream is the last, and response to it by script name
+        self._outputs: Dict[str, Dict[str, str]] = {}
+        self._responses: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(
+        cls,
+        path: Path,
+        prompt_timeout: float = PROMPT_TIMEOUT,
+        policy: str = POLICIES[0],
+    ) -> "Responder":
+        """Load rules from JSON file. Raise ValueError
+        if file is not a list of valid rules."""
+        with open(path) as rules_file:
+            rules: List[dict] = json.load(rules_file)
+
+        try:
+            return cls(
+                [(rule["prompt"], rule["response"]) for rule in rules],
+                prompt_timeout,
+                policy,
+            )
+        except (TypeError, KeyError, re.error) as error:
+            raise ValueError(f"Invalid rules: {error!r}") from error
+
+    def feed(self, script_name: str, output: str, stream: str = "stdout"):
+        """Search new output of script for prompts. Streams are matched
+        separately, their outputs can come in different order."""
+        with self._lock:
+            outputs = self._outputs.setdefault(script_name, {})
+            text = outputs.pop(stream, "") + output
+
+            if self.regex is not None:
+                match = None
+                for match in self.regex.finditer(text):
+                    pass
+                if match is not None:
+                    self._responses[script_name] = self.responses[match.lastgroup]  # type:ignore
+                    text = text[match.end() :]
+
+            if self._find_unfinished_line(text):
+                # Script shows other prompt than the matched one
+                self._responses.pop(script_name, None)
+            outputs[stream] = text[-self.MATCH_WINDOW :]
+
+    def take_response(self, script_name: str) -> Optional[str]:
+        """Take response to the latest prompt of script, if any rule matched it"""
+        with self._lock:
+            if (response := self._responses.pop(script_name, None)) is not None:
+                # Answered prompt is not matched again
+                self._outputs.pop(script_name, None)
+            return response
+
+    def find_prompt(self, script_name: str) -> Optional[str]:
+        """Find unfinished line, which script wrote last, so it is probably
+        its prompt. Return None if the last lines of all streams are finished."""
+        with self._lock:
+            outputs = list(self._outputs.get(script_name, {}).values())
+        for output in reversed(outputs):
+            if prompt := self._find_unfinished_line(output):
+                return prompt
+        return None
+
+    @staticmethod
+    def _find_unfinished_line(output: str) -> str:
+        return output.rsplit("\n", 1)[-1].replace("\0", "").strip()
+
+    def respond(self, prompt: str) -> Optional[str]:
+        """Find response to a single prompt"""
+        if self.regex is not None and (match := self.regex.search(prompt)):
+            return self.responses[match.lastgroup]  # type:ignore
+        return None
@@ -0,0 +1,132 @@
+from typing import Deque, Optional, TextIO
+from collections import deque
+from select import select
+import threading
+import sys
+import os
+
+
+class LineRequest:
+    """Line of input requested from terminal reader. Its file
+    descriptor becomes readable when the line is read, so it can
+    be awaited by `select` next to script's streams."""
+
+    def __init__(self):
+        self._read_fd, self._write_fd = os.pipe()
+        self.line: Optional[str] = None
+
+        # Request can be answered by other thread, when it is closed
+        self._lock = threading.Lock()
+
+    def fileno(self) -> int:
+        return self._read_fd
+
+    @property
+    def closed(self) -> bool:
+        return self._read_fd == -1
+
+    def answer(self, line: str):
+        """Pass line to requester, closed request is not answered"""
+        with self._lock:
+            if not self.closed and self.line is None:
+                self.line = line
+                os.write(self._write_fd, b"\0")
+
+    def close(self):
+        with self._lock:
+            if not self.closed:
+                os.close(self._read_fd)
+                os.close(self._write_fd)
+                self._read_fd = self._write_fd = -1
+
+
+class TerminalReader:
+    """Read lines of user input by a background thread, one line per
+    request, so waiting for the user never stops the thread which
+    requested it. Requests are answered in order, empty line means
+    end of input.
+
+    Line read after its request was cancelled is kept for the next
+    request. Input is read from `stream`, or from `sys.stdin` at the
+    time of reading if no stream is given.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream
+
+        self._requests: Deque[LineRequest] = deque()
+        self._lines: Deque[str] = deque()
+        self._condition = threading.Condition()
+        self._reader: Optional[threading.Thread] = None
+
+    def request(self) -> LineRequest:
+        """Request line, which is read in background"""
+        request = LineRequest()
+
+        with self._condition:
+            if self._lines:
+                request.answer(self._lines.popleft())
+                return request
+
+            self._requests.append(request)
+
+            if self._reader is None:
+                self._reader = threading.Thread(target=self._read_lines, daemon=True)
+                self._reader.start()
+            self._condition.notify()
+
+        return request
+
+    def cancel(self, request: LineRequest):
+        """Close request, which is no longer awaited"""
+        with self._condition:
+            if request in self._requests:
+                self._requests.remove(request)
+            request.close()
+
+    def has_input(self) -> bool:
+        """Check is input waiting to be read, without reading it"""
+        with self._condition:
+            if self._lines:
+                return True
+        try:
+            readers, _, _ = select([self.stream or sys.stdin], [], [], 0)
+        except (OSError, ValueError):
+            # Stream without file descriptor cannot be polled
+            return True
+        return bool(readers)
+
+    def readline(self) -> str:
+        """Wait for the next line of input"""
+        request = self.request()
+        try:
+            select([request], [], [])
+            return request.line  # type:ignore
+        finally:
+            self.cancel(request)
+
+    def _readline(self) -> str:
+        try:
+            return (self.stream or sys.stdin).readline()
+        except (OSError, ValueError):
+            # Stdin is closed or cannot be read
+            return ""
+
+    def _read_lines(self):
+        while True:
+            with self._condition:
+                while not self._requests:
+                    self._condition.wait()
+
+            line = self._readline()
+
+            with self._condition:
+                if self._requests:
+                    self._requests.popleft().answer(line)
+                elif line:
+                    self._lines.append(line)
+
+                if not line:
+                    # End of input ends all requests
+                    while self._requests:
+                        self._requests.popleft().answer(line)
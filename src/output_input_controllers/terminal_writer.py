@@ -0,0 +1,84 @@
+from typing import Dict, List, Optional, TextIO
+import threading
+import time
+import sys
+
+from colorama import Style
+
+
+class TerminalWriter:
+    """Collect output for terminal and write it in batches, at most
+    every `flush_interval` seconds or when it grows over `flush_size`
+    characters. Every output is wrapped in colour codes, which are
+    computed once per colour.
+
+    Output is written to `stream`, or to `sys.stdout` at the time of
+    writing if no stream is given.
+    """
+
+    FLUSH_SIZE = 64 * 1024
+
+    FLUSH_INTERVAL = 0.05
+
+    def __init__(
+        self,
+        flush_size: int = FLUSH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+        stream: Optional[TextIO] = None,
+    ):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.stream = stream
+
+        self._pieces: List[str] = []
+        self._size = 0
+        self._prefixes: Dict[str, str] = {}
+
+        # Keeps output of many threads in order
+        self._lock = threading.Lock()
+
+        self._has_output = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+
+    def _find_prefix(self, color: str) -> str:
+        if (prefix := self._prefixes.get(color)) is None:
+            prefix = self._prefixes[color] = Style.RESET_ALL + color
+        return prefix
+
+    def write(self, output: str, color: str = ""):
+        with self._lock:
+            self._pieces += (self._find_prefix(color), output, Style.RESET_ALL)
+            self._size += len(output)
+
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_periodically, daemon=True
+                )
+                self._writer.start()
+
+            is_full = self._size >= self.flush_size
+            self._has_output.set()
+
+        if is_full:
+            # Terminal slower than scripts slows down the writing thread
+            self.flush()
+
+    def _write_periodically(self):
+        while True:
+            self._has_output.wait()
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        """Write collected output to terminal"""
+        with self._lock:
+            self._has_output.clear()
+
+            if not self._pieces:
+                return
+
+            output, self._pieces, self._size = "".join(self._pieces), [], 0
+
+            stream = self.stream or sys.stdout
+            stream.write(output)
+            stream.flush()
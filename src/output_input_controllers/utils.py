@@ -1,19 +1,55 @@
+from typing import Any, Dict, IO, List, Optional
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
+import threading
+import atexit
+import json
+import time
 import sys
 import os
 
 from colorama import Fore, Style
 
+from src.output_input_controllers.terminal_reader import TerminalReader
+from src.output_input_controllers.terminal_writer import TerminalWriter
+from src.output_input_controllers.log_sink import LogSink
+from src.process import ResourceUsage
+from src.log_store import LogStore
+
 
 NOW = datetime.now().isoformat()
 
 INDENT = " " * 4
 
+EXIT_QUESTION = "Would You like to stop scripts execution? (y/[n]) "
+
 LOGS_DIR_NAME = "logs"
 
 LOGS_DIR_PATH = Path(sys.argv[0]).parent.joinpath(LOGS_DIR_NAME)
 
+EVENTS_LOG_NAME = "events_" + NOW + ".jsonl"
+
+PROFILE_NAME = "profile_" + NOW
+
+LOG_SINK = LogSink()
+
+# Write logs left in buffers, before app ends
+atexit.register(LOG_SINK.close)
+
+# Log stores of current run, by logs directory
+LOG_STORES: Dict[Path, LogStore] = {}
+
+_log_stores_lock = threading.Lock()
+
+TERMINAL_WRITER = TerminalWriter()
+
+# Show output left in buffer, before app ends
+atexit.register(TERMINAL_WRITER.flush)
+
+# User input is read in background, only when it is awaited
+TERMINAL_READER = TerminalReader()
+
 
 def create_logs_dir():
     os.mkdir(LOGS_DIR_PATH)
@@ -24,6 +60,7 @@ def format_log_name(script_name: str) -> str:
     return script_name + "_" + NOW + EXTENSION
 
 
+@lru_cache(maxsize=None)
 def create_log_name(script_name: str) -> str:
 
     extension_index = len(script_name) - script_name[::-1].find(".") - 1
@@ -40,21 +77,172 @@ def get_log_file_path(log_name: str) -> Path:
 
 
 def write_to_log(script_name: str, output: str):
+    """Buffer output in logs sink, which writes
+    it to script's log file in background"""
     log_name = create_log_name(script_name)
 
+    LOG_SINK.write(get_log_file_path(log_name), output)
+
+
+def close_log(script_name: str):
+    """Write buffered output of script to its log file and close it"""
+    LOG_SINK.close(get_log_file_path(create_log_name(script_name)))
+
+
+def close_logs():
+    """Write all buffered output to log files and close them"""
+    LOG_SINK.close()
+
+
+# Compact encoders, str one is the C accelerated function of json module
+ENCODE_JSON = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+ENCODE_JSON_STR = json.encoder.encode_basestring  # type:ignore
+
+
+def format_event_record(
+    script_name: Optional[str], stream: str, timestamp: Optional[float], data: Any
+) -> str:
+    """Format event as one compact JSON line, like:
+    {"script":"update_0.sh","stream":"stdout","timestamp":12.5,"data":"line\\n"}
+    Record is built by hand, because output events are by far the most
+    frequent and only theirs str payload needs encoding."""
+    return (
+        '{"script":'
+        + ("null" if script_name is None else ENCODE_JSON_STR(script_name))
+        + ',"stream":"'
+        + stream
+        + '","timestamp":'
+        + ("null" if timestamp is None else repr(timestamp))
+        + ',"data":'
+        + (ENCODE_JSON_STR(data) if isinstance(data, str) else ENCODE_JSON(data))
+        + "}\n"
+    )
+
+
+def get_events_log_path() -> Path:
+    return LOGS_DIR_PATH.joinpath(EVENTS_LOG_NAME)
+
+
+def get_profile_path() -> Path:
+    """Path of profile files, without suffixes of theirs formats"""
+    return LOGS_DIR_PATH.joinpath(PROFILE_NAME)
+
+
+def write_to_events_log(records: str):
+    """Buffer records in logs sink, which appends
+    them to events log file in background"""
+    LOG_SINK.write(get_events_log_path(), records)
+
+
+def close_events_log():
+    LOG_SINK.close(get_events_log_path())
+
+
+def get_log_store() -> LogStore:
+    """Store of current run in logs directory, created on first use"""
+    with _log_stores_lock:
+        if LOGS_DIR_PATH not in LOG_STORES:
+            LOG_STORES[LOGS_DIR_PATH] = LogStore(LOGS_DIR_PATH.joinpath(NOW))
+        return LOG_STORES[LOGS_DIR_PATH]
+
+
+def write_to_store(script_name: str, stream: str, output: str):
+    """Buffer output of script's stream in log store of current run"""
+    get_log_store().append(script_name, stream, output)
+
+
+def flush_log_store():
+    """Write buffered output to log store, where it can be read"""
+    get_log_store().flush()
+
+
+def close_log_stores():
+    with _log_stores_lock:
+        stores = list(LOG_STORES.values())
+        LOG_STORES.clear()
+
+    for store in stores:
+        store.close()
+
+
+# Write output left in log stores, before app ends
+atexit.register(close_log_stores)
+
+
+def get_summary_path() -> Path:
+    """Path of summary file, with suffix of logs codec"""
+    log_name = create_log_name("execution_summary")
+
+    return LOG_SINK.codec.find_path(get_log_file_path(log_name))
+
+
+def open_summary(mode: str) -> IO[bytes]:
     if not LOGS_DIR_PATH.exists():
         create_logs_dir()
 
-    with open(get_log_file_path(log_name), "a") as f:
-        f.write(output)
+    return LOG_SINK.codec.open(get_summary_path(), mode)
 
 
 def write_to_summary(output: str):
 
-    log_name = create_log_name("execution_summary")
+    with open_summary("wb") as f:
+        f.write(output.encode())
+
+
+def append_to_summary(output: str):
+
+    if not get_summary_path().exists():
+        output = "Scripts Summary:" + "\n" * 2 + output
+
+    with open_summary("ab") as f:
+        f.write(output.encode())
+
+
+def remove_old_logs(
+    max_age: Optional[float] = None, max_size: Optional[int] = None
+) -> List[Path]:
+    """Remove logs older than `max_age` seconds, then the oldest logs
+    until all of them take at most `max_size` bytes. Segment and index
+    of a log store are removed together. Return removed paths."""
+    if not LOGS_DIR_PATH.is_dir():
+        return []
+
+    logs: Dict[str, List[os.DirEntry]] = {}
+    for entry in os.scandir(LOGS_DIR_PATH):
+        if entry.is_file():
+            log_name = entry.name
+            for suffix in (LogStore.SEGMENT_SUFFIX, LogStore.INDEX_SUFFIX):
+                log_name = log_name.removesuffix(suffix)
+            logs.setdefault(log_name, []).append(entry)
+
+    # The oldest logs first, as (mtime, size, paths)
+    sorted_logs = sorted(
+        (
+            max(entry.stat().st_mtime for entry in entries),
+            sum(entry.stat().st_size for entry in entries),
+            [Path(entry.path) for entry in entries],
+        )
+        for entries in logs.values()
+    )
 
-    with open(get_log_file_path(log_name), "w") as f:
-        f.write(output)
+    now = time.time()
+    total_size = sum(size for _, size, _ in sorted_logs)
+    removed = []
+
+    for mtime, size, paths in sorted_logs:
+        is_too_old = max_age is not None and now - mtime > max_age
+        is_over_size = max_size is not None and total_size > max_size
+
+        if not is_too_old and not is_over_size:
+            break
+
+        for path in paths:
+            path.unlink(missing_ok=True)
+        removed += paths
+        total_size -= size
+
+    return removed
 
 
 def format_error_output(output: str) -> str:
@@ -84,42 +272,96 @@ def format_failure(script_name: str) -> str:
     return format_indent(f"Execution of {script_name} failed" + "\n")
 
 
+def format_skip(script_name: str) -> str:
+    return format_indent(
+        f"Execution of {script_name} skipped, it already succeed" + "\n"
+    )
+
+
+def format_size(size: int) -> str:
+    """Format bytes with unit, like 12.5M"""
+    for unit in ("", "K", "M"):
+        if size < 1024:
+            return f"{size:.1f}{unit}" if unit else f"{size}B"
+        size /= 1024  # type:ignore
+    return f"{size:.1f}G"
+
+
+def format_usage(usage: ResourceUsage) -> str:
+    """Format resources used by script, below its status"""
+    wall_time = "" if usage.wall_time is None else f", wall {usage.wall_time:.2f}s"
+    return format_indent(
+        INDENT
+        + f"cpu user {usage.user_time:.2f}s, system {usage.system_time:.2f}s"
+        + f", peak rss {format_size(usage.max_rss)}"
+        + f", read {format_size(usage.read_bytes)}"
+        + f", written {format_size(usage.write_bytes)}"
+        + f", context switches {usage.context_switches}"
+        + wall_time
+        + "\n"
+    )
+
+
+def format_timeout(timeout: float) -> str:
+    """Format deadline of script, which was killed by it"""
+    return format_indent(
+        INDENT + f"timed out after {timeout:g}s, its processes were killed" + "\n"
+    )
+
+
+def format_orphans(orphans: List[str]) -> str:
+    """Format descendants, which script left running"""
+    return format_indent(INDENT + "left running: " + ", ".join(orphans) + "\n")
+
+
 def format_indent(output: str) -> str:
     """Add tab before output"""
     return INDENT + output
 
 
 def print_(output: str):
-    sys.stdout.write(Style.RESET_ALL + output + Style.RESET_ALL)
-    sys.stdout.flush()
+    """Pass output to terminal writer, which shows it in batches"""
+    TERMINAL_WRITER.write(output)
 
 
 def print_info(output: str):
     """Print  informational notification in GREEN"""
-    print_(color_info(output))
+    TERMINAL_WRITER.write(output, Fore.GREEN)
 
 
 def print_error(output: str):
     """Print error notification in RED"""
-    print_(color_error(output))
+    TERMINAL_WRITER.write(output, Fore.RED)
 
 
 def print_success(output: str):
     """Print success notification in BLUE"""
-    print_(color_success(output))
+    TERMINAL_WRITER.write(output, Fore.BLUE)
+
+
+def flush_terminal():
+    """Show output collected by terminal writer at once,
+    before user is asked for input"""
+    TERMINAL_WRITER.flush()
 
 
 def ask_to_exit() -> bool:
     """If user would like to exit return True
     if not return False"""
 
-    question = "Would You like to stop scripts execution? (y/[n]) "
+    question = EXIT_QUESTION
 
     choices = {"yes": "y", "no": "n", "default": ""}
 
     while True:
 
-        anwser = input(question)
+        print_(question)
+        flush_terminal()
+
+        line = TERMINAL_READER.readline()
+        if not line:
+            raise EOFError("No answer, input is closed")
+        anwser = line.removesuffix("\n")
 
         if anwser in choices.values():
             return anwser == choices["yes"]
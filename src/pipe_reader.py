@@ -0,0 +1,66 @@
+"""
+Reader of script's pipe, which passes output in whole lines.
+"""
+import codecs
+import os
+
+
+class PipeReader:
+    """Read pipe in big chunks, without blocking, and split it into
+    whole lines. Unfinished line is carried to next read, unless it
+    grows over `CHUNK_SIZE` or pipe is closed."""
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, fd: int):
+        self.fd = fd
+        self.closed = False
+
+        os.set_blocking(fd, False)
+
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial_line = ""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _exc_type, _exc_value, _exc_traceback):
+        self.close()
+
+    def fileno(self) -> int:
+        return self.fd
+
+    def read(self) -> str:
+        """Read whole lines waiting in pipe. Return empty
+        str if no whole line is available."""
+        if self.closed:
+            return ""
+
+        try:
+            chunk = os.read(self.fd, self.CHUNK_SIZE)
+        except BlockingIOError:
+            return ""
+
+        if not chunk:
+            # All writers closed the pipe, pass what has left
+            self.closed = True
+            return self.flush() + self._decoder.decode(b"", final=True)
+
+        text = self._partial_line + self._decoder.decode(chunk)
+
+        if len(text) > self.CHUNK_SIZE:
+            # Line without end, like progress bar, is not held back forever
+            self._partial_line = ""
+            return text
+
+        lines_end = text.rfind("\n") + 1
+        self._partial_line = text[lines_end:]
+        return text[:lines_end]
+
+    def flush(self) -> str:
+        """Return unfinished line, which is carried to next read"""
+        partial_line, self._partial_line = self._partial_line, ""
+        return partial_line
+
+    def close(self):
+        os.close(self.fd)
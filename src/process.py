@@ -1,7 +1,59 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+from select import POLLIN, select
+from time import sleep
+import threading
+import platform
+import signal
+import struct
+import time
+import os
+
 import psutil
 
 
 class Process(psutil.Process):
+    # Kernel function in which process sleeps, when it reads terminal
+    TERMINAL_READ_CHANNEL = "n_tty_read"
+
+    # Generic kernel functions in which process sleeps, also when it
+    #   reads or polls terminal. Newer kernels show them for terminal read.
+    GENERIC_WAIT_CHANNELS = {
+        "wait_woken",
+        "do_select",
+        "do_sys_poll",
+        "poll_schedule_timeout",
+        "ep_poll",
+    }
+
+    # Kernel functions in which process sleeps, when it does
+    #   not read any file, like waiting for child or sleeping
+    IDLE_WAIT_CHANNELS = {
+        "do_wait",
+        "hrtimer_nanosleep",
+        "do_nanosleep",
+        "futex_wait_queue",
+        "futex_wait_queue_me",
+        "futex_do_wait",
+        "__do_sys_pause",
+        "sigsuspend",
+        "do_sigtimedwait",
+        "pipe_read",
+        "pipe_write",
+        "inet_csk_accept",
+        "sk_wait_data",
+        "unix_stream_read_generic",
+    }
+
+    # Numbers of system calls, which read or poll file descriptors, by machine
+    READ_SYSCALLS = {"x86_64": {0, 17, 19}, "aarch64": {63, 65, 67}}
+    POLL_SYSCALLS = {"x86_64": {7, 271}, "aarch64": {73}}
+    SELECT_SYSCALLS = {"x86_64": {23, 270}, "aarch64": {72}}
+    # Polled file descriptors are registered earlier, by other call
+    EPOLL_SYSCALLS = {"x86_64": {232, 281, 441}, "aarch64": {22, 441}}
+
+    # Polled file descriptors checked at most
+    MAX_POLLED_FDS = 64
+
     @classmethod
     def is_alive(cls, pid: int) -> bool:
         return psutil.pid_exists(pid)
@@ -15,7 +67,473 @@ class Process(psutil.Process):
             return cls(pid).status() == "sleeping"
         return False
 
+    @classmethod
+    def find_terminal(cls, pid: int) -> Optional[str]:
+        """Find path of terminal, which is standard input of process"""
+        try:
+            path = os.readlink(f"/proc/{pid}/fd/0")
+        except OSError:
+            return None
+        return path if path.startswith(("/dev/pts/", "/dev/tty")) else None
+
+    @classmethod
+    def is_waiting_for_terminal(cls, pid: int, terminal: str) -> Optional[bool]:
+        """Decide is process blocked on reading `terminal`, by its state,
+        wait channel, system call and standard input (Linux only).
+        Return None when it cannot be decided, like for process of
+        other user, or for unknown wait channel."""
+        try:
+            if not cls.is_sleeping(pid):
+                return False
+            with open(f"/proc/{pid}/wchan") as wchan:
+                # Symbols can be suffixed, like poll_schedule_timeout.constprop.0
+                channel = wchan.read().split(".")[0]
+            standard_input = os.readlink(f"/proc/{pid}/fd/0")
+        except (PermissionError, psutil.AccessDenied):
+            return None
+        except (OSError, psutil.Error):
+            # Process ended in the meantime
+            return False
+
+        if standard_input != terminal or channel in cls.IDLE_WAIT_CHANNELS:
+            return False
+        if channel == cls.TERMINAL_READ_CHANNEL:
+            return True
+        # Channel is not shown while process is being woken up
+        if channel in cls.GENERIC_WAIT_CHANNELS or channel == "0":
+            return cls.is_reading_stdin(pid)
+        return None
+
+    @classmethod
+    def is_reading_stdin(cls, pid: int) -> Optional[bool]:
+        """Decide is process blocked in system call, which reads
+        or polls its standard input (Linux on x86_64 and aarch64).
+        Return None when it cannot be decided, like for epoll, or
+        when system call or memory of process cannot be read."""
+        machine = platform.machine()
+        if machine not in cls.READ_SYSCALLS:
+            return None
+        try:
+            with open(f"/proc/{pid}/syscall") as syscall:
+                number, *args = syscall.read().split()
+            if number in ("running", "-1"):
+                return False
+            number, args = int(number), [int(arg, 16) for arg in args[:6]]
+
+            if number in cls.READ_SYSCALLS[machine]:
+                return args[0] == 0
+
+            if number in cls.POLL_SYSCALLS[machine]:
+                # Array of struct pollfd {int fd; short events; short revents;}
+                fds_count = min(args[1], cls.MAX_POLLED_FDS)
+                polled = cls._read_memory(pid, args[0], fds_count * 8)
+                return any(
+                    fd == 0 and events & POLLIN
+                    for fd, events, _ in struct.iter_unpack("ihh", polled)
+                )
+
+            if number in cls.SELECT_SYSCALLS[machine]:
+                # Standard input is the lowest bit of read fds set
+                return (
+                    args[0] > 0
+                    and args[1] != 0
+                    and bool(cls._read_memory(pid, args[1], 1)[0] & 1)
+                )
+
+            if number in cls.EPOLL_SYSCALLS[machine]:
+                return None
+        except PermissionError:
+            # Process of other user, or setuid one
+            return None
+        except (OSError, ValueError, IndexError, struct.error):
+            # Process ended or its memory cannot be read
+            return False
+        return False
+
+    @classmethod
+    def _read_memory(cls, pid: int, address: int, size: int) -> bytes:
+        with open(f"/proc/{pid}/mem", "rb") as memory:
+            memory.seek(address)
+            return memory.read(size)
+
+    @classmethod
+    def is_tree_waiting_for_terminal(cls, pid: int, terminal: str) -> Optional[bool]:
+        """Decide is any process from tree blocked on reading `terminal`.
+        Return None when it is not decided for some of them."""
+        waiting: Optional[bool] = False
+        for process in cls.find_tree(pid):
+            process_waiting = cls.is_waiting_for_terminal(process.pid, terminal)
+            if process_waiting:
+                return True
+            if process_waiting is None:
+                waiting = None
+        return waiting
+
     @classmethod
     def kill(cls, pid: int):
         if cls.is_alive(pid):
             cls(pid).terminate()
+
+    @classmethod
+    def find_tree(cls, pid: int) -> List[psutil.Process]:
+        """Find process and all its descendants. Tree has to be found
+        before it is stopped, children of stopped process leave it."""
+        try:
+            root = psutil.Process(pid)
+            return [root, *root.children(recursive=True)]
+        except psutil.Error:
+            return []
+
+    @classmethod
+    def find_marked(cls, name: str, value: str, since: float) -> List[psutil.Process]:
+        """Find processes created after `since` timestamp, which have
+        `name` environment variable set to `value`. Variable is inherited
+        by all descendants, even the ones which left the tree, unless
+        they clear theirs environment, like sudo does."""
+        marked = []
+        for process in psutil.process_iter(["create_time"]):
+            # Reading environment is expensive, older processes are skipped
+            if (process.info["create_time"] or 0) < since:
+                continue
+            try:
+                if process.environ().get(name) == value:
+                    marked.append(process)
+            except psutil.Error:
+                # Process ended, or belongs to other user
+                continue
+        return marked
+
+    @classmethod
+    def is_group_running(cls, pgid: int) -> bool:
+        """Check is any process of group still running,
+        without iterating over all processes"""
+        try:
+            os.killpg(pgid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            # Group exists, but is owned by other user
+            pass
+        return True
+
+    @classmethod
+    def has_stopped(cls, process: psutil.Process) -> bool:
+        """Check has process stopped, zombie has stopped already"""
+        try:
+            return not process.is_running() or process.status() == psutil.STATUS_ZOMBIE
+        except psutil.Error:
+            return True
+
+    @classmethod
+    def _wait_for_stop(
+        cls, processes: List[psutil.Process], timeout: float
+    ) -> List[psutil.Process]:
+        """Wait until processes stop, return the ones still running.
+        Processes are not reaped, so theirs parents can collect them."""
+        deadline = time.monotonic() + timeout
+        interval = 0.001
+        while True:
+            processes = cls.filter_running(processes)
+            if not processes or time.monotonic() >= deadline:
+                return processes
+            sleep(interval)
+            interval = min(interval * 2, 0.1)
+
+    @classmethod
+    def kill_all(
+        cls, processes: Iterable[psutil.Process], timeout: float
+    ) -> List[psutil.Process]:
+        """Terminate processes by SIGTERM, and kill the ones still
+        running after `timeout` seconds by SIGKILL. Return processes
+        which survived both signals."""
+        processes = list(processes)
+        for signal_number in (signal.SIGTERM, signal.SIGKILL):
+            cls.signal_all(processes, signal_number)
+            processes = cls._wait_for_stop(processes, timeout)
+        return processes
+
+    @classmethod
+    def signal_all(cls, processes: Iterable[psutil.Process], signal_number: int):
+        for process in processes:
+            try:
+                process.send_signal(signal_number)
+            except psutil.Error:
+                # Process ended in the meantime
+                continue
+
+    @classmethod
+    def filter_running(
+        cls, processes: Iterable[psutil.Process]
+    ) -> List[psutil.Process]:
+        return [process for process in processes if not cls.has_stopped(process)]
+
+    @classmethod
+    def describe(cls, processes: Iterable[psutil.Process]) -> List[str]:
+        """Describe running processes by name and PID, like: dbus-launch (1234)"""
+        descriptions = []
+        for process in processes:
+            try:
+                descriptions.append(f"{process.name()} ({process.pid})")
+            except psutil.Error:
+                continue
+        return descriptions
+
+    @classmethod
+    def find_reaped_usage(cls, pid: int) -> Optional["ResourceUsage"]:
+        """Resources used by children, which process already reaped,
+        and theirs descendants reaped by them. Process's own I/O
+        cannot be told apart from I/O of its children. Return None
+        if process is gone or its usage cannot be read."""
+        try:
+            process = cls(pid)
+            with process.oneshot():
+                cpu_times = process.cpu_times()
+                io_counters = process.io_counters()  # type:ignore
+        except psutil.Error:
+            return None
+
+        return ResourceUsage(
+            user_time=cpu_times.children_user,
+            system_time=cpu_times.children_system,
+            read_bytes=io_counters.read_bytes,
+            write_bytes=io_counters.write_bytes,
+        )
+
+
+class ExitWatcher:
+    """Notify about process exit by file descriptor, which becomes
+    readable when process is gone, so exit can be awaited by `select`
+    next to process's streams.
+
+    On Linux >= 5.3 pidfd is used. On older kernels process is
+    awaited by a thread, which writes to a pipe when process exits.
+    """
+
+    def __init__(self, pid: int, use_pidfd: bool = True):
+        self.pid = pid
+        self._exited = False
+        self._pidfd: Optional[int] = None
+        self._pipe: Optional[tuple] = None
+
+        if use_pidfd and hasattr(os, "pidfd_open"):
+            try:
+                self._pidfd = os.pidfd_open(pid)
+            except ProcessLookupError:
+                self._exited = True
+                return
+            except OSError:
+                # Kernel does not support pidfd
+                pass
+
+        if self._pidfd is None:
+            self._pipe = os.pipe()
+            threading.Thread(target=self._wait_for_exit, daemon=True).start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _exc_type, _exc_value, _exc_traceback):
+        self.close()
+
+    def fileno(self) -> int:
+        if self._pidfd is not None:
+            return self._pidfd
+        if self._pipe is not None:
+            return self._pipe[0]
+        # Process was gone before watching, use always readable descriptor
+        self._pipe = os.pipe()
+        os.close(self._pipe[1])
+        return self._pipe[0]
+
+    def _wait_for_exit(self):
+        try:
+            # Wait without reaping, so process owner can still collect it
+            os.waitid(os.P_PID, self.pid, os.WEXITED | os.WNOWAIT)
+        except ChildProcessError:
+            # Process is not our child, it cannot be awaited by the kernel
+            self._poll_for_exit()
+
+        # Closed pipe becomes readable for the watcher
+        os.close(self._pipe[1])  # type:ignore
+
+    def _poll_for_exit(self, max_interval: float = 0.04):
+        interval = 0.0001
+        try:
+            process = psutil.Process(self.pid)
+            while process.status() != psutil.STATUS_ZOMBIE:
+                sleep(interval)
+                interval = min(interval * 2, max_interval)
+        except psutil.NoSuchProcess:
+            pass
+
+    def has_exited(self, timeout: Union[int, float] = 0) -> bool:
+        """Check is process gone, waiting at most `timeout` seconds"""
+        if not self._exited:
+            readers, _, _ = select([self], [], [], timeout)
+            self._exited = bool(readers)
+        return self._exited
+
+    def close(self):
+        if self._pidfd is not None:
+            os.close(self._pidfd)
+            self._pidfd = None
+        if self._pipe is not None:
+            os.close(self._pipe[0])
+            self._pipe = None
+
+
+class ResourceUsage(NamedTuple):
+    """Resources used by script's process tree. Times are
+    in seconds, RSS and I/O (of storage) are in bytes."""
+
+    user_time: float = 0.0
+    system_time: float = 0.0
+    max_rss: int = 0
+    read_bytes: int = 0
+    write_bytes: int = 0
+    context_switches: int = 0
+    wall_time: Optional[float] = None
+
+    @classmethod
+    def from_rusage(cls, rusage) -> "ResourceUsage":  # type:ignore
+        """Convert usage reported by `os.wait4` or `resource.getrusage`"""
+        # Peak RSS is left out, child forked by the app inherits
+        #   the app's peak, which is kept after exec
+        return cls(
+            user_time=rusage.ru_utime,
+            system_time=rusage.ru_stime,
+            # Reported in 512 bytes blocks
+            read_bytes=rusage.ru_inblock * 512,
+            write_bytes=rusage.ru_oublock * 512,
+            context_switches=rusage.ru_nvcsw + rusage.ru_nivcsw,
+        )
+
+    def subtract(self, other: "ResourceUsage") -> "ResourceUsage":
+        """Find usage of counters, which grew since `other`"""
+        return self._replace(
+            user_time=self.user_time - other.user_time,
+            system_time=self.system_time - other.system_time,
+            read_bytes=self.read_bytes - other.read_bytes,
+            write_bytes=self.write_bytes - other.write_bytes,
+            context_switches=self.context_switches - other.context_switches,
+        )
+
+    def combine(self, other: "ResourceUsage") -> "ResourceUsage":
+        """Combine two measurements of the same processes, each of
+        them could miss some of the processes, so the higher is kept"""
+        return self._replace(
+            **{
+                field: max(getattr(self, field), getattr(other, field))
+                for field in self._fields
+                if field != "wall_time"
+            }
+        )
+
+
+class ResourceMonitor:
+    """Sample resources used by process and all its descendants,
+    including the ones which left its tree, like daemons.
+
+    The first sample is taken at once, then at most once per
+    `interval`, so short living processes and short peaks of memory
+    are missed. Exact usage of processes reaped by theirs parents
+    is known from rusage after script exit, see `ResourceUsage.combine`.
+    """
+
+    SAMPLE_INTERVAL = 1.0
+
+    def __init__(self, pid: int, interval: float = SAMPLE_INTERVAL):
+        self.pid = pid
+        self.interval = interval
+
+        # The latest usage of every seen process, by (PID, creation time),
+        #   processes are kept after exit
+        self._processes: Dict[Tuple[int, float], ResourceUsage] = {}
+        self._max_rss = 0
+
+        # Processes in tree at the latest sample
+        self._tree: Set[Tuple[int, float]] = set()
+        # Some descendant was still running, once it disappeared from tree
+        self.has_lost_processes = False
+        self._sampled_at = 0.0
+
+        self.sample()
+
+    def sample(self):
+        """Add usage of all processes which are in tree now"""
+        self._sampled_at = time.monotonic()
+        try:
+            root = Process(self.pid)
+            processes = [root, *root.children(recursive=True)]
+        except psutil.Error:
+            # Script is already gone
+            return
+
+        rss = 0
+        tree = set()
+        for process in processes:
+            try:
+                with process.oneshot():
+                    key = (process.pid, process.create_time())
+                    cpu_times = process.cpu_times()
+                    memory_info = process.memory_info()
+                    io_counters = process.io_counters()  # type:ignore
+                    context_switches = process.num_ctx_switches()
+            except psutil.Error:
+                # Process ended in the meantime
+                continue
+
+            rss += memory_info.rss
+            tree.add(key)
+            self._processes[key] = ResourceUsage(
+                user_time=cpu_times.user,
+                system_time=cpu_times.system,
+                max_rss=memory_info.rss,
+                read_bytes=io_counters.read_bytes,
+                write_bytes=io_counters.write_bytes,
+                context_switches=context_switches.voluntary
+                + context_switches.involuntary,
+            )
+
+        # Memory of the tree is taken at once, other counters only grow
+        self._max_rss = max(self._max_rss, rss)
+
+        # Processes exit rarely, so checking them is cheap
+        for pid, _ in self._tree - tree:
+            if pid != self.pid and psutil.pid_exists(pid):
+                self.has_lost_processes = True
+        self._tree = tree
+
+    def sample_if_due(self):
+        if time.monotonic() - self._sampled_at >= self.interval:
+            self.sample()
+
+    def find_running(self) -> List[psutil.Process]:
+        """Find seen descendants of process, which are still running"""
+        running = []
+        # Keys are copied at once, tree can be killed by other thread
+        for pid, create_time in list(self._processes):
+            if pid == self.pid:
+                continue
+            try:
+                process = psutil.Process(pid)
+                # PID could be reused by other process
+                if process.create_time() != create_time:
+                    continue
+            except psutil.Error:
+                continue
+            if not Process.has_stopped(process):
+                running.append(process)
+        return running
+
+    def find_usage(self) -> ResourceUsage:
+        """Sum the latest usage of all seen processes"""
+        usages = list(self._processes.values())
+        return ResourceUsage(
+            user_time=sum(usage.user_time for usage in usages),
+            system_time=sum(usage.system_time for usage in usages),
+            max_rss=self._max_rss,
+            read_bytes=sum(usage.read_bytes for usage in usages),
+            write_bytes=sum(usage.write_bytes for usage in usages),
+            context_switches=sum(usage.context_switches for usage in usages),
+        )
@@ -0,0 +1,223 @@
+"""
+Profile of the orchestrator process, separated from its scripts.
+"""
+from typing import Any, Dict, List, Optional
+from collections import Counter
+from pathlib import Path
+import threading
+import resource
+import signal
+import cProfile
+import pstats
+import time
+import sys
+import os
+
+
+class ThreadProfile(cProfile.Profile):
+    """cProfile's profile of one thread, timed by thread's CPU time"""
+
+    def __init__(self):
+        super().__init__(time.thread_time)
+
+    def create_stats(self):
+        # Profile of other thread, which still runs, is not disabled.
+        #   Its calls in progress would be timed by clock of current
+        #   thread, so only finished calls are collected.
+        self.snapshot_stats()
+
+
+class Profiler:
+    """Profile threads of the app and save two files next to `path`:
+            <path>.txt          run time, CPU time of the app and of its
+                                scripts, and the hottest functions of the app
+            <path>.collapsed    CPU time of the app by call stack, in format
+                                of flamegraph.pl, speedscope and Perfetto
+
+    Functions are profiled by cProfile, one profile per thread, with
+    thread's CPU time as timer, so waiting for scripts does not count.
+    Stacks are sampled by SIGPROF, which is sent every time the app uses
+    `sample_interval` of CPU time. Each thread's stack is weighted by CPU
+    time the thread used since previous sample (Linux only). Profiling
+    is done in the app, so its CPU time includes profiling overhead.
+
+    Scripts run in other processes, their CPU time is counted from
+    resources usage of finished children, so profiler has to be stopped
+    after shells are terminated. Profiler has to be started and stopped
+    by the main thread, which handles signals.
+    """
+
+    REPORT_SUFFIX = ".txt"
+
+    STACKS_SUFFIX = ".collapsed"
+
+    SAMPLE_INTERVAL = 0.005
+
+    # Functions shown in report
+    REPORT_LIMIT = 40
+
+    def __init__(self, path: Path, sample_interval: float = SAMPLE_INTERVAL):
+        self.report_path = path.with_name(path.name + self.REPORT_SUFFIX)
+        self.stacks_path = path.with_name(path.name + self.STACKS_SUFFIX)
+        self.sample_interval = sample_interval
+
+        self._profiles: List[ThreadProfile] = []
+        self._profiles_lock = threading.Lock()
+
+        # Nanoseconds of CPU time by collapsed stack
+        self._stacks: "Counter[str]" = Counter()
+        # CPU time of threads at previous sample, by thread ident
+        self._cpu_times: Dict[int, int] = {}
+        self._signal_handler: Any = None
+
+        self._started_at = 0.0
+        self._usage_at_start: tuple = ()
+
+        # Seconds of user and system CPU time, known when profiler is stopped
+        self.run_time = 0.0
+        self.orchestrator_usage: Dict[str, float] = {}
+        self.scripts_usage: Dict[str, float] = {}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, _exc_type, _exc_value, _exc_traceback):
+        self.stop()
+        self.save()
+
+    def _profile_thread(self, *_):
+        """Start profile of current thread. Set by `threading.setprofile`,
+        it is called once by thread's first event and replaced by profile."""
+        if threading.current_thread() is not threading.main_thread():
+            # SIGPROF is delivered to main thread, which samples at once,
+            #   even when it waits for other threads
+            signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGPROF})
+
+        profile = ThreadProfile()
+        with self._profiles_lock:
+            self._profiles.append(profile)
+        profile.enable()
+
+    def start(self):
+        self._started_at = time.perf_counter()
+        self._usage_at_start = (
+            resource.getrusage(resource.RUSAGE_SELF),
+            resource.getrusage(resource.RUSAGE_CHILDREN),
+        )
+
+        # Profile of current thread is the first one
+        self._profile_thread()
+        threading.setprofile(self._profile_thread)
+
+        self._signal_handler = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.sample_interval, self.sample_interval)
+
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, self._signal_handler)
+
+        threading.setprofile(None)  # type:ignore
+        with self._profiles_lock:
+            self._profiles[0].disable()
+
+        self.run_time = time.perf_counter() - self._started_at
+
+        self_at_start, children_at_start = self._usage_at_start
+        self.orchestrator_usage = self._find_usage(
+            self_at_start, resource.getrusage(resource.RUSAGE_SELF)
+        )
+        self.scripts_usage = self._find_usage(
+            children_at_start, resource.getrusage(resource.RUSAGE_CHILDREN)
+        )
+
+    @classmethod
+    def _find_usage(
+        cls, start: resource.struct_rusage, end: resource.struct_rusage
+    ) -> Dict[str, float]:
+        return {
+            "user": end.ru_utime - start.ru_utime,
+            "system": end.ru_stime - start.ru_stime,
+        }
+
+    @classmethod
+    def _read_thread_cpu_time(cls, native_id: int) -> Optional[int]:
+        """CPU time of thread in nanoseconds, None if it is unknown"""
+        try:
+            with open(f"/proc/self/task/{native_id}/schedstat") as schedstat:
+                return int(schedstat.read().split()[0])
+        except (OSError, ValueError, IndexError):
+            return None
+
+    @classmethod
+    def _collapse(cls, thread_name: str, frame) -> str:  # type:ignore
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(
+                f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            )
+            frame = frame.f_back
+        frames.append(thread_name)
+        return ";".join(reversed(frames))
+
+    def _sample(self, _signal_number: int, frame):  # type:ignore
+        """Add stacks of threads which used CPU since previous sample"""
+        main_thread = threading.main_thread()
+        frames = sys._current_frames()
+        # Stack of main thread is the one interrupted by signal
+        frames[main_thread.ident] = frame  # type:ignore
+
+        for thread in threading.enumerate():
+            if thread.ident not in frames:
+                continue
+
+            cpu_time = self._read_thread_cpu_time(thread.native_id)  # type:ignore
+            if cpu_time is None:
+                continue
+
+            # Time used before the first sample is not known by stack
+            used = cpu_time - self._cpu_times.get(thread.ident, cpu_time)
+            self._cpu_times[thread.ident] = cpu_time
+            if used > 0:
+                self._stacks[self._collapse(thread.name, frames[thread.ident])] += used
+
+        # Sampling is not counted as work of interrupted stack
+        cpu_time = self._read_thread_cpu_time(main_thread.native_id)  # type:ignore
+        if cpu_time is not None:
+            self._cpu_times[main_thread.ident] = cpu_time  # type:ignore
+
+    def _format_usage(self, name: str, usage: Dict[str, float]) -> str:
+        total = usage["user"] + usage["system"]
+        share = total / self.run_time * 100 if self.run_time else 0.0
+        return (
+            f"{name:<20}{total:>10.3f} s  {share:>6.1f}% of run time"
+            + f"  (user {usage['user']:.3f} s, system {usage['system']:.3f} s)\n"
+        )
+
+    def save(self):
+        self.report_path.parent.mkdir(parents=True, exist_ok=True)
+
+        bottleneck = (
+            "orchestrator"
+            if sum(self.orchestrator_usage.values()) > sum(self.scripts_usage.values())
+            else "scripts"
+        )
+
+        with open(self.report_path, "w") as report:
+            report.write(f"{'Run time':<20}{self.run_time:>10.3f} s\n")
+            report.write(
+                self._format_usage("Orchestrator CPU", self.orchestrator_usage)
+            )
+            report.write(self._format_usage("Scripts CPU", self.scripts_usage))
+            report.write(f"Bottleneck: {bottleneck}\n\n")
+
+            with self._profiles_lock:
+                stats = pstats.Stats(*self._profiles, stream=report)
+            stats.sort_stats(pstats.SortKey.TIME).print_stats(self.REPORT_LIMIT)
+
+        with open(self.stacks_path, "w") as stacks:
+            for stack, nanoseconds in self._stacks.items():
+                # Counted in microseconds, as flamegraph expects integers
+                if microseconds := nanoseconds // 1000:
+                    stacks.write(f"{stack} {microseconds}\n")
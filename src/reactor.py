@@ -0,0 +1,53 @@
+"""
+Event loop, which waits until any of script's streams is ready.
+"""
+from typing import Any, Callable, Optional, Union
+import selectors
+
+
+class Reactor:
+    """Wait on many files at once and call handler of the file,
+    which is ready for reading. On Linux epoll is used, so
+    waiting for events does not consume CPU time."""
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _exc_type, _exc_value, _exc_traceback):
+        self.close()
+
+    def register(self, file: Any, handler: Callable[[], Any]) -> bool:
+        """Call handler each time file is ready for reading. Return False
+        if file cannot be awaited, like regular file or object without
+        file descriptor."""
+        try:
+            self._selector.register(file, selectors.EVENT_READ, handler)
+        except (ValueError, OSError):
+            return False
+        return True
+
+    def unregister(self, file: Any):
+        self._selector.unregister(file)
+
+    def is_registered(self, file: Any) -> bool:
+        try:
+            self._selector.get_key(file)
+        except (KeyError, ValueError):
+            return False
+        return True
+
+    def run_once(self, timeout: Optional[Union[int, float]] = None) -> int:
+        """Wait at most `timeout` seconds for ready files and call
+        theirs handlers. Return number of handled files."""
+        events = self._selector.select(timeout)
+
+        for key, _mask in events:
+            key.data()
+
+        return len(events)
+
+    def close(self):
+        self._selector.close()
@@ -0,0 +1,127 @@
+"""
+Scheduling scripts by dependencies declared in their headers.
+"""
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Set
+
+from src.exceptions import DependencyCycleError, DependencyNotFound
+from src.module import Module
+from src.script import Script
+
+
+class DependencyGraph:
+    """Directed acyclic graph of scripts. Script declares scripts it
+    depends on in header comment, for example:
+            # needs: install_xorg_1.sh
+
+    Script without such annotation needs all scripts with
+    lower numbers, like in numbered order."""
+
+    def __init__(self, module: Module):
+        self.scripts: Dict[str, Script] = {str(script): script for script in module}
+        self.dependencies: Dict[str, Set[str]] = self._find_dependencies()
+        self.dependents: Dict[str, Set[str]] = self._find_dependents()
+
+        self.check_cycles()
+
+    def __iter__(self):
+        return iter(self.scripts.values())
+
+    def _find_dependencies(self) -> Dict[str, Set[str]]:
+        dependencies: Dict[str, Set[str]] = {}
+
+        for name, script in self.scripts.items():
+            if script.is_annotated():
+                dependencies[name] = set(script.find_dependencies())
+            else:
+                number = script.name.find_script_number()
+                dependencies[name] = {
+                    other_name
+                    for other_name, other in self.scripts.items()
+                    if other.name.find_script_number() < number
+                }
+
+            for dependency in dependencies[name]:
+                if dependency not in self.scripts:
+                    raise DependencyNotFound(
+                        f"{name} needs {dependency} which is not in the module"
+                    )
+
+        return dependencies
+
+    def _find_dependents(self) -> Dict[str, Set[str]]:
+        dependents: Dict[str, Set[str]] = {name: set() for name in self.scripts}
+
+        for name, dependencies in self.dependencies.items():
+            for dependency in dependencies:
+                dependents[dependency].add(name)
+
+        return dependents
+
+    def find_ready_scripts(self, done: Set[str]) -> List[Script]:
+        """Find not done scripts which have all dependencies done"""
+        return [
+            script
+            for name, script in self.scripts.items()
+            if name not in done and self.dependencies[name] <= done
+        ]
+
+    def check_cycles(self):
+        """Order scripts topologically, if some scripts are
+        left unordered they are part of a cycle."""
+        waiting = {name: len(deps) for name, deps in self.dependencies.items()}
+        ready = [name for name, count in waiting.items() if count == 0]
+
+        while ready:
+            name = ready.pop()
+            for dependent in self.dependents[name]:
+                waiting[dependent] -= 1
+                if waiting[dependent] == 0:
+                    ready.append(dependent)
+
+        if cycle := sorted(name for name, count in waiting.items() if count > 0):
+            raise DependencyCycleError(
+                f"Dependencies of {', '.join(cycle)} create a cycle"
+            )
+
+
+class Scheduler:
+    """Execute every script as soon as all its dependencies are done,
+    on a bounded pool of workers."""
+
+    def __init__(self, graph: DependencyGraph, jobs: int = 1):
+        if jobs < 1:
+            raise ValueError("jobs has to be positive number")
+
+        self.graph = graph
+        self.jobs = jobs
+
+    def run(self, execute: Callable[[Script], None]):
+        """Pass scripts to `execute` in dependencies order"""
+        waiting = {name: len(deps) for name, deps in self.graph.dependencies.items()}
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            running = {
+                pool.submit(execute, script): str(script)
+                for script in self.graph.find_ready_scripts(set())
+            }
+
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                ready = set()
+
+                for future in done:
+                    name = running.pop(future)
+                    # Re-raise errors (and exit requests) from script's worker
+                    future.result()
+
+                    for dependent in self.graph.dependents[name]:
+                        waiting[dependent] -= 1
+                        if waiting[dependent] == 0:
+                            ready.add(dependent)
+
+                # Keep scripts order among scripts ready at the same time
+                for script in self.graph:
+                    if str(script) in ready:
+                        running[pool.submit(execute, script)] = str(script)
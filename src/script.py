@@ -1,4 +1,6 @@
+from typing import Dict, List, Optional
 from pathlib import Path
+import hashlib
 import re
 
 from src.exceptions import FileNotFound, NoShebangError
@@ -48,11 +50,33 @@ class Script:
 
     SHEBANG_REGEX = re.compile(r"#![/\\](?:(?!\.\s+)\S)+(\S)?(\.)?")
 
-    def __init__(self, name: str, folder_path: Path):
+    ANNOTATION_REGEX = re.compile(r"#\s*(?P<key>[\w-]+)\s*:\s*(?P<value>.*?)\s*$")
+
+    DEPENDENCIES_SEPARATOR_REGEX = re.compile(r"[\s,]+")
+
+    TIMEOUT_REGEX = re.compile(r"(?P<time>\d+(?:\.\d+)?)\s*(?P<unit>[smhd]?)", re.I)
+
+    TIMEOUT_UNITS = {"": 1, "s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+
+    def __init__(
+        self,
+        name: str,
+        folder_path: Path,
+        shebang_path: Optional[str] = None,
+        annotations: Optional[Dict[str, str]] = None,
+        content_hash: Optional[str] = None,
+    ):
+        """Shebang, annotations and hash can be passed
+        from a cache, to avoid reading the script again."""
         self.name = _ScriptName(name)
         self.path = folder_path.joinpath(name)
 
-        if not self.path.exists():
+        self._shebang_path = shebang_path
+        self._annotations = annotations
+        self._content_hash = content_hash
+
+        # Cached script was already found by `stat`
+        if content_hash is None and not self.path.exists():
             raise FileNotFound(f"{self.path} not found")
 
     def __iter__(self):
@@ -86,16 +110,85 @@ class Script:
         """Decide is line containing a shebang"""
         return bool(cls._find_shebang(line))
 
-    def find_shebang_path(self) -> str:
+    def read_shebang_path(self) -> str:
         """Iterate script line by line to find shebang, when it is
         found extract interpreter path from it.
 
         Shebang example:
                 #!/bin/bash
 
-        If no shebang is found raise NoShebangError.
+        If no shebang is found return empty str.
         """
         for line in self:
             if self._is_shebang(line):
                 return self._extract_shebang_path(line)
-        raise NoShebangError(f"No shebang found in {self.name}")
+        return ""
+
+    def find_shebang_path(self) -> str:
+        """Find interpreter path, reading script only once.
+        If no shebang is found raise NoShebangError."""
+        if self._shebang_path is None:
+            self._shebang_path = self.read_shebang_path()
+
+        if not self._shebang_path:
+            raise NoShebangError(f"No shebang found in {self.name}")
+        return self._shebang_path
+
+    def find_annotations(self) -> Dict[str, str]:
+        """Collect annotations from comments in script's header.
+        Header ends on first line which is not a comment.
+
+        Annotation example:
+                # needs: install_xorg_1.sh
+        """
+        if self._annotations is not None:
+            return self._annotations
+
+        annotations = {}
+
+        for line in self:
+            if not line.strip():
+                continue
+            if not line.startswith("#"):
+                break
+            if annotation := self.ANNOTATION_REGEX.match(line):
+                annotations[annotation["key"].lower()] = annotation["value"]
+
+        self._annotations = annotations
+        return annotations
+
+    def find_dependencies(self) -> List[str]:
+        """Find names of scripts declared in `needs` annotation"""
+        needs = self.find_annotations().get("needs", "")
+        return [name for name in self.DEPENDENCIES_SEPARATOR_REGEX.split(needs) if name]
+
+    def is_interactive(self) -> bool:
+        """Decide can script read user input. Script
+        marked by `interactive` annotation, like:
+                # interactive: no
+        is executed without a terminal"""
+        interactive = self.find_annotations().get("interactive", "yes")
+        return interactive.lower() not in ("no", "false")
+
+    def find_timeout(self) -> Optional[float]:
+        """Find seconds script can run, declared in `timeout`
+        annotation with optional s, m, h or d unit, like:
+                # timeout: 30m
+        If timeout is missing or invalid return None."""
+        timeout = self.find_annotations().get("timeout", "")
+        if match := self.TIMEOUT_REGEX.fullmatch(timeout):
+            seconds = float(match["time"]) * self.TIMEOUT_UNITS[match["unit"].lower()]
+            return seconds or None
+        return None
+
+    def is_annotated(self) -> bool:
+        """Decide is script declaring its dependencies"""
+        return "needs" in self.find_annotations()
+
+    def find_content_hash(self) -> str:
+        """Create SHA-256 hash of script content, which
+        changes when the script is modified"""
+        if self._content_hash is None:
+            with open(self.path, "rb") as script_file:
+                self._content_hash = hashlib.sha256(script_file.read()).hexdigest()
+        return self._content_hash
@@ -1,80 +1,216 @@
-from typing import Optional
-from select import select
-import sys
+from typing import Any, List, NamedTuple, Optional
+import subprocess
+import signal
+import shlex
+import time
+import os
 
+import psutil
+
+from src.output_input_controllers.events import (
+    Event,
+    ORPHANS,
+    STATUS,
+    STDERR,
+    STDOUT,
+    TIMEOUT,
+    TIMING,
+    USAGE,
+)
+from src.output_input_controllers.terminal_reader import LineRequest
 from src.output_input_controllers.base import OutputInputController
-from src.temporary_errors_buffer import TempErrorFile
-from src.exceptions import ShellNotSpawned
-from src.process import Process
+from src.output_input_controllers.utils import TERMINAL_READER
+from src.temporary_errors_buffer import ErrorsBuffer
+from src.exceptions import NoExitCodeError, NoPidError, ShellNotSpawned
+from src.control_channel import ControlChannel
+from src.pipe_reader import PipeReader
+from src.tracer import TRACER
+from src.ledger import RunLedger
+from src.process import ExitWatcher, Process, ResourceMonitor, ResourceUsage
+from src.reactor import Reactor
 from src.shell import SubShell
 from src.script import Script
 
 
+class PendingKill(NamedTuple):
+    """Processes of script signalled to stop, which
+    are checked again once `deadline` passes"""
+
+    processes: List[psutil.Process]
+    signal_number: int
+    deadline: float
+
+
 class ScriptExecutor:
+    # How often errors buffer is checked, when streams are idle
+    ERRORS_CHECK_INTERVAL = 0.5
+
+    # How long subshell has to report its PID or exit code
+    CONTROL_RECORD_TIMEOUT = 5
+
+    # How long errors are awaited after script exit
+    ERRORS_CLOSE_TIMEOUT = 0.5
+
+    # How long output left after script exit is read at most, background
+    #   processes of script could write it endlessly
+    OUTPUT_DRAIN_TIMEOUT = 1.0
+
+    # How long processes of timed out script have to stop
+    #   after SIGTERM, before they are killed by SIGKILL
+    KILL_TIMEOUT = 5
+
+    # How often processes signalled to stop are checked
+    KILL_CHECK_INTERVAL = 0.05
+
+    # Environment variable, which marks all descendants of script
+    SCRIPT_ID_VARIABLE = "SCRIPT_ORCHESTRATOR_ID"
+
+    # How long output has to be quiet, before script is checked for
+    #   waiting on terminal input. Interval doubles up to the max one,
+    #   while script does not wait.
+    INPUT_CHECK_INTERVAL = 0.05
+
+    INPUT_CHECK_MAX_INTERVAL = 1.0
+
     def __init__(
         self,
         script: Script,
         shell: SubShell,
         oi_controller: OutputInputController,
-        errors_buffer: TempErrorFile,
+        errors_buffer: ErrorsBuffer,
+        ledger: Optional[RunLedger] = None,
+        timeout: Optional[float] = None,
     ):
-        if not isinstance(script, Script):
-            raise TypeError("script has to be Script type")
+        self._initialize(script, oi_controller, ledger, timeout)
 
         if not isinstance(shell, SubShell):
             raise TypeError("shell has to subclass of SubShell")
 
-        if not isinstance(oi_controller, OutputInputController):
-            raise TypeError("oi_controller has to be subclass of OutputInputController")
-
         if not shell.process:
             raise ShellNotSpawned(f"Passed not spawned shell for {script} execution")
 
+        self.shell: Optional[SubShell] = shell
+        self.errors_buffer: Optional[ErrorsBuffer] = errors_buffer
+
+    def _initialize(
+        self,
+        script: Script,
+        oi_controller: OutputInputController,
+        ledger: Optional[RunLedger],
+        timeout: Optional[float],
+    ):
+        """Set up state shared by executors of all kinds"""
+        if not isinstance(script, Script):
+            raise TypeError("script has to be Script type")
+
+        if not isinstance(oi_controller, OutputInputController):
+            raise TypeError("oi_controller has to be subclass of OutputInputController")
+
         self.script = script
-        self.shell = shell
         self.oi_controller = oi_controller
-        self.errors_buffer = errors_buffer
+        self.ledger = ledger
         self._pid: Optional[int] = None
         self._exit_code: Optional[int] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._events: List[Event] = []
+        self.resource_usage: Optional[ResourceUsage] = None
+        self._resource_monitor: Optional[ResourceMonitor] = None
+        self._reaped_usage_at_start: Optional[ResourceUsage] = ResourceUsage()
+        # Timeout annotated in script overrides the default one
+        self.timeout = script.find_timeout() or timeout
+        self.timed_out = False
+        self.orphans: List[str] = []
+        self._deadline: Optional[float] = None
+        self._pending_kill: Optional[PendingKill] = None
+        self._kill_requested = False
+        self._terminal: Optional[str] = None
+        self._input_request: Optional[LineRequest] = None
+        self._input_check_interval = self.INPUT_CHECK_INTERVAL
+        self._input_checked_at = 0.0
+        self._input_requested_at = 0.0
+        self._output_at = 0.0
+
+    @property
+    def _shell(self) -> SubShell:
+        """Shell, which executes script in pty"""
+        if self.shell is None:
+            raise ShellNotSpawned(f"No shell for {self.script} execution")
+        return self.shell
+
+    @property
+    def _errors_buffer(self) -> ErrorsBuffer:
+        if self.errors_buffer is None:
+            raise ShellNotSpawned(f"No errors buffer for {self.script} execution")
+        return self.errors_buffer
 
     @property
     def pid(self) -> int:
-        """Get PID of script in shell output"""
-        if not self._pid:
-            self._pid = self.shell.find_subshell_pid()
+        """Get PID of script from shell control channel"""
+        if self._pid is None:
+            record = self._shell.control_channel.wait_for(
+                ControlChannel.PID, self.CONTROL_RECORD_TIMEOUT
+            )
+            if record is None:
+                raise NoPidError(f"No pid reported by {self.script} subshell")
+            self._pid, self.started_at = record.value, record.timestamp
         return self._pid
 
     @property
     def exit_code(self) -> int:
-        """Get exit code of last executed process"""
-        if not self._exit_code:
-            self._exit_code = self.shell.get_subshell_exit_code()
+        """Get exit code of script from shell control channel"""
+        if self._exit_code is None:
+            record = self._shell.control_channel.wait_for(
+                ControlChannel.EXIT_CODE, self.CONTROL_RECORD_TIMEOUT
+            )
+            if record is None:
+                raise NoExitCodeError(
+                    f"No exit code reported by {self.script} subshell"
+                )
+            self._exit_code, self.finished_at = record.value, record.timestamp
         return self._exit_code
 
+    @property
+    def execution_time(self) -> Optional[float]:
+        """Seconds between subshell start and exit,
+        if shell is able to report timestamps"""
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
     def _create_execution_command(self) -> str:
-        """Create subshell and return its PID. Script
-        will be executed within a subshell by command
-        syntax.
+        """Create subshell which reports its PID, and its exit code
+        when it is done, to shell's control channel. Script will be
+        executed within a subshell by command syntax.
 
-        Generated PID will be used to recognize process status
+        Reported PID will be used to recognize process status
         like:
                 terminated
                 hang up
                 suspend
         """
 
-        pid_command, interpreter_path, script_path, error_redirection = (
-            self.shell.create_subshell_pid_command(),
+        (
+            pid_command,
+            interpreter_path,
+            script_path,
+            error_redirection,
+            exit_code_command,
+        ) = (
+            self._shell.create_control_pid_command(),
             self.script.find_shebang_path(),
             self.script.path,
-            self.errors_buffer.create_error_redirection(),
+            self._errors_buffer.create_error_redirection(),
+            self._shell.create_control_exit_code_command(),
         )
 
         return (
             # SubShell char start
-            self.shell.subshell["start"]
-            # Create pid before execution
+            self._shell.subshell["start"]
+            # Report pid before execution
             + f"{pid_command} && "
+            # Mark descendants of script
+            + f"export {self.SCRIPT_ID_VARIABLE}={shlex.quote(self._find_script_id())} && "
             # Execute under the pid
             + f"exec {interpreter_path} "
             # Script which will be executed
@@ -82,48 +218,491 @@ class ScriptExecutor:
             # Redirect errors to temporary file
             + f"{error_redirection}"
             # SubShell char end
-            + self.shell.subshell["end"]
+            + self._shell.subshell["end"]
+            # Report exit code after execution
+            + f"; {exit_code_command}"
+        )
+
+    def _find_script_id(self) -> str:
+        """Identify script among scripts of all running apps"""
+        return f"{os.getpid()}:{self.script}"
+
+    def _start_deadline(self):
+        if self.timeout is not None:
+            self._deadline = time.monotonic() + self.timeout
+
+    def _find_wait_timeout(self, timeout: float) -> float:
+        """Shorten waiting for events, so deadline is not missed"""
+        if self._pending_kill is not None:
+            return min(timeout, self.KILL_CHECK_INTERVAL)
+        if self._deadline is None or self.timed_out:
+            return timeout
+        return max(min(timeout, self._deadline - time.monotonic()), 0)
+
+    def _check_deadline(self):
+        """Kill process tree of script, which runs past its deadline"""
+        if (
+            self._deadline is not None
+            and not self.timed_out
+            and time.monotonic() >= self._deadline
+        ):
+            self.timed_out = True
+            self.kill_process_tree()
+
+    def kill_process_tree(self):
+        """Terminate script with all its descendants by SIGTERM. The ones
+        which ignore it are killed by SIGKILL `KILL_TIMEOUT` seconds later,
+        by execution loop, which passes output in the meantime. Can be
+        called by other thread."""
+        with TRACER.span("kill_process_tree", "script", script=str(self.script)):
+            # All processes are searched for the ones which left the tree
+            self._kill_requested = True
+            processes = {
+                process.pid: process
+                for process in Process.find_tree(self.pid) + self._find_left_processes()
+            }
+            # Set before signalling, so execution loop does not end
+            #   as soon as script is terminated
+            self._pending_kill = PendingKill(
+                list(processes.values()),
+                signal.SIGTERM,
+                time.monotonic() + self.KILL_TIMEOUT,
+            )
+            Process.signal_all(processes.values(), signal.SIGTERM)
+
+    def _check_kill(self):
+        """Kill processes, which ignored termination, and report
+        the ones, which are still running even after SIGKILL"""
+        if (pending_kill := self._pending_kill) is None:
+            return
+
+        running = Process.filter_running(pending_kill.processes)
+        if not running:
+            self._pending_kill = None
+        elif time.monotonic() < pending_kill.deadline:
+            return
+        elif pending_kill.signal_number == signal.SIGTERM:
+            Process.signal_all(running, signal.SIGKILL)
+            self._pending_kill = PendingKill(
+                running, signal.SIGKILL, time.monotonic() + self.KILL_TIMEOUT
+            )
+        else:
+            # Like processes in uninterruptible sleep, they are
+            #   reported as orphans as well, if still running at the end
+            self._pending_kill = None
+            self.emit(
+                STDERR,
+                "Still running after SIGKILL: "
+                + ", ".join(Process.describe(running))
+                + "\n",
+            )
+
+    def _find_left_processes(self) -> List[psutil.Process]:
+        """Find descendants of script still running, including
+        the ones which left its tree, like daemons. All processes
+        are searched only when some of them could have been missed."""
+        processes = {}
+        if self._resource_monitor is not None:
+            for process in self._resource_monitor.find_running():
+                processes[process.pid] = process
+        if self.started_at is not None and (
+            processes or self._may_have_left_processes()
+        ):
+            # Creation time is rounded to clock ticks
+            for process in Process.find_marked(
+                self.SCRIPT_ID_VARIABLE, self._find_script_id(), self.started_at - 1
+            ):
+                processes.setdefault(process.pid, process)
+        # Script itself is not its descendant
+        processes.pop(self.pid, None)
+        return list(processes.values())
+
+    def _may_have_left_processes(self) -> bool:
+        """Check cheaply whether descendants of script could have
+        left its tree, without being seen by resource monitor"""
+        return (
+            self._kill_requested
+            or (
+                self._resource_monitor is not None
+                and self._resource_monitor.has_lost_processes
+            )
+            or self._may_have_unseen_processes()
         )
 
+    def _may_have_unseen_processes(self) -> bool:
+        # Script is a job of interactive shell, so its descendants
+        #   stay in its process group, unless they leave it on purpose
+        return Process.is_group_running(self.pid)
+
+    def emit(self, kind: str, value: Any):
+        """Add event to the batch waiting for output input controller"""
+        self._events.append(Event(kind, self, value, time.monotonic()))
+
+    def deliver_events(self):
+        """Pass waiting events to output input controller in one batch"""
+        if self._events:
+            events, self._events = self._events, []
+            with TRACER.span("handle_events", "script", script=str(self.script)):
+                self.oi_controller.handle_events(events)
+
+    def _read_output(self):
+        self._pass_output(self._shell.read_output_lines())
+
+    def _pass_output(self, output: str):
+        if self._errors_buffer.timestamped:
+            # Errors written before the output are passed first
+            self._read_errors(until=time.monotonic())
+
+        if output:
+            self._handle_output_written()
+            self.emit(STDOUT, output)
+
+    def _read_errors(self, until: Optional[float] = None):
+        if self._errors_buffer.timestamped:
+            if errors := self._errors_buffer.read(until):  # type:ignore
+                self._handle_output_written()
+                self.emit(STDERR, errors)
+        elif self._errors_buffer.exist():
+            if errors := self._errors_buffer.read():
+                self._handle_output_written()
+                self.emit(STDERR, errors)
+
+    def _handle_output_written(self):
+        # Script which writes is not waiting for input
+        self._output_at = self._input_checked_at = time.monotonic()
+        self._input_check_interval = self.INPUT_CHECK_INTERVAL
+
     def get_output(self):
-        """Get output from shell and pass it to
-        output input controller"""
-        output = self.shell.read_output_line()
-        self.oi_controller.stdout = self, output
-
-    def get_errors(self):
-        """Get errors from errors temporary file
-        and pass it to output input controller"""
-        if self.errors_buffer.exist():
-            self.oi_controller.stderr = (
-                self,
-                self.errors_buffer.read(),
+        """Get whole lines waiting in shell and pass
+        them to output input controller at once"""
+        self._read_output()
+        self.deliver_events()
+
+    def get_errors(self, until: Optional[float] = None):
+        """Get errors from errors buffer and pass it to output
+        input controller. Timestamped buffer passes only errors
+        which arrived before `until`."""
+        self._read_errors(until)
+        self.deliver_events()
+
+    def get_input(self, line: Optional[str] = None) -> bool:
+        """Pass line of user input to shell, waiting for the line
+        if it is not given. Return False if there is no more input."""
+        if line is None:
+            line = TERMINAL_READER.readline()
+        if not line:
+            return False
+        self.oi_controller.stdin = self, line
+        return True
+
+    def _is_input_check_due(self) -> bool:
+        return self._terminal is not None and self._input_request is None
+
+    def _find_input_check_timeout(self, timeout: float) -> float:
+        """Shorten waiting for events, so input check is not missed"""
+        if not self._is_input_check_due():
+            return timeout
+        check_at = self._input_checked_at + self._input_check_interval
+        return max(min(timeout, check_at - time.monotonic()), 0)
+
+    def _check_input(self, reactor: Reactor):
+        """Request line of input from output input controller, when any
+        process of script is blocked on reading the terminal. Line is
+        awaited in background, so output is passed in the meantime."""
+        if not self._is_input_check_due() or (
+            time.monotonic() - self._input_checked_at < self._input_check_interval
+        ):
+            return
+
+        self._input_checked_at = time.monotonic()
+        waiting = Process.is_tree_waiting_for_terminal(
+            self.pid, self._terminal  # type:ignore
+        )
+        if waiting is None:
+            # Reads of terminal cannot be detected, like for setuid
+            #   process, so input is forwarded once user types it
+            waiting = TERMINAL_READER.has_input()
+        if not waiting:
+            self._input_check_interval = min(
+                self._input_check_interval * 2, self.INPUT_CHECK_MAX_INTERVAL
             )
+            return
+
+        # Prompt is passed before it is answered, even written to stderr
+        self._read_errors(until=time.monotonic())
+        self.deliver_events()
+
+        self._input_requested_at = time.monotonic()
+        self._input_request = self.oi_controller.request_input(self)
+        reactor.register(self._input_request, lambda: self._forward_input(reactor))
+
+    def _cancel_input(self, reactor: Reactor):
+        """Stop waiting for line requested for script"""
+        if self._input_request is not None:
+            reactor.unregister(self._input_request)
+            self.oi_controller.cancel_input(self, self._input_request)
+            self._input_request = None
+
+    def _cancel_stale_input(self, reactor: Reactor):
+        """Script which writes after input was requested is not waiting
+        for it anymore, so request is cancelled and input checked again"""
+        if (
+            self._input_request is not None
+            # Request answered in the meantime is forwarded
+            and self._input_request.line is None
+            and self._output_at > self._input_requested_at
+        ):
+            self._cancel_input(reactor)
 
-    def get_input(self):
-        """Get input from user and pass it to shell"""
-        self.oi_controller.stdin = self, ""
+    def _forward_input(self, reactor: Reactor):
+        line = self._input_request.line  # type:ignore
+        self._cancel_input(reactor)
+        self._input_checked_at = time.monotonic()
+        if not self.get_input(line):
+            # Input is closed, so script waiting for it is not blocked forever
+            self._shell.send_eof()
 
     def execute_script(self):
         """Execute script as separeted process"""
+        with TRACER.span("script", "script", script=str(self.script)):
+            self._execute_script()
+
+    def _execute_script(self):
+        with TRACER.span("create_execution_command", "script", script=str(self.script)):
+            command = self._create_execution_command()
+
+        self._shell.control_channel.clear()
+
+        # Shell reaps script, so resources used by script are
+        #   added to resources used by shell's children
+        self._reaped_usage_at_start = Process.find_reaped_usage(self._shell.process.pid)
+
+        self._shell.send_command(command)
+
+        with TRACER.span("find_pid", "script", script=str(self.script)):
+            pid = self.pid
+
+        self._resource_monitor = ResourceMonitor(pid)
+        self._start_deadline()
+        self._terminal = Process.find_terminal(pid)
+
+        errors_buffer = self._errors_buffer
+        with errors_buffer, ExitWatcher(pid) as exit_watcher, Reactor() as reactor:
+            # Wait for shell output, user input and script exit together
+            # Handlers collect events, which are delivered
+            #   once per loop iteration. User input is awaited only
+            #   when script waits for it.
+            reactor.register(self._shell.process, self._read_output)
+            reactor.register(exit_watcher, lambda: reactor.unregister(exit_watcher))
+
+            # Buffer which cannot be awaited is checked periodically
+            timeout = (
+                None
+                if reactor.register(errors_buffer, self._read_errors)
+                else self.ERRORS_CHECK_INTERVAL
+            )
+
+            with TRACER.span("execution_loop", "script", script=str(self.script)):
+                # Processes being killed are awaited after script exit
+                while (
+                    reactor.is_registered(exit_watcher)
+                    or self._pending_kill is not None
+                ):
+                    reactor.run_once(
+                        self._find_input_check_timeout(
+                            self._find_wait_timeout(
+                                timeout or self._resource_monitor.interval
+                            )
+                        )
+                    )
+                    if timeout:
+                        self._read_errors()
+                    self._resource_monitor.sample_if_due()
+                    self.deliver_events()
+                    self._check_deadline()
+                    self._check_kill()
+                    self._cancel_stale_input(reactor)
+                    self._check_input(reactor)
+
+                self._cancel_input(reactor)
+
+            # Pass output left in shell after script exit
+            with TRACER.span("drain_output", "script", script=str(self.script)):
+                # Subshell reports exit code once its output is written,
+                #   so output is drained without waiting for more
+                self.exit_code
+                errors_buffer.wait_until_closed(self.ERRORS_CLOSE_TIMEOUT)
+                drain_deadline = time.monotonic() + self.OUTPUT_DRAIN_TIMEOUT
+                while time.monotonic() < drain_deadline and (
+                    output := self._shell.read_output_left()
+                ):
+                    self._pass_output(output)
+                self._read_errors()
+
+            self._finish()
+
+    def _find_reaped_usage(self) -> ResourceUsage:
+        reaped_usage = Process.find_reaped_usage(self._shell.process.pid)
+        if reaped_usage is None or self._reaped_usage_at_start is None:
+            # Usage of shell cannot be read, so only sampled usage is known
+            return ResourceUsage()
+        return reaped_usage.subtract(self._reaped_usage_at_start)
+
+    def _find_resource_usage(self) -> ResourceUsage:
+        """Combine exact usage of processes reaped by the end of
+        script with sampled usage of processes left in its tree"""
+        usage = self._find_reaped_usage()
+        if self._resource_monitor is not None:
+            usage = usage.combine(self._resource_monitor.find_usage())
+        return usage._replace(wall_time=self.execution_time)
+
+    def _finish(self):
+        # Exit time is known once exit code is read
+        with TRACER.span("find_exit_code", "script", script=str(self.script)):
+            exit_code = self.exit_code
+
+        with TRACER.span("find_resource_usage", "script", script=str(self.script)):
+            self.resource_usage = self._find_resource_usage()
+
+        with TRACER.span("find_orphans", "script", script=str(self.script)):
+            self.orphans = Process.describe(self._find_left_processes())
+
+        # Record result before user is asked whether to stop execution
+        if self.ledger is not None:
+            self.ledger.record(self.script, exit_code)
+
+        with TRACER.span("show_status", "script", script=str(self.script)):
+            if self.timed_out:
+                self.emit(TIMEOUT, self.timeout)
+            self.emit(USAGE, self.resource_usage)
+            if self.orphans:
+                self.emit(ORPHANS, self.orphans)
+            self.emit(TIMING, (self.started_at, self.finished_at))
+            self.emit(STATUS, exit_code)
+            self.deliver_events()
+
+
+class PipeScriptExecutor(ScriptExecutor):
+    """Execute script, which does not read user input, directly
+    by interpreter from its shebang, without shell and pty.
+    Output and errors are read from pipes in big chunks and
+    passed to output input controller in whole lines."""
+
+    def __init__(
+        self,
+        script: Script,
+        oi_controller: OutputInputController,
+        ledger: Optional[RunLedger] = None,
+        timeout: Optional[float] = None,
+    ):
+        self._initialize(script, oi_controller, ledger, timeout)
+
+        # Script is executed without shell and pty
+        self.shell = None
+        self.errors_buffer = None
+        self.process: Optional[subprocess.Popen] = None
+        self._reaped_usage = ResourceUsage()
+        self._pipes_left_open = False
+
+    @property
+    def pid(self) -> int:
+        if self.process is None:
+            raise NoPidError(f"{self.script} is not started")
+        return self.process.pid
+
+    @property
+    def exit_code(self) -> int:
+        if self._exit_code is None:
+            if self.process is None:
+                raise NoExitCodeError(f"{self.script} is not started")
+            # Script is reaped with resources used by it and its children
+            _pid, status, rusage = os.wait4(self.process.pid, 0)
+            self.finished_at = time.time()
+            self._exit_code = os.waitstatus_to_exitcode(status)
+            self.process.returncode = self._exit_code
+            self._reaped_usage = ResourceUsage.from_rusage(rusage)
+        return self._exit_code
+
+    def _find_reaped_usage(self) -> ResourceUsage:
+        return self._reaped_usage
+
+    def _may_have_unseen_processes(self) -> bool:
+        # Script shares process group with runner, but its
+        #   descendants inherit its pipes, unless they close them
+        return self._pipes_left_open
+
+    def _create_execution_command(self) -> list:  # type:ignore
+        """Create arguments, which execute script by interpreter
+        from its shebang, like shell would do"""
+        return [*shlex.split(self.script.find_shebang_path()), str(self.script.path)]
+
+    def _read_pipe(self, reactor: Reactor, pipe: PipeReader, stream: str):
+        if lines := pipe.read():
+            self.emit(stream, lines)
+        if pipe.closed:
+            reactor.unregister(pipe)
+
+    def _execute_script(self):
+        stdout_fd, stdout_write_fd = os.pipe()
+        stderr_fd, stderr_write_fd = os.pipe()
+
+        self.started_at = time.time()
+        try:
+            with TRACER.span("spawn", "script", script=str(self.script)):
+                self.process = subprocess.Popen(
+                    self._create_execution_command(),
+                    stdin=subprocess.DEVNULL,
+                    stdout=stdout_write_fd,
+                    stderr=stderr_write_fd,
+                    # Mark descendants of script
+                    env={**os.environ, self.SCRIPT_ID_VARIABLE: self._find_script_id()},
+                )
+        finally:
+            # Only script holds pipes open for writing
+            os.close(stdout_write_fd)
+            os.close(stderr_write_fd)
 
-        command = self._create_execution_command()
+        self._resource_monitor = ResourceMonitor(self.pid)
+        self._start_deadline()
 
-        self.shell.send_command(command)
+        with PipeReader(stdout_fd) as stdout, PipeReader(
+            stderr_fd
+        ) as stderr, ExitWatcher(self.pid) as exit_watcher, Reactor() as reactor:
+            pipes = {stdout: STDOUT, stderr: STDERR}
 
-        pid = self.pid
+            for pipe, stream in pipes.items():
+                reactor.register(
+                    pipe,
+                    lambda pipe=pipe, stream=stream: self._read_pipe(
+                        reactor, pipe, stream
+                    ),
+                )
+            reactor.register(exit_watcher, lambda: reactor.unregister(exit_watcher))
 
-        with self.errors_buffer:
+            # Script's background processes could keep pipes open
+            #   after script exit, so waiting ends with script.
+            #   Script which closed its pipes is awaited until deadline.
+            with TRACER.span("execution_loop", "script", script=str(self.script)):
+                # Processes being killed are awaited after script exit
+                while (
+                    reactor.is_registered(exit_watcher)
+                    or self._pending_kill is not None
+                ):
+                    reactor.run_once(
+                        self._find_wait_timeout(self._resource_monitor.interval)
+                    )
+                    self._resource_monitor.sample_if_due()
+                    self.deliver_events()
+                    self._check_deadline()
+                    self._check_kill()
 
-            while Process.is_alive(pid) or self.shell.lastline:
-                # Create event loop for blocking
-                #    input/output operations
-                readers, writers, _ = select([sys.stdin], [sys.stdout], [], 1)
-                for fd in readers + writers:
-                    if fd is sys.stdin:
-                        self.get_input()
-                    elif fd is sys.stdout:
-                        self.get_output()
-                self.get_errors()
+            # Pass output left in pipes after script exit
+            drain_deadline = time.monotonic() + self.OUTPUT_DRAIN_TIMEOUT
+            while time.monotonic() < drain_deadline and reactor.run_once(0):
+                pass
+            for pipe, stream in pipes.items():
+                if lines := pipe.flush():
+                    self.emit(stream, lines)
+            self._pipes_left_open = not all(pipe.closed for pipe in pipes)
 
-            self.oi_controller.show_status(self)
+            self._finish()
@@ -4,22 +4,22 @@ Environment, in which scripts will be executed in.
 from typing import Dict, Generator, Union, Optional
 from pathlib import Path
 import abc
+import os
 
 import pexpect
 
-from src.exceptions import (
-    NoOutputProduced,
-    FileNotExecutable,
-    NoExitCodeError,
-    FileNotFound,
-    NoPidError,
-)
+from src.control_channel import ControlChannel
+from src.exceptions import NoOutputProduced, FileNotExecutable, FileNotFound
+from src.tracer import TRACER
 
 
 class Shell(abc.ABC):
     """Shell module is responsible for spawning the  environment
     in which scripts will be executed and for communicating with them."""
 
+    # How much output is read from shell at once
+    CHUNK_SIZE = 64 * 1024
+
     def __init__(self, timeout: Union[int, float] = 1):
         path = Path(self.path)
 
@@ -34,6 +34,9 @@ class Shell(abc.ABC):
 
         self.lastline = ""
 
+        # Output read from shell, but not returned yet
+        self._output = ""
+
     def __iter__(self) -> Generator:
         while line := self.read_output_line():
             yield line
@@ -43,7 +46,8 @@ class Shell(abc.ABC):
         return self
 
     def __enter__(self):
-        self.spawn_shell(self.timeout)
+        with TRACER.span("spawn_shell"):
+            self.spawn_shell(self.timeout)
         return self
 
     def __exit__(self, _exc_type, _exc_value, _exc_tryceback):
@@ -78,6 +82,10 @@ class Shell(abc.ABC):
         """Send command to shell"""
         self.process.sendline(command)  # type:ignore
 
+    def send_eof(self):
+        """End input of process, which reads the terminal"""
+        self.process.sendeof()  # type:ignore
+
     def terminate(self):
         """Terminate shell, when no scripts are left for execution"""
         self.process.terminate()
@@ -95,27 +103,103 @@ class Shell(abc.ABC):
 
         return self.process.before  # type:ignore
 
-    def read_output_line(self) -> str:
-        try:
-            self.lastline = self.process.readline()  # type:ignore
+    def _read_chunk(self, timeout: Union[int, float]) -> bool:
+        """Read output waiting in shell, at most `CHUNK_SIZE`, waiting
+        `timeout` seconds for it. Return False if nothing came."""
+        if self.process.buffer:  # type:ignore
+            # Output left by pexpect's `expect`
+            self._output += self.process.buffer  # type:ignore
+            self.process.buffer = ""  # type:ignore
 
-        except pexpect.TIMEOUT:
-            # Don't print the same in a loop
-            if (
-                self.lastline == self.process.before  # type:ignore
-                or self.lastline in self.process.before  # type:ignore
-                or self.process.before in self.lastline  # type:ignore
-            ):
-                self.lastline = ""
-            else:
-                self.lastline = self.process.before  # type:ignore
+        try:
+            self._output += self.process.read_nonblocking(  # type:ignore
+                self.CHUNK_SIZE, timeout
+            )
+        except (pexpect.TIMEOUT, pexpect.EOF):
+            return False
+        return True
+
+    def _fill_output(self):
+        """Read output waiting in shell. If there is no whole
+        line, give unfinished line `timeout` seconds to end."""
+        self._read_chunk(0)
+        if not self.has_buffered_line():
+            self._read_chunk(self.timeout)
+
+    def _take_output(self, end: int) -> str:
+        """Take output up to `end`. If there is no whole line,
+        take unfinished line, like a prompt."""
+        if not end:
+            # Returned part of unfinished line is not kept, so line
+            #   without end, like progress bar, does not grow memory
+            end = len(self._output)
+
+        output, self._output = self._output[:end], self._output[end:]
+
+        self.lastline = output
+        return output
 
-        return self.lastline
+    def read_output_line(self) -> str:
+        """Read one line from shell. If no whole line comes
+        before timeout return what has left"""
+        if not self.has_buffered_line():
+            self._fill_output()
+        return self._take_output(self._output.find("\n") + 1)
+
+    def read_output_lines(self) -> str:
+        """Read all whole lines waiting in shell at once, without
+        waiting for more. If there is no whole line, return unfinished
+        line at once, its rest is read once it comes."""
+        self._read_chunk(0)
+        return self._take_output(self._output.rfind("\n") + 1)
+
+    def read_output_left(self) -> str:
+        """Read output left in shell by exited process, without waiting
+        for more. Return empty string once all of it is read."""
+        if self._read_chunk(0):
+            return self._take_output(self._output.rfind("\n") + 1)
+        return self._take_output(len(self._output))
+
+    def has_buffered_line(self) -> bool:
+        """Decide is whole line already read from
+        shell, but not returned yet"""
+        return "\n" in self._output
+
+    def discard_output(self):
+        """Drop output left by previous commands"""
+        try:
+            while True:
+                self.process.read_nonblocking(4096, timeout=0)  # type:ignore
+        except (pexpect.TIMEOUT, pexpect.EOF):
+            pass
+        self.process.buffer = ""  # type:ignore
+        self._output = ""
+        self.lastline = ""
 
 
 class SubShell(Shell):
     """All shells should inherit from this class"""
 
+    def __init__(self, timeout: Union[int, float] = 1):
+        super().__init__(timeout)
+
+        self._control_channel: Optional[ControlChannel] = None
+
+    @property
+    def control_channel(self) -> ControlChannel:
+        """Channel through which subshells report theirs PIDs
+        and exit codes, apart from scripts output"""
+        if self._control_channel is None:
+            self._control_channel = ControlChannel()
+        return self._control_channel
+
+    def terminate(self):
+        super().terminate()
+
+        if self._control_channel is not None:
+            self._control_channel.close()
+            self._control_channel = None
+
     @classmethod
     @property
     @abc.abstractmethod
@@ -129,21 +213,42 @@ class SubShell(Shell):
     @property
     @abc.abstractmethod
     def subshell_pid(cls) -> Dict[str, str]:
-        """Dictionary which holds subshell pid tag and
-        subshell pid command. It is used for generating
-        and recognizing subshell PID.
+        """Dictionary which holds subshell pid command.
+        It is used for reporting subshell PID to control channel.
         """
-        return {"tag": "bash_subshell_pid=", "command": "$BASHPID"}
+        return {"command": "$BASHPID"}
 
     @classmethod
     @property
     @abc.abstractmethod
     def subshell_exit_code(cls) -> Dict[str, str]:
-        """Dictionary which holds subshell exit code tag and
-        subshell exit code command. It is used for generating
-        and recognizing subshell exit code.
+        """Dictionary which holds subshell exit code command. It is
+        used for reporting subshell exit code to control channel.
         """
-        return {"tag": "bash_subshell_exit_code=", "command": "$?"}
+        return {"command": "$?"}
+
+    @classmethod
+    @property
+    @abc.abstractmethod
+    def control_record(cls) -> Dict[str, str]:
+        """Dictionary which holds command writing formatted
+        record and command generating record timestamp.
+        It is used for reporting to control channel.
+        """
+        return {"command": "printf '%s %s %s\\n'", "timestamp": "$EPOCHREALTIME"}
+
+    @classmethod
+    @property
+    @abc.abstractmethod
+    def session(cls) -> Dict[str, str]:
+        """Dictionary which holds commands saving shell's exported
+        variables and working directory to a snapshot file, and
+        restoring them. It is used for resetting reused shell.
+        """
+        return {
+            "save": "{{ export -p; printf 'cd %q\\n' \"$PWD\"; }} > {snapshot}",
+            "restore": 'for name in $(compgen -e); do unset "$name"; done; . {snapshot}',
+        }
 
     @classmethod
     def create_subshell_command(cls, command: str) -> str:
@@ -152,77 +257,54 @@ class SubShell(Shell):
         Like in bash is done by adding paranthesesis around"""
         return f"{cls.subshell['start']}{command}{cls.subshell['end']}"  # type:ignore
 
-    @classmethod
-    def create_subshell_pid_command(cls) -> str:
-        """Create command which will echo the PID
-        of subshell in which it is being revoked.
-        Like in sh $PPID. Adding tag before PID
-        is important for later PID recognization"""
-        pid_tag = cls.subshell_pid["tag"]  # type:ignore
-        pid_command = cls.subshell_pid["command"]  # type:ignore
-        return f"echo {pid_tag}{pid_command}"
+    def _create_control_record_command(self, kind: str, value_command: str) -> str:
+        """Create command which will write record to control channel"""
+        record_command = self.control_record["command"]  # type:ignore
+        timestamp_command = self.control_record["timestamp"]  # type:ignore
+        return (
+            f"{record_command} {kind} {value_command} {timestamp_command}"
+            + f" > {self.control_channel.path}"
+        )
 
-    @classmethod
-    def _is_subshell_pid(cls, output: str) -> bool:
-        """Decide is subshell PID within the output"""
-        pid_tag = cls.subshell_pid["tag"]  # type:ignore
-        pid_command = cls.subshell_pid["command"]  # type:ignore
-        return pid_tag in output and pid_command not in output
+    def create_control_pid_command(self) -> str:
+        """Create command which will report the PID of subshell
+        in which it is being revoked to control channel"""
+        return self._create_control_record_command(
+            ControlChannel.PID, self.subshell_pid["command"]  # type:ignore
+        )
 
-    @classmethod
-    def _extract_subshell_pid(cls, output: str) -> int:
-        """Extract subshell PID from output"""
-        pid_tag = cls.subshell_pid["tag"]  # type:ignore
-        pid_tag_end_index = output.find(pid_tag) + len(pid_tag)
-        pid_end_index = output.find("\r\n")
-        return int(output[pid_tag_end_index:pid_end_index])
+    def create_control_exit_code_command(self) -> str:
+        """Create command which will report the exit code of
+        last subshell to control channel"""
+        return self._create_control_record_command(
+            ControlChannel.EXIT_CODE, self.subshell_exit_code["command"]  # type:ignore
+        )
 
-    @classmethod
-    def _create_subshell_exit_code_command(cls) -> str:
-        """Create command which will echo the exit code
-        of last subshell that is no longer running. Like in
-        bash $?"""
-        exit_code_tag = cls.subshell_exit_code["tag"]  # type:ignore
-        exit_code_command = cls.subshell_exit_code["command"]  # type:ignore
-        return f"echo {exit_code_tag}{exit_code_command}"
+    def create_control_ready_command(self) -> str:
+        """Create command which will report the PID of
+        shell to control channel, when shell is responsive"""
+        return self._create_control_record_command(ControlChannel.READY, "$$")
 
-    @classmethod
-    def _is_subshell_exit_code(cls, output: str) -> bool:
-        """Decide is subshell exit code within output"""
-        exit_code_tag = cls.subshell_exit_code["tag"]  # type:ignore
-        exit_code_command = cls.subshell_exit_code["command"]  # type:ignore
-        return exit_code_tag in output and exit_code_command not in output
+    def _find_session_snapshot_path(self) -> Path:
+        return self.control_channel.directory.joinpath("session.sh")
 
-    @classmethod
-    def _extract_subshell_exit_code(cls, output: str) -> int:
-        exit_code_tag = cls.subshell_exit_code["tag"]  # type:ignore
-        exit_code_tag_end_index = output.find(exit_code_tag) + len(exit_code_tag)
-        exit_code_end_index = output.find("\r\n")
-        return int(output[exit_code_tag_end_index:exit_code_end_index])
-
-    def find_subshell_pid(self) -> int:
-        """Get PID of last subshell"""
-        for line in self:
-            if self._is_subshell_pid(line):
-                return self._extract_subshell_pid(line)
-        raise NoPidError(f"No pid found for {self} subshell")
-
-    def find_subshell_exit_code(self) -> int:
-        """Find exit code of last subshell"""
-        for line in self:
-            if self._is_subshell_exit_code(line):
-                return self._extract_subshell_exit_code(line)
-        raise NoExitCodeError(f"No exit code found for {self} subshell")
-
-    def get_subshell_exit_code(self) -> int:
-        command = self._create_subshell_exit_code_command()
-        while True:
-            # Try to extract exit code until succeed
-            self.send_command(command)
-            try:
-                return self.find_subshell_exit_code()
-            except NoExitCodeError:
-                pass
+    def create_save_session_command(self) -> str:
+        """Create command which will save shell's
+        environment and working directory"""
+        return self.session["save"].format(  # type:ignore
+            snapshot=self._find_session_snapshot_path()
+        )
+
+    def create_restore_session_command(self) -> str:
+        """Create command which will bring back environment
+        and working directory saved by save command"""
+        return (
+            self.session["restore"].format(  # type:ignore
+                snapshot=self._find_session_snapshot_path()
+            )
+            # Read only variables cannot be unset or declared again
+            + " 2> /dev/null"
+        )
 
 
 class BashShell(SubShell):
@@ -230,14 +312,27 @@ class BashShell(SubShell):
 
     subshell = {"start": "(", "end": ")"}
 
-    subshell_pid = {"tag": "bash_subshell_pid=", "command": "$BASHPID"}
+    subshell_pid = {"command": "$BASHPID"}
+
+    subshell_exit_code = {"command": "$?"}
+
+    control_record = {"command": "printf '%s %s %s\\n'", "timestamp": "$EPOCHREALTIME"}
 
-    subshell_exit_code = {"tag": "bash_subshell_exit_code=", "command": "$?"}
+    session = {
+        "save": "{{ export -p; printf 'cd %q\\n' \"$PWD\"; }} > {snapshot}",
+        "restore": 'for name in $(compgen -e); do unset "$name"; done; . {snapshot}',
+    }
 
     command_line_argument = "bash"
 
     def spawn_shell(self, timeout: int = 5):
-        """Spawn bash without user preferences to get cleaner output"""
+        """Spawn bash without user preferences, line editing,
+        echo and prompts to get cleaner output"""
         self.process = pexpect.spawn(
-            self.path, args=["--noprofile", "--norc"], encoding="utf-8", timeout=timeout
+            self.path,
+            args=["--noprofile", "--norc", "--noediting"],
+            encoding="utf-8",
+            timeout=timeout,
+            echo=False,
+            env=dict(os.environ, PS1="", PS2=""),
         )
@@ -0,0 +1,136 @@
+"""
+Shells spawned once and reused by many scripts.
+"""
+from typing import Generator, List, Optional, Type, Union
+from contextlib import contextmanager
+import threading
+import queue
+
+from src.control_channel import ControlChannel
+from src.exceptions import ShellNotSpawned
+from src.tracer import TRACER
+from src.shell import SubShell
+
+
+class ShellPool:
+    """Keep `size` spawned shells warm and hand them out to script
+    executors. Pool grows when more shells are checked out at once.
+
+    Scripts are executed in subshells, so they cannot change shell
+    they are executed by. Still, between scripts shell's exported
+    variables and working directory are restored to the ones it was
+    spawned with, output and control records left by previous
+    script are dropped and shell is checked by a round trip through
+    its control channel. Shell which does not answer is replaced.
+    """
+
+    # How long shell has to answer the health check
+    HEALTH_CHECK_TIMEOUT = 1
+
+    def __init__(
+        self,
+        shell_class: Type[SubShell],
+        size: int,
+        timeout: Union[int, float] = 0.1,
+    ):
+        self.shell_class = shell_class
+        self.timeout = timeout
+
+        self._idle: "queue.SimpleQueue[SubShell]" = queue.SimpleQueue()
+        self._shells: List[SubShell] = []
+        self._shells_lock = threading.Lock()
+
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _exc_type, _exc_value, _exc_traceback):
+        self.close()
+
+    def _spawn(self) -> SubShell:
+        with TRACER.span("spawn_shell"):
+            shell = self.shell_class(self.timeout)
+            shell.spawn_shell(self.timeout)
+            # Shell without echo waits for commands, there is
+            #   no need to delay them
+            shell.process.delaybeforesend = None  # type:ignore
+
+            if not self.is_healthy(shell, shell.create_save_session_command()):
+                shell.terminate()
+                raise ShellNotSpawned(f"{shell.path} does not answer")
+
+        with self._shells_lock:
+            self._shells.append(shell)
+        return shell
+
+    def _retire(self, shell: SubShell):
+        with self._shells_lock:
+            self._shells.remove(shell)
+        shell.terminate()
+
+    def is_healthy(self, shell: SubShell, command: Optional[str] = None) -> bool:
+        """Check is shell alive and executing commands.
+        Optional command is executed before the check."""
+        if not shell.process or not shell.process.isalive():
+            return False
+
+        ready_command = shell.create_control_ready_command()
+
+        shell.control_channel.clear()
+        shell.send_command(f"{command}; {ready_command}" if command else ready_command)
+
+        return (
+            shell.control_channel.wait_for(
+                ControlChannel.READY, self.HEALTH_CHECK_TIMEOUT
+            )
+            is not None
+        )
+
+    def reset(self, shell: SubShell) -> bool:
+        """Restore shell's environment and working directory.
+        Return False if shell is not healthy afterwards."""
+        # Shell answers after restoring, so only output and
+        #   records left by previous script are dropped
+        is_healthy = self.is_healthy(shell, shell.create_restore_session_command())
+        shell.control_channel.clear()
+        shell.discard_output()
+        return is_healthy
+
+    def checkout(self) -> SubShell:
+        """Take idle shell, or spawn new one if all are busy"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._spawn()
+
+    def checkin(self, shell: SubShell):
+        """Reset shell and give it back to the pool"""
+        with TRACER.span("reset_shell"):
+            is_healthy = self.reset(shell)
+
+        if is_healthy:
+            self._idle.put(shell)
+        else:
+            self._retire(shell)
+            self._idle.put(self._spawn())
+
+    @contextmanager
+    def shell(self) -> Generator[SubShell, None, None]:
+        """Check shell out for execution of one script"""
+        shell = self.checkout()
+        try:
+            yield shell
+        except BaseException:
+            # Script could be interrupted in the middle
+            self._retire(shell)
+            raise
+        self.checkin(shell)
+
+    def close(self):
+        with self._shells_lock:
+            shells, self._shells = self._shells, []
+
+        for shell in shells:
+            shell.terminate()
@@ -1,12 +1,37 @@
+from typing import Deque, NamedTuple, Optional, Tuple, Union
+from collections import deque
+from select import select
+from pathlib import Path
+import threading
+import codecs
+import time
+import abc
 import os
 
+from src.output_buffer import OutputBuffer
+
+
+class ErrorsBuffer(abc.ABC):
+    """Buffer for errors of executed script. Script's stderr is
+    redirected into the buffer, from which errors are passed
+    to output input controller."""
 
-class TempErrorFile:
     FILE_NAME = "errors_temp.log"
 
-    def __init__(self, directory):
+    # Are errors read with time they were written at, so they
+    #   can be ordered with script's output
+    timestamped = False
+
+    def __init__(
+        self,
+        directory: Path,
+        file_name: Optional[str] = None,
+        memory_limit: int = OutputBuffer.MEMORY_LIMIT,
+    ):
         self.directory = directory
-        self.path = directory.joinpath(self.FILE_NAME)
+        self.path = directory.joinpath(file_name or self.FILE_NAME)
+        # How much of errors, which wait for being read, can be kept in memory
+        self.memory_limit = memory_limit
 
     def __enter__(self):
         return self
@@ -14,6 +39,39 @@ class TempErrorFile:
     def __exit__(self, _exc_type, _exc_value, _exc_tryceback):
         self.delete()
 
+    @classmethod
+    @property
+    def command_line_argument(cls) -> str:
+        """Argument that user passes at script execution to select errors buffer,
+        for example: python start.py -b errorsbuffer
+        """
+        return cls.__name__.lower()
+
+    @abc.abstractmethod
+    def create_error_redirection(self) -> str:
+        """Create shell redirection of stderr into the buffer"""
+
+    @abc.abstractmethod
+    def exist(self) -> bool:
+        """Check is any errors within a buffer"""
+
+    @abc.abstractmethod
+    def read(self) -> str:
+        """Read errors from buffer and clean it"""
+
+    @abc.abstractmethod
+    def delete(self):
+        """Remove buffer when script is done"""
+
+    def wait_until_closed(self, timeout: Union[int, float]):
+        """Wait until script stops writing errors"""
+
+
+class TempErrorFile(ErrorsBuffer):
+    FILE_NAME = "errors_temp.log"
+
+    command_line_argument = "file"
+
     def read(self):
         """Read errors from file and clean buffer"""
         with open(self.path, "r+") as temp_errors:
@@ -41,3 +99,167 @@ class TempErrorFile:
     def delete(self):
         if self.path.exists():
             os.remove(self.path)
+
+
+class ErrorChunk(NamedTuple):
+    timestamp: float
+    text: str
+
+
+class ErrorsPipe(ErrorsBuffer):
+    """Named pipe, from which errors are streamed by a reader
+    thread as soon as script writes them. Errors are passed in
+    whole lines, every chunk is stamped with `time.monotonic`
+    at arrival.
+
+    Buffer can be awaited by `select`, it becomes readable
+    when new errors arrive. Errors which wait for being read
+    are kept in memory up to `memory_limit` bytes, rest of
+    them spills to a temporary file.
+    """
+
+    FILE_NAME = "errors_temp.fifo"
+
+    CHUNK_SIZE = 4096
+
+    # How long unfinished line waits for its end
+    PARTIAL_LINE_TIMEOUT = 0.05
+
+    command_line_argument = "pipe"
+
+    timestamped = True
+
+    def __init__(
+        self,
+        directory: Path,
+        file_name: Optional[str] = None,
+        memory_limit: int = OutputBuffer.MEMORY_LIMIT,
+    ):
+        super().__init__(directory, file_name, memory_limit)
+
+        # Arrival time and size of each chunk kept in output buffer
+        self._chunks: Deque[Tuple[float, int]] = deque()
+        self._output = OutputBuffer(memory_limit)
+        self._reader: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+        self._wakeup_fd: Optional[int] = None
+
+    def fileno(self) -> int:
+        if self._wakeup_fd is None:
+            raise ValueError("Errors pipe is not opened")
+        return self._wakeup_fd
+
+    def create_error_redirection(self) -> str:
+        """Create named pipe and start reading from it, before
+        script is able to redirect errors into it"""
+        if self._reader is None:
+            self._open()
+        return f" 2> {self.path}"
+
+    def _open(self):
+        if self.path.exists():
+            os.remove(self.path)
+        os.mkfifo(self.path, 0o600)
+
+        self._closed = threading.Event()
+        self._wakeup_fd, wakeup_write_fd = os.pipe()
+        os.set_blocking(self._wakeup_fd, False)
+
+        self._reader = threading.Thread(
+            target=self._read_errors,
+            args=(wakeup_write_fd, self._closed),
+            daemon=True,
+        )
+        self._reader.start()
+
+    def _read_errors(self, wakeup_fd: int, closed: threading.Event):
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        partial_line = ""
+
+        def push(text: str):
+            data = text.encode()
+            self._output.write(data)
+            self._chunks.append((time.monotonic(), len(data)))
+            os.write(wakeup_fd, b"\0")
+
+        try:
+            # Block until script opens pipe, end when all its writers close it
+            with open(self.path, "rb", buffering=0) as fifo:
+                while True:
+                    readers, _, _ = select(
+                        [fifo],
+                        [],
+                        [],
+                        self.PARTIAL_LINE_TIMEOUT if partial_line else None,
+                    )
+                    if not readers:
+                        # Pass unfinished line, like prompt, when writer pauses
+                        push(partial_line)
+                        partial_line = ""
+                        continue
+
+                    if not (chunk := fifo.read(self.CHUNK_SIZE)):
+                        break
+
+                    text = partial_line + decoder.decode(chunk)
+                    lines_end = text.rfind("\n") + 1
+                    if lines_end:
+                        push(text[:lines_end])
+                    partial_line = text[lines_end:]
+
+                if partial_line := partial_line + decoder.decode(b"", final=True):
+                    push(partial_line)
+        except (FileNotFoundError, BrokenPipeError):
+            # Buffer was deleted in the meantime
+            pass
+        finally:
+            closed.set()
+            os.close(wakeup_fd)
+
+    def _drain_wakeups(self):
+        try:
+            while os.read(self.fileno(), self.CHUNK_SIZE):
+                pass
+        except (BlockingIOError, ValueError):
+            pass
+
+    def exist(self) -> bool:
+        """Check is any errors within a buffer"""
+        self._drain_wakeups()
+        return bool(self._chunks)
+
+    def read_chunks(self, until: Optional[float] = None) -> list:
+        """Pop chunks which arrived before `until` timestamp"""
+        chunks = []
+        while self._chunks and (until is None or self._chunks[0][0] <= until):
+            timestamp, size = self._chunks.popleft()
+            chunks.append(ErrorChunk(timestamp, self._output.read(size).decode()))
+        return chunks
+
+    def read(self, until: Optional[float] = None) -> str:
+        """Read errors which arrived before `until` timestamp"""
+        self._drain_wakeups()
+        return "".join(chunk.text for chunk in self.read_chunks(until))
+
+    def wait_until_closed(self, timeout: Union[int, float]):
+        """Wait until all script's processes close the pipe"""
+        self._closed.wait(timeout)
+
+    def delete(self):
+        if self._reader is not None and not self._closed.is_set():
+            try:
+                # Release reader which still waits for script to open the pipe
+                os.close(os.open(self.path, os.O_WRONLY | os.O_NONBLOCK))
+            except OSError:
+                pass
+
+        if self._wakeup_fd is not None:
+            os.close(self._wakeup_fd)
+            self._wakeup_fd = None
+
+        self._reader = None
+        self._chunks.clear()
+        self._output.close()
+
+        if self.path.exists():
+            os.remove(self.path)
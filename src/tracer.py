@@ -0,0 +1,116 @@
+"""
+Trace of orchestrator's work, which can be viewed in Perfetto.
+"""
+from typing import Any, Dict, List
+from pathlib import Path
+import threading
+import json
+import time
+import os
+
+
+class Span:
+    """Time between entering and exiting the span is recorded
+    as one complete event of tracer"""
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self._start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, _exc_type, _exc_value, _exc_traceback):
+        self.tracer.record(
+            self.name, self.category, self._start_ns, time.perf_counter_ns(), self.args
+        )
+
+
+class NoSpan:
+    """Span of disabled tracer, which records nothing"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _exc_type, _exc_value, _exc_traceback):
+        pass
+
+
+class Tracer:
+    """Record spans of orchestrator's work as Chrome trace events:
+            {"name": "find_pid", "cat": "script", "ph": "X", "ts": 1200.5,
+             "dur": 35.2, "pid": 4321, "tid": 4325, "args": {"script": "update_0.sh"}}
+
+    Each thread, like a worker executing scripts next to others, is shown
+    on its own track. Spans of one thread nest by time, so phases of script
+    are shown under the script's span.
+
+    Tracer is disabled by default. Then `span` returns one shared span,
+    which does nothing, so instrumented code pays only for the call.
+    """
+
+    CATEGORY = "orchestrator"
+
+    def __init__(self):
+        self.enabled = False
+
+        self._events: List[Dict[str, Any]] = []
+        self._thread_names: Dict[int, str] = {}
+        self._start_ns = 0
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self._start_ns = time.perf_counter_ns()
+        self.enabled = True
+
+    def span(self, name: str, category: str = CATEGORY, **args: Any):
+        """Context manager which records time spent within it"""
+        if not self.enabled:
+            return NO_SPAN
+        return Span(self, name, category, args)
+
+    def record(self, name: str, category: str, start_ns: int, end_ns: int, args: dict):
+        thread_id = threading.get_native_id()
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            # Trace events are in microseconds
+            "ts": (start_ns - self._start_ns) / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": os.getpid(),
+            "tid": thread_id,
+            "args": args,
+        }
+
+        with self._lock:
+            self._events.append(event)
+            if thread_id not in self._thread_names:
+                self._thread_names[thread_id] = threading.current_thread().name
+
+    def save(self, path: Path):
+        """Write recorded spans as Chrome trace JSON file"""
+        with self._lock:
+            metadata = [
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": os.getpid(),
+                    "tid": thread_id,
+                    "args": {"name": thread_name},
+                }
+                for thread_id, thread_name in self._thread_names.items()
+            ]
+            events = metadata + self._events
+
+        with open(path, "w") as trace_file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, trace_file)
+
+
+NO_SPAN = NoSpan()
+
+# Tracer of the app, enabled by `--trace` option
+TRACER = Tracer()
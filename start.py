@@ -1,13 +1,49 @@
 #!/usr/bin/env python
 """
         Usage:
-                start.py [-s SHELL] [-d SCRIPTS_DIRECTORY] [-o OUTPUT_CONTROLLER] [-e ERRORS_BUFFER_PATH]
+                start.py [-p | -j JOBS] [-i] [--resume] [-t TIMEOUT] [-s SHELL] [-d SCRIPTS_DIRECTORY] [-o OUTPUT_CONTROLLER]
+                         [--rules FILE] [--prompt-timeout AGE] [--unmatched POLICY] [-b ERRORS_BUFFER] [-e ERRORS_BUFFER_PATH]
+                         [-m MEMORY_LIMIT] [-z COMPRESSION] [--rotate-size SIZE] [--rotate-age AGE] [--keep-size SIZE]
+                         [--keep-age AGE] [--trace FILE] [--profile]
+                start.py logs [--run RUN] [--stdout | --stderr] [--tail LINES] [SCRIPT]
+                start.py logs --runs
 
         Options:
+                -p                              Execute scripts with the same number at the same time.
+                -j JOBS                         Execute scripts as soon as scripts they need are done, on JOBS shells.
+                -i                              Show status of each script once and summary of all scripts at the end.
+                --resume                        Skip scripts which succeeded in previous run and were not changed since.
+                -t TIMEOUT                      Kill processes of script running over TIMEOUT, like 30m, unless script has
+                                                timeout annotation.
                 -s SHELL                        Shell by which scripts will be executed.
                 -d SCRIPTS_DIRECTORY            Directory with scripts which will be executed.
+                -b ERRORS_BUFFER                Buffer for scripts errors. See 'Choices' for possible options.
                 -e ERRORS_BUFFER_PATH           Path to temporary errors file buffer. By default "/tmp".
                 -o OUTPUT_CONTROLLER            Controll output format. See 'Choices' for possible options.
+                --rules FILE                    JSON list of prompts and responses for 'autoresponder' controller,
+                                                like [{"prompt": "Continue\\\\? \\\\[Y/n\\\\]", "response": "y"}].
+                --prompt-timeout AGE            Handle prompt, which no rule matches, by POLICY after AGE, like 5m.
+                                                By default 60s.
+                --unmatched POLICY              Policy for prompts which no rule matches. See 'Choices' for possible options.
+                -m MEMORY_LIMIT                 Memory for errors waiting in pipe buffer of each script and for logs waiting to
+                                                be written, like 512K or 4M. By default 1M.
+                -z COMPRESSION                  Compress logs in background. See 'Choices' for possible options.
+                --rotate-size SIZE              Start new part of log, when it gets over SIZE of output, like 100M.
+                --rotate-age AGE                Start new part of log, when it is open for over AGE, like 30m or 1h.
+                --keep-size SIZE                Remove the oldest logs, until all of them take at most SIZE, like 1G.
+                --keep-age AGE                  Remove logs older than AGE, like 7d.
+                --trace FILE                    Save time of each phase of scripts execution to FILE, viewable in Perfetto.
+                --profile                       Save the hottest functions of the app and its collapsed stacks for flamegraph
+                                                to logs directory.
+
+        Logs options:
+                SCRIPT                          Show output of script stored by 'terminalstore' controller. Without it scripts
+                                                of the run are listed.
+                --run RUN                       Run which logs are shown. By default the latest one.
+                --runs                          List runs with stored logs.
+                --stdout                        Show only standard output of script.
+                --stderr                        Show only errors of script.
+                --tail LINES                    Show only last LINES lines of script's output.
 
 
         Choices:
@@ -18,26 +54,61 @@
                         1. terminal         print output to terminal.
                         2. terminalfile     print output to terminal and save it to files.
                        *3. terminalcolor    print output on green, success on blue, errors and fails on red.
+                        4. jsonl            save output, errors, statuses and summary as JSON lines to one file.
+                        5. terminalstore    print output to terminal and save output of all scripts to one indexed file.
+                        6. autoresponder    print output to terminal and answer prompts of scripts by rules.
 
 
                 SHELLs:
                        *1. bash             execute scripts by /bin/bash .
 
+
+                ERRORS_BUFFERs:
+                       *1. file             collect errors in temporary file, which is checked periodically.
+                        2. pipe             stream errors through named pipe as soon as they are written.
+
+
+                POLICYs:
+                       *1. enter            send empty line, so prompt takes its default answer.
+                        2. eof              end script's input.
+                        3. kill             kill processes of script.
+
+
+                COMPRESSIONs:
+                        1. gzip             compress logs by gzip.
+                        2. zstd             compress logs by zstandard, much faster. Requires zstandard package.
+
 """
 from pathlib import Path
 import sys
 
 from docopt import docopt
 
-from src.app import main
+from src.app import main, show_logs
+from src.temporary_errors_buffer import TempErrorFile
+from src.output_input_controllers.log_codecs import LogCodec
+from src.output_buffer import OutputBuffer
+from src.log_store import LogStore
 from src.cli_utils import (
+    parse_cli_errors_buffer,
     parse_cli_output_input_controller,
     parse_cli_scripts_directory,
     parse_cli_errors_directory,
+    parse_cli_memory_limit,
+    parse_cli_responder,
+    parse_cli_logs_streams,
+    parse_cli_logs_run,
+    parse_cli_log_codec,
+    parse_cli_trace,
+    parse_cli_tail,
+    parse_cli_size,
+    parse_cli_jobs,
+    parse_cli_age,
     parse_cli_shell,
     find_shell,
 )
 from src.output_input_controllers.controllers import TerminalOutputInputColor
+from src.output_input_controllers.utils import LOGS_DIR_PATH, get_profile_path
 
 
 if __name__ == "__main__":
@@ -46,11 +117,28 @@ if __name__ == "__main__":
     # By default scripts are in ./scripts directory
     default_scripts_directory = Path(sys.argv[0]).parent.joinpath("scripts")
 
+    # Results of scripts are recorded next to start.py, to allow resuming a run
+    ledger_path = Path(sys.argv[0]).parent.joinpath(".run_ledger.jsonl")
+
     # By default errors buffer is in /tmp directory
     default_error_buffer_directory = Path("/tmp")
 
     args = docopt(__doc__)
 
+    if args["logs"]:
+        if args["--runs"]:
+            for run in LogStore.list_runs(LOGS_DIR_PATH):
+                print(run)
+        else:
+            show_logs(
+                logs_directory=LOGS_DIR_PATH,
+                run=parse_cli_logs_run(args, LOGS_DIR_PATH),
+                script_name=args["SCRIPT"],
+                streams=parse_cli_logs_streams(args),
+                tail=parse_cli_tail(args),
+            )
+        sys.exit(0)
+
     output_input_controller = (
         parse_cli_output_input_controller(args) or default_output_input_controller
     )
@@ -59,6 +147,8 @@ if __name__ == "__main__":
 
     shell = parse_cli_shell(args) or find_shell()
 
+    errors_buffer_class = parse_cli_errors_buffer(args) or TempErrorFile
+
     errors_directory = (
         parse_cli_errors_directory(args) or default_error_buffer_directory
     )
@@ -68,4 +158,20 @@ if __name__ == "__main__":
         script_folder_path=scripts_directory,
         oi_controller=output_input_controller,
         errors_buffer_path=errors_directory,
+        parallel=args["-p"],
+        jobs=parse_cli_jobs(args),
+        errors_buffer_class=errors_buffer_class,
+        incremental_summary=args["-i"],
+        ledger_path=ledger_path,
+        resume=args["--resume"],
+        memory_limit=parse_cli_memory_limit(args) or OutputBuffer.MEMORY_LIMIT,
+        log_codec=parse_cli_log_codec(args) or LogCodec,
+        rotate_size=parse_cli_size(args, "--rotate-size", "Rotation size"),
+        rotate_age=parse_cli_age(args, "--rotate-age", "Rotation age"),
+        keep_size=parse_cli_size(args, "--keep-size", "Logs size"),
+        keep_age=parse_cli_age(args, "--keep-age", "Logs age"),
+        trace_path=parse_cli_trace(args),
+        profile_path=get_profile_path() if args["--profile"] else None,
+        timeout=parse_cli_age(args, "-t", "Timeout"),
+        responder=parse_cli_responder(args),
     )
@@ -2,13 +2,17 @@ from subprocess import Popen
 from pathlib import Path
 import pytest
 
-from src.temporary_errors_buffer import TempErrorFile
+from src.temporary_errors_buffer import ErrorsPipe, TempErrorFile
+from src.control_channel import ControlChannel
+from src.output_input_controllers.utils import flush_terminal
 from src.output_input_controllers.controllers import (
     TerminalOutputInputColor,
+    JsonlOutputInput,
     TerminalFileOutputInput,
     TerminalOutputInput,
 )
-from src.script_executor import ScriptExecutor
+from src.script_executor import PipeScriptExecutor, ScriptExecutor
+from src.scheduler import DependencyGraph
 from src.script import _ScriptName
 from src.shell import BashShell
 from src.module import Module
@@ -90,6 +94,46 @@ def non_executable_path():
     return Path(path)
 
 
+@pytest.fixture
+def annotated_scripts_dir(tmp_path):
+    scripts = {
+        "update_0.sh": "",
+        "install_xorg_1.sh": "# needs: update_0.sh\n",
+        "install_lightdm_2.sh": "# needs: update_0.sh\n",
+        "set_up_xfce_3.sh": "# Set up xfce\n# needs: install_xorg_1.sh\n",
+        "reboot_4.sh": "",
+    }
+    for name, header in scripts.items():
+        tmp_path.joinpath(name).write_text(f"#!/bin/bash\n{header}\necho {name}\n")
+    return tmp_path
+
+
+@pytest.fixture
+def cyclic_scripts_dir(tmp_path):
+    tmp_path.joinpath("first_0.sh").write_text("#!/bin/bash\n# needs: second_1.sh\n")
+    tmp_path.joinpath("second_1.sh").write_text("#!/bin/bash\n# needs: first_0.sh\n")
+    return tmp_path
+
+
+@pytest.fixture
+def dependency_graph(annotated_scripts_dir):
+    return DependencyGraph(Module(annotated_scripts_dir))
+
+
+@pytest.fixture
+def non_interactive_script(tmp_path):
+    tmp_path.joinpath("pipe_0.sh").write_text(
+        "#!/bin/bash\n# interactive: no\n\n"
+        + "echo This is standard notification\necho This is error >&2\nexit 3\n"
+    )
+    return Script("pipe_0.sh", tmp_path)
+
+
+@pytest.fixture
+def pipe_script_executor(non_interactive_script, terminal_oi):
+    return PipeScriptExecutor(non_interactive_script, terminal_oi)
+
+
 @pytest.fixture
 def terminal_oi():
     return TerminalOutputInput()
@@ -105,11 +149,39 @@ def terminal_file_oi():
     return TerminalFileOutputInput()
 
 
+@pytest.fixture
+def jsonl_oi(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.output_input_controllers.utils.LOGS_DIR_PATH", tmp_path)
+    monkeypatch.setattr(JsonlOutputInput, "scripts_statuses", [])
+    monkeypatch.setattr(JsonlOutputInput, "scripts_durations", {})
+    monkeypatch.setattr(JsonlOutputInput, "scripts_usages", {})
+    monkeypatch.setattr(JsonlOutputInput, "scripts_timeouts", {})
+    monkeypatch.setattr(JsonlOutputInput, "scripts_orphans", {})
+    return JsonlOutputInput()
+
+
 @pytest.fixture
 def temp_err_buffer():
     return TempErrorFile(ERRORS_BUFFER_DIR)
 
 
+@pytest.fixture
+def temp_err_pipe():
+    return ErrorsPipe(ERRORS_BUFFER_DIR)
+
+
+@pytest.fixture
+def script_executor_error_pipe(bash_shell, script_error, terminal_oi, temp_err_pipe):
+    bash_shell.spawn_shell(timeout=0.2)
+    return ScriptExecutor(script_error, bash_shell, terminal_oi, temp_err_pipe)
+
+
+@pytest.fixture
+def control_channel():
+    with ControlChannel() as channel:
+        yield channel
+
+
 @pytest.fixture
 def script_executor(bash_shell, bash_output_script, terminal_oi, temp_err_buffer):
     bash_shell.spawn_shell(timeout=0.2)
@@ -160,3 +232,10 @@ def script_executor_output(bash_shell, script_echo, terminal_oi, temp_err_buffer
 def script_executor_input(bash_shell, script_input, terminal_oi, temp_err_buffer):
     bash_shell.spawn_shell(timeout=0.2)
     return ScriptExecutor(script_input, bash_shell, terminal_oi, temp_err_buffer)
+
+
+@pytest.fixture(autouse=True)
+def flushed_terminal():
+    """Do not let output collected by one test appear in the next one"""
+    yield
+    flush_terminal()
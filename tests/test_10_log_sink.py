@@ -0,0 +1,167 @@
+from time import sleep, time
+import gzip
+import os
+
+from src.output_input_controllers.log_codecs import GzipLogCodec
+from src.output_input_controllers.log_sink import LogSink
+from src.output_input_controllers import utils
+
+
+def test_write_is_buffered(tmp_path):
+    log_path = tmp_path.joinpath("logs", "script.log")
+    sink = LogSink(flush_interval=60)
+
+    sink.write(log_path, "first line\n")
+
+    assert log_path.exists() is False
+    sink.close()
+    assert log_path.read_text() == "first line\n"
+
+
+def test_flush_on_size(tmp_path):
+    log_path = tmp_path.joinpath("script.log")
+    sink = LogSink(flush_size=10, flush_interval=60)
+
+    sink.write(log_path, "more than ten characters\n")
+    sleep(0.1)
+
+    assert log_path.read_text() == "more than ten characters\n"
+    sink.close()
+
+
+def test_flush_on_interval(tmp_path):
+    log_path = tmp_path.joinpath("script.log")
+    sink = LogSink(flush_interval=0.05)
+
+    sink.write(log_path, "line\n")
+    sleep(0.2)
+
+    assert log_path.read_text() == "line\n"
+    sink.close()
+
+
+def test_close_stops_writer(tmp_path):
+    log_path = tmp_path.joinpath("script.log")
+    sink = LogSink(flush_interval=60)
+
+    sink.write(log_path, "first\n")
+    writer = sink._writer
+    sink.close()
+
+    assert writer.is_alive() is False
+    assert log_path.read_text() == "first\n"
+
+    # Next write starts writer again
+    sink.write(log_path, "second\n")
+    sink.close()
+    assert log_path.read_text() == "first\nsecond\n"
+
+
+def test_close_one_log(tmp_path):
+    first_path, second_path = tmp_path.joinpath("1.log"), tmp_path.joinpath("2.log")
+    sink = LogSink(flush_interval=60)
+
+    sink.write(first_path, "first\n")
+    sink.write(second_path, "second\n")
+    sink.close(first_path)
+
+    assert first_path.read_text() == "first\n"
+    assert second_path.exists() is False
+    sink.close()
+
+
+def test_appending(tmp_path):
+    log_path = tmp_path.joinpath("script.log")
+    sink = LogSink(flush_interval=60)
+
+    for line in ("first\n", "second\n"):
+        sink.write(log_path, line)
+        sink.flush()
+
+    sink.write(log_path, "third\n")
+    sink.close()
+
+    assert log_path.read_text() == "first\nsecond\nthird\n"
+
+
+def test_flush_on_memory_limit(tmp_path):
+    log_path = tmp_path.joinpath("script.log")
+    sink = LogSink(flush_interval=60, memory_limit=10)
+
+    sink.write(log_path, "more than ten characters\n")
+
+    # Written by the caller, without waiting for writer thread
+    assert log_path.read_text() == "more than ten characters\n"
+    sink.close()
+
+
+def test_gzip_codec(tmp_path):
+    log_path = tmp_path.joinpath("script.log")
+    sink = LogSink(flush_interval=60, codec=GzipLogCodec)
+
+    sink.write(log_path, "first\n")
+    sink.close()
+    # Reopened log is continued by a new gzip member
+    sink.write(log_path, "second\n")
+    sink.close()
+
+    assert log_path.exists() is False
+    with gzip.open(tmp_path.joinpath("script.log.gz"), "rt") as log:
+        assert log.read() == "first\nsecond\n"
+
+
+def test_rotate_on_size(tmp_path):
+    log_path = tmp_path.joinpath("script.log")
+    sink = LogSink(flush_interval=60, rotate_size=10)
+
+    for line in ("first line\n", "second line\n", "third\n"):
+        sink.write(log_path, line)
+        sink.flush()
+    sink.close()
+
+    assert tmp_path.joinpath("script.log.1").read_text() == "first line\n"
+    assert tmp_path.joinpath("script.log.2").read_text() == "second line\n"
+    assert log_path.read_text() == "third\n"
+
+
+def test_rotate_on_age(tmp_path):
+    log_path = tmp_path.joinpath("script.log")
+    sink = LogSink(flush_interval=60, rotate_age=0.1, codec=GzipLogCodec)
+
+    sink.write(log_path, "first\n")
+    sink.flush()
+    sleep(0.2)
+    sink.write(log_path, "second\n")
+    sink.flush()
+    sink.close()
+
+    with gzip.open(tmp_path.joinpath("script.log.1.gz"), "rt") as log:
+        assert log.read() == "first\nsecond\n"
+    assert tmp_path.joinpath("script.log.gz").exists() is False
+
+
+def test_remove_old_logs(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "LOGS_DIR_PATH", tmp_path)
+    day = 24 * 60 * 60
+
+    for name, age in (
+        ("old.log", 10 * day),
+        ("run.segment", 3 * day),
+        ("run.index", 3 * day),
+        ("older.log", 2 * day),
+        ("new.log", 0),
+    ):
+        path = tmp_path.joinpath(name)
+        path.write_text("x" * 10)
+        os.utime(path, (time() - age, time() - age))
+
+    assert utils.remove_old_logs(max_age=7 * day) == [tmp_path.joinpath("old.log")]
+
+    # Log store is removed as a whole
+    removed = utils.remove_old_logs(max_size=15)
+    assert sorted(path.name for path in removed) == [
+        "older.log",
+        "run.index",
+        "run.segment",
+    ]
+    assert os.listdir(tmp_path) == ["new.log"]
@@ -0,0 +1,120 @@
+from src.output_input_controllers.controllers import TerminalOutputInput
+from src.ledger import RunLedger
+from src.script import Script
+from src.shell import BashShell
+from src.app import Runner
+
+
+def test_record_is_synced(tmp_path, bash_output_script):
+    ledger_path = tmp_path.joinpath("ledger.jsonl")
+
+    with RunLedger(ledger_path) as ledger:
+        ledger.record(bash_output_script, 0)
+
+        assert str(bash_output_script.path.resolve()) in ledger_path.read_text()
+
+
+def test_resume(tmp_path, bash_output_script, script_error):
+    ledger_path = tmp_path.joinpath("ledger.jsonl")
+
+    with RunLedger(ledger_path) as ledger:
+        ledger.record(bash_output_script, 0)
+        ledger.record(script_error, 1)
+
+    with RunLedger(ledger_path, resume=True) as ledger:
+        assert ledger.is_succeeded(bash_output_script) is True
+        assert ledger.is_succeeded(script_error) is False
+
+
+def test_resume_last_record_wins(tmp_path, bash_output_script):
+    ledger_path = tmp_path.joinpath("ledger.jsonl")
+
+    with RunLedger(ledger_path) as ledger:
+        ledger.record(bash_output_script, 0)
+        ledger.record(bash_output_script, 1)
+
+    with RunLedger(ledger_path, resume=True) as ledger:
+        assert ledger.is_succeeded(bash_output_script) is False
+
+
+def test_resume_changed_script(tmp_path, annotated_scripts_dir):
+    ledger_path = tmp_path.joinpath("ledger.jsonl")
+    script = Script("update_0.sh", annotated_scripts_dir)
+
+    with RunLedger(ledger_path) as ledger:
+        ledger.record(script, 0)
+
+    script.path.write_text("#!/bin/bash\necho changed\n")
+    script = Script("update_0.sh", annotated_scripts_dir)
+
+    with RunLedger(ledger_path, resume=True) as ledger:
+        assert ledger.is_succeeded(script) is False
+
+
+def test_resume_interrupted_record(tmp_path, bash_output_script):
+    ledger_path = tmp_path.joinpath("ledger.jsonl")
+
+    with RunLedger(ledger_path) as ledger:
+        ledger.record(bash_output_script, 0)
+
+    with open(ledger_path, "a") as ledger_file:
+        ledger_file.write('{"path": "/scr')
+
+    with RunLedger(ledger_path, resume=True) as ledger:
+        assert ledger.is_succeeded(bash_output_script) is True
+
+
+def test_new_run_truncates(tmp_path, bash_output_script):
+    ledger_path = tmp_path.joinpath("ledger.jsonl")
+
+    with RunLedger(ledger_path) as ledger:
+        ledger.record(bash_output_script, 0)
+
+    RunLedger(ledger_path).close()
+
+    with RunLedger(ledger_path, resume=True) as ledger:
+        assert ledger.is_succeeded(bash_output_script) is False
+
+
+def test_new_run_keeps_other_directories(tmp_path, bash_output_script):
+    ledger_path = tmp_path.joinpath("ledger.jsonl")
+    scripts_dir = tmp_path.joinpath("scripts")
+    scripts_dir.mkdir()
+    scripts_dir.joinpath("other_0.sh").write_text("#!/bin/bash\necho other\n")
+    other_script = Script("other_0.sh", scripts_dir)
+
+    with RunLedger(ledger_path) as ledger:
+        ledger.record(bash_output_script, 0)
+        ledger.record(other_script, 0)
+
+    # Run of other directory drops only its own records
+    RunLedger(ledger_path, scripts_directory=scripts_dir).close()
+
+    with RunLedger(ledger_path, resume=True) as ledger:
+        assert ledger.is_succeeded(bash_output_script) is True
+        assert ledger.is_succeeded(other_script) is False
+
+
+def test_execute_script_records(tmp_path, script_executor_output, capfd):
+    ledger_path = tmp_path.joinpath("ledger.jsonl")
+
+    with RunLedger(ledger_path) as ledger:
+        script_executor_output.ledger = ledger
+        with script_executor_output.shell:
+            script_executor_output.execute_script()
+
+    with RunLedger(ledger_path, resume=True) as ledger:
+        assert ledger.is_succeeded(script_executor_output.script) is True
+
+
+def test_runner_skips_succeeded(tmp_path, bash_output_script, capfd):
+    ledger_path = tmp_path.joinpath("ledger.jsonl")
+
+    with RunLedger(ledger_path) as ledger:
+        ledger.record(bash_output_script, 0)
+
+    with RunLedger(ledger_path, resume=True) as ledger:
+        runner = Runner(BashShell(), TerminalOutputInput(), tmp_path, ledger=ledger)
+        runner.execute_in_own_shell(bash_output_script)
+
+    assert "skipped" in capfd.readouterr().out
@@ -0,0 +1,89 @@
+from pathlib import Path
+import os
+
+import pytest
+
+from src.manifest import Manifest
+from src.module import Module
+from src.script import Script
+
+# Far enough in the past, so files are not racily modified
+OLD_MTIME = 1_000_000_000
+
+
+def set_old_mtime(*paths: Path):
+    for path in paths:
+        os.utime(path, (OLD_MTIME, OLD_MTIME))
+
+
+@pytest.fixture
+def stable_scripts_dir(annotated_scripts_dir):
+    set_old_mtime(*annotated_scripts_dir.iterdir(), annotated_scripts_dir)
+    return annotated_scripts_dir
+
+
+def list_names(module: Module) -> list:
+    return [(number, str(script)) for number, script in module._list_sorted_scripts()]
+
+
+def test_manifest_is_next_to_directory(stable_scripts_dir):
+    Module(stable_scripts_dir)._list_sorted_scripts()
+
+    assert Manifest(stable_scripts_dir).path.exists()
+    assert Manifest(stable_scripts_dir).path.parent == stable_scripts_dir.parent
+
+
+def test_manifest_listing(stable_scripts_dir):
+    uncached = list_names(Module(stable_scripts_dir, use_manifest=False))
+
+    assert list_names(Module(stable_scripts_dir)) == uncached
+    # Listing from manifest
+    assert list_names(Module(stable_scripts_dir)) == uncached
+
+
+def test_manifest_does_not_read_scripts(stable_scripts_dir, monkeypatch):
+    Module(stable_scripts_dir)._list_sorted_scripts()
+
+    def fail(*_args):
+        raise AssertionError("Script was read")
+
+    monkeypatch.setattr(Script, "__iter__", fail)
+    monkeypatch.setattr(Script, "find_content_hash", fail)
+
+    scripts = dict(
+        (str(script), script)
+        for _, script in Module(stable_scripts_dir)._list_sorted_scripts()
+    )
+    assert scripts["set_up_xfce_3.sh"].find_dependencies() == ["install_xorg_1.sh"]
+    assert scripts["update_0.sh"].find_shebang_path() == "/bin/bash"
+
+
+def test_manifest_modified_script(stable_scripts_dir):
+    Module(stable_scripts_dir)._list_sorted_scripts()
+
+    script_path = stable_scripts_dir.joinpath("reboot_4.sh")
+    script_path.write_text("#!/bin/bash\n# needs: update_0.sh\n")
+    os.utime(script_path, (OLD_MTIME, OLD_MTIME + 1))
+
+    scripts = dict(
+        (str(script), script)
+        for _, script in Module(stable_scripts_dir)._list_sorted_scripts()
+    )
+    assert scripts["reboot_4.sh"].find_dependencies() == ["update_0.sh"]
+
+
+def test_manifest_added_script(stable_scripts_dir):
+    Module(stable_scripts_dir)._list_sorted_scripts()
+
+    stable_scripts_dir.joinpath("clean_5.sh").write_text("#!/bin/bash\n")
+
+    assert list_names(Module(stable_scripts_dir))[-1] == (5, "clean_5.sh")
+
+
+def test_manifest_corrupted(stable_scripts_dir):
+    manifest = Manifest(stable_scripts_dir)
+    manifest.path.write_text('{"version": 1, "scri')
+
+    assert list_names(Module(stable_scripts_dir)) == list_names(
+        Module(stable_scripts_dir, use_manifest=False)
+    )
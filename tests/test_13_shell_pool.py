@@ -0,0 +1,90 @@
+from src.control_channel import ControlChannel
+from src.shell_pool import ShellPool
+from src.shell import BashShell
+
+
+def run(pool: ShellPool, shell: BashShell, command: str):
+    """Send command and wait until shell executes it"""
+    shell.send_command(command)
+    assert pool.is_healthy(shell)
+
+
+def test_pool_spawns_shells():
+    with ShellPool(BashShell, 2) as pool:
+        first, second = pool.checkout(), pool.checkout()
+
+        assert first is not second
+        assert first.process.isalive() and second.process.isalive()
+
+
+def test_pool_grows():
+    with ShellPool(BashShell, 1) as pool:
+        pool.checkout()
+
+        assert pool.checkout().process.isalive()
+
+
+def test_pool_reuses_shell():
+    with ShellPool(BashShell, 1) as pool:
+        with pool.shell() as first:
+            pass
+        with pool.shell() as second:
+            pass
+
+        assert first is second
+
+
+def test_pool_resets_environment(tmp_path):
+    output_path = tmp_path.joinpath("output")
+
+    with ShellPool(BashShell, 1) as pool:
+        with pool.shell() as shell:
+            run(pool, shell, f"export POOL_VARIABLE=leaked; cd {tmp_path}")
+
+        with pool.shell() as shell:
+            run(pool, shell, f'echo "$POOL_VARIABLE:$PWD" > {output_path}')
+
+    variable, working_directory = output_path.read_text().strip().split(":")
+    assert variable == ""
+    assert working_directory != str(tmp_path)
+
+
+def test_pool_drops_leftovers():
+    with ShellPool(BashShell, 1) as pool:
+        with pool.shell() as shell:
+            run(pool, shell, "echo leftover")
+            shell.send_command(shell.create_control_pid_command())
+
+        with pool.shell() as shell:
+            assert shell.control_channel.wait_for(ControlChannel.PID, 0) is None
+            assert "leftover" not in shell.read_output_line()
+
+
+def test_pool_replaces_dead_shell():
+    with ShellPool(BashShell, 1) as pool:
+        with pool.shell() as shell:
+            shell.process.terminate(force=True)
+
+        with pool.shell() as new_shell:
+            assert new_shell is not shell
+            assert pool.is_healthy(new_shell)
+
+
+def test_pool_retires_interrupted_shell():
+    with ShellPool(BashShell, 1) as pool:
+        try:
+            with pool.shell() as shell:
+                raise KeyboardInterrupt
+        except KeyboardInterrupt:
+            pass
+
+        assert shell.process.isalive() is False
+
+
+def test_pool_close():
+    pool = ShellPool(BashShell, 2)
+    shells = [pool.checkout(), pool.checkout()]
+
+    pool.close()
+
+    assert all(not shell.process.isalive() for shell in shells)
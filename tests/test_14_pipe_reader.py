@@ -0,0 +1,51 @@
+import os
+
+from src.pipe_reader import PipeReader
+
+
+def test_read_whole_lines():
+    read_fd, write_fd = os.pipe()
+
+    with PipeReader(read_fd) as pipe:
+        os.write(write_fd, b"first\nsecond\nthi")
+        assert pipe.read() == "first\nsecond\n"
+
+        os.write(write_fd, b"rd\n")
+        assert pipe.read() == "third\n"
+
+    os.close(write_fd)
+
+
+def test_read_nothing_waiting():
+    read_fd, write_fd = os.pipe()
+
+    with PipeReader(read_fd) as pipe:
+        assert pipe.read() == ""
+        assert pipe.closed is False
+
+    os.close(write_fd)
+
+
+def test_read_closed_pipe():
+    read_fd, write_fd = os.pipe()
+
+    with PipeReader(read_fd) as pipe:
+        os.write(write_fd, "prompt ą".encode()[:-1])
+        assert pipe.read() == ""
+
+        os.close(write_fd)
+        assert pipe.read() == "prompt �"
+        assert pipe.closed is True
+
+
+def test_read_long_line():
+    read_fd, write_fd = os.pipe()
+
+    with PipeReader(read_fd) as pipe:
+        pipe.CHUNK_SIZE = 8
+        os.write(write_fd, b"progress: 10%")
+        assert pipe.read() == ""
+        assert pipe.read() == "progress: 10%"
+        assert pipe.flush() == ""
+
+    os.close(write_fd)
@@ -0,0 +1,45 @@
+from src.output_buffer import OutputBuffer
+
+
+def test_write_in_memory():
+    with OutputBuffer(memory_limit=10) as buffer:
+        buffer.write(b"first")
+
+        assert buffer.is_spilled is False
+        assert len(buffer) == 5
+        assert buffer.read() == b"first"
+        assert len(buffer) == 0
+
+
+def test_spill_over_limit():
+    with OutputBuffer(memory_limit=10) as buffer:
+        buffer.write(b"first ")
+        buffer.write(b"second ")
+        buffer.write(b"third")
+
+        assert buffer.is_spilled is True
+        assert buffer._memory_size == 6
+        assert buffer.read() == b"first second third"
+        assert buffer.is_spilled is False
+
+
+def test_read_in_order():
+    with OutputBuffer(memory_limit=4) as buffer:
+        buffer.write(b"abc")
+        buffer.write(b"defg")
+
+        assert buffer.read(2) == b"ab"
+        # Output keeps going to file until file is read
+        buffer.write(b"h")
+        assert buffer.read(4) == b"cdef"
+        assert buffer.read() == b"gh"
+
+
+def test_spill_file_is_reused():
+    with OutputBuffer(memory_limit=1) as buffer:
+        buffer.write(b"spilled")
+        assert buffer.read() == b"spilled"
+
+        buffer.write(b"again")
+        assert buffer._spill_write_offset == 5
+        assert buffer.read() == b"again"
@@ -0,0 +1,67 @@
+from io import StringIO
+from time import sleep
+
+from colorama import Fore, Style
+
+from src.output_input_controllers.terminal_writer import TerminalWriter
+
+
+def test_write_is_batched():
+    stream = StringIO()
+    writer = TerminalWriter(flush_interval=10, stream=stream)
+
+    writer.write("first\n")
+    writer.write("second\n")
+    assert stream.getvalue() == ""
+
+    writer.flush()
+    assert stream.getvalue() == (
+        Style.RESET_ALL
+        + "first\n"
+        + Style.RESET_ALL
+        + Style.RESET_ALL
+        + "second\n"
+        + Style.RESET_ALL
+    )
+
+
+def test_flush_over_size():
+    stream = StringIO()
+    writer = TerminalWriter(flush_size=10, flush_interval=10, stream=stream)
+
+    writer.write("short")
+    assert stream.getvalue() == ""
+
+    writer.write("long enough")
+    assert "short" in stream.getvalue() and "long enough" in stream.getvalue()
+
+
+def test_flush_after_interval():
+    stream = StringIO()
+    writer = TerminalWriter(flush_interval=0.01, stream=stream)
+
+    writer.write("delayed")
+    sleep(0.5)
+
+    assert "delayed" in stream.getvalue()
+
+
+def test_color_prefix():
+    stream = StringIO()
+    writer = TerminalWriter(stream=stream)
+
+    writer.write("error", Fore.RED)
+    writer.write("info", Fore.GREEN)
+    writer.flush()
+
+    assert stream.getvalue() == (
+        Style.RESET_ALL
+        + Fore.RED
+        + "error"
+        + Style.RESET_ALL
+        + Style.RESET_ALL
+        + Fore.GREEN
+        + "info"
+        + Style.RESET_ALL
+    )
+    assert writer._find_prefix(Fore.RED) is writer._find_prefix(Fore.RED)
@@ -0,0 +1,122 @@
+from pathlib import Path
+import subprocess
+import sys
+
+from src.log_store import LogReader, LogStore
+
+START_PATH = Path(__file__).parent.parent.joinpath("start.py").resolve()
+
+
+def run_start(directory: Path, *args: str) -> str:
+    """Run start.py linked to `directory`, so logs are kept inside it"""
+    return subprocess.run(
+        [sys.executable, str(directory.joinpath("start.py")), *args],
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+        timeout=60,
+        check=True,
+    ).stdout
+
+
+def test_read_script_output(tmp_path):
+    run_path = tmp_path.joinpath("run")
+
+    with LogStore(run_path) as store:
+        store.append("first.sh", "stdout", "first line\n")
+        store.append("second.sh", "stdout", "other script\n")
+        store.append("first.sh", "stderr", "error\n")
+        store.append("first.sh", "stdout", "second line\n")
+
+    with LogReader(run_path) as reader:
+        assert list(reader.script_ids) == ["first.sh", "second.sh"]
+        assert reader.read("first.sh") == b"first line\nerror\nsecond line\n"
+        assert reader.read("first.sh", ["stdout"]) == b"first line\nsecond line\n"
+        assert reader.read("second.sh", ["stderr"]) == b""
+        assert reader.find_sizes("first.sh") == {"stdout": 23, "stderr": 6}
+
+
+def test_tail(tmp_path):
+    run_path = tmp_path.joinpath("run")
+
+    with LogStore(run_path) as store:
+        for i in range(100):
+            store.append("script.sh", "stdout", f"{i}\n")
+        store.append("script.sh", "stdout", "100\n101")
+
+    with LogReader(run_path) as reader:
+        assert reader.tail("script.sh", 3) == b"99\n100\n101"
+        assert reader.tail("script.sh", 1) == b"101"
+        assert reader.tail("script.sh", 0) == b""
+        assert reader.tail("script.sh", 1000) == reader.read("script.sh")
+
+
+def test_flush_on_size(tmp_path):
+    run_path = tmp_path.joinpath("run")
+    store = LogStore(run_path, flush_size=20)
+
+    store.append("script.sh", "stdout", "short\n")
+    with LogReader(run_path) as reader:
+        assert reader.read("script.sh") == b""
+
+    store.append("script.sh", "stdout", "long enough\n")
+    with LogReader(run_path) as reader:
+        assert reader.read("script.sh") == b"short\nlong enough\n"
+
+    store.close()
+
+
+def test_continue_interrupted_store(tmp_path):
+    run_path = tmp_path.joinpath("run")
+
+    with LogStore(run_path) as store:
+        store.append("first.sh", "stdout", "first\n")
+
+    # Index entry cut by a crash
+    with open(store.index_path, "ab") as index:
+        index.write(b"\0" * 7)
+
+    with LogStore(run_path) as store:
+        store.append("second.sh", "stdout", "second\n")
+        store.append("first.sh", "stdout", "again\n")
+
+    with LogReader(run_path) as reader:
+        assert reader.read("first.sh") == b"first\nagain\n"
+        assert reader.read("second.sh") == b"second\n"
+
+
+def test_list_runs(tmp_path):
+    for run in ("2022-04-18", "2022-04-17"):
+        with LogStore(tmp_path.joinpath(run)) as store:
+            store.append("script.sh", "stdout", "output\n")
+
+    assert LogStore.list_runs(tmp_path) == ["2022-04-17", "2022-04-18"]
+    assert LogStore.list_runs(tmp_path.joinpath("missing")) == []
+
+
+def test_logs_command(tmp_path):
+    tmp_path.joinpath("start.py").symlink_to(START_PATH)
+    scripts_dir = tmp_path.joinpath("scripts")
+    scripts_dir.mkdir()
+    scripts_dir.joinpath("store_0.sh").write_text(
+        "#!/bin/bash\n# interactive: no\n\necho first\necho error >&2\necho second\n"
+    )
+    run_start(tmp_path, "-o", "terminalstore", "-d", str(scripts_dir))
+
+    runs = run_start(tmp_path, "logs", "--runs").split()
+    assert len(runs) == 1
+    assert run_start(tmp_path, "logs", "--run", runs[0]) == (
+        "store_0.sh    stdout: 13 B    stderr: 6 B\n"
+    )
+    # Streams read from pipes are stored in the order they were read
+    assert sorted(run_start(tmp_path, "logs", "store_0.sh").splitlines()) == [
+        "error",
+        "first",
+        "second",
+    ]
+    assert run_start(tmp_path, "logs", "--stdout", "store_0.sh") == "first\nsecond\n"
+    assert run_start(tmp_path, "logs", "--stderr", "store_0.sh") == "error\n"
+    assert (
+        run_start(tmp_path, "logs", "--stdout", "--tail", "1", "store_0.sh")
+        == "second\n"
+    )
@@ -0,0 +1,96 @@
+import threading
+import json
+
+import pytest
+
+from src.tracer import NO_SPAN, Tracer
+from tests.config import replace_stdin
+
+
+@pytest.fixture
+def tracer(monkeypatch):
+    tracer = Tracer()
+    tracer.enable()
+    monkeypatch.setattr("src.script_executor.TRACER", tracer)
+    return tracer
+
+
+def test_disabled_span():
+    tracer = Tracer()
+
+    with tracer.span("phase", script="script.sh"):
+        pass
+
+    assert tracer.span("phase") is NO_SPAN
+    assert tracer._events == []
+
+
+def test_save(tmp_path):
+    tracer = Tracer()
+    tracer.enable()
+
+    with tracer.span("run"):
+        with tracer.span("phase", "script", script="script.sh"):
+            pass
+
+    def work():
+        with tracer.span("worker"):
+            pass
+
+    thread = threading.Thread(target=work, name="worker_thread")
+    thread.start()
+    thread.join()
+
+    tracer.save(tmp_path.joinpath("trace.json"))
+    trace = json.loads(tmp_path.joinpath("trace.json").read_text())
+
+    events = {event["name"]: event for event in trace["traceEvents"]}
+    thread_names = {
+        event["tid"]: event["args"]["name"]
+        for event in trace["traceEvents"]
+        if event["ph"] == "M"
+    }
+
+    run, phase = events["run"], events["phase"]
+    assert run["ph"] == phase["ph"] == "X"
+    assert phase["cat"] == "script"
+    assert phase["args"] == {"script": "script.sh"}
+    # Phase is nested within run on the same track
+    assert run["tid"] == phase["tid"]
+    assert run["ts"] <= phase["ts"]
+    assert phase["ts"] + phase["dur"] <= run["ts"] + run["dur"]
+
+    # Each thread has its own named track
+    assert thread_names[run["tid"]] == "MainThread"
+    assert thread_names[events["worker"]["tid"]] == "worker_thread"
+
+
+@pytest.mark.parametrize(
+    "executor, phases",
+    [
+        (
+            "script_executor_output",
+            {"create_execution_command", "find_pid", "execution_loop"},
+        ),
+        ("pipe_script_executor", {"spawn", "execution_loop"}),
+    ],
+)
+def test_execute_script_phases(tracer, executor, phases, request):
+    script_executor = request.getfixturevalue(executor)
+
+    # Do not stop execution after failure
+    with replace_stdin("n\n"):
+        if script_executor.shell is None:
+            script_executor.execute_script()
+        else:
+            with script_executor.shell:
+                script_executor.execute_script()
+
+    names = [event["name"] for event in tracer._events]
+
+    assert phases | {"find_exit_code", "show_status", "handle_events"} <= set(names)
+    # Script's span is recorded when all its phases are done
+    assert names[-1] == "script"
+    assert {event["args"]["script"] for event in tracer._events} == {
+        str(script_executor.script)
+    }
@@ -0,0 +1,94 @@
+from pathlib import Path
+import subprocess
+import threading
+import signal
+import time
+import sys
+import re
+
+from src.profiler import Profiler
+
+
+def spin(seconds: float):
+    end = time.thread_time() + seconds
+    while time.thread_time() < end:
+        pass
+
+
+def wait_for_script():
+    subprocess.run(["bash", "-c", "for i in $(seq 20000); do :; done"])
+
+
+def profile_threads(directory: str):
+    with Profiler(Path(directory).joinpath("profile")):
+        spin(0.2)
+        worker = threading.Thread(target=spin, args=(0.2,), name="worker")
+        worker.start()
+        worker.join()
+
+
+def find_threads_time(stacks_path: Path) -> dict:
+    """Microseconds spent by each thread in `spin`"""
+    threads_time: dict = {}
+    for line in stacks_path.read_text().splitlines():
+        stack, microseconds = line.rsplit(" ", 1)
+        thread, *frames = stack.split(";")
+        if any(frame.startswith("spin ") for frame in frames):
+            threads_time[thread] = threads_time.get(thread, 0) + int(microseconds)
+    return threads_time
+
+
+def test_profile(tmp_path):
+    handler = signal.getsignal(signal.SIGPROF)
+
+    with Profiler(tmp_path.joinpath("profile")) as profiler:
+        spin(0.2)
+        wait_for_script()
+
+    # Script's CPU time is not orchestrator's time
+    assert profiler.scripts_usage["user"] + profiler.scripts_usage["system"] > 0.01
+    assert sum(profiler.orchestrator_usage.values()) >= 0.2
+    assert signal.getsignal(signal.SIGPROF) == handler
+
+    report = tmp_path.joinpath("profile.txt").read_text()
+    assert "Orchestrator CPU" in report
+    assert "Scripts CPU" in report
+    assert "Bottleneck: orchestrator" in report
+    assert re.search(r"test_19_profiler.py:\d+\(spin\)", report)
+
+    assert (
+        find_threads_time(tmp_path.joinpath("profile.collapsed"))["MainThread"]
+        > 100_000
+    )
+
+
+def test_profile_threads(tmp_path):
+    # Threads left by other tests could take SIGPROF, so
+    #   profiled app is started as a new process
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "from tests.test_19_profiler import profile_threads;"
+            + f"profile_threads({str(tmp_path)!r})",
+        ],
+        check=True,
+        cwd=Path(__file__).parent.parent,
+    )
+
+    report = tmp_path.joinpath("profile.txt").read_text()
+    # Function is profiled in both threads, so it was called twice
+    assert re.search(r"^ +2 .*\(spin\)$", report, re.MULTILINE)
+
+    threads_time = find_threads_time(tmp_path.joinpath("profile.collapsed"))
+    assert threads_time["MainThread"] > 100_000
+    assert threads_time["worker"] > 100_000
+
+
+def test_profile_waiting(tmp_path):
+    with Profiler(tmp_path.joinpath("profile")) as profiler:
+        time.sleep(0.3)
+
+    # Only CPU time is counted
+    assert sum(profiler.orchestrator_usage.values()) < 0.2
+    assert "Bottleneck" in tmp_path.joinpath("profile.txt").read_text()
@@ -25,3 +25,38 @@ def test_script_find_shebang_path(script_shebang):
 def test_script_cant_find_shebang_path(script_no_shebang):
     with pytest.raises(NoShebangError):
         script_no_shebang.find_shebang_path()
+
+
+def test_script_find_annotations(annotated_scripts_dir):
+    script = Script("set_up_xfce_3.sh", annotated_scripts_dir)
+    assert script.find_annotations() == {"needs": "install_xorg_1.sh"}
+    assert script.find_dependencies() == ["install_xorg_1.sh"]
+    assert script.is_annotated() is True
+
+
+def test_script_without_annotations(script_shebang):
+    assert script_shebang.find_annotations() == {}
+    assert script_shebang.find_dependencies() == []
+    assert script_shebang.is_annotated() is False
+
+
+def test_script_is_interactive(script_shebang, non_interactive_script):
+    assert script_shebang.is_interactive() is True
+    assert non_interactive_script.is_interactive() is False
+
+
+@pytest.mark.parametrize(
+    "header, timeout",
+    [
+        ("# timeout: 30\n", 30),
+        ("# timeout: 1.5s\n", 1.5),
+        ("# timeout: 30m\n", 30 * 60),
+        ("# Timeout: 2H\n", 2 * 60 * 60),
+        ("# timeout: forever\n", None),
+        ("# timeout: 0\n", None),
+        ("", None),
+    ],
+)
+def test_script_find_timeout(tmp_path, header, timeout):
+    tmp_path.joinpath("timeout_0.sh").write_text(f"#!/bin/bash\n{header}\nsleep 1\n")
+    assert Script("timeout_0.sh", tmp_path).find_timeout() == timeout
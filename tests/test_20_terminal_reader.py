@@ -0,0 +1,73 @@
+from select import select
+from io import StringIO
+import time
+import os
+
+from src.output_input_controllers.terminal_reader import TerminalReader
+
+
+def is_answered(request, timeout: float = 0) -> bool:
+    readers, _, _ = select([request], [], [], timeout)
+    return bool(readers)
+
+
+def test_requests_answered_in_order():
+    reader = TerminalReader(StringIO("first\nsecond\n"))
+
+    first, second = reader.request(), reader.request()
+    assert is_answered(second, timeout=1)
+
+    assert (first.line, second.line) == ("first\n", "second\n")
+    # End of input
+    assert reader.readline() == ""
+
+
+def test_request_does_not_block():
+    read_fd, write_fd = os.pipe()
+    with open(read_fd) as stream:
+        reader = TerminalReader(stream)
+
+        request = reader.request()
+        assert is_answered(request, timeout=0.2) is False
+
+        os.write(write_fd, b"answer\n")
+        assert is_answered(request, timeout=1)
+        assert request.line == "answer\n"
+
+        os.close(write_fd)
+        assert reader.readline() == ""
+
+
+def test_cancelled_line_is_kept():
+    read_fd, write_fd = os.pipe()
+    with open(read_fd) as stream:
+        reader = TerminalReader(stream)
+
+        # Line is read after its request was cancelled
+        reader.cancel(reader.request())
+        os.write(write_fd, b"late\n")
+
+        assert reader.readline() == "late\n"
+        os.close(write_fd)
+
+
+def test_has_input():
+    read_fd, write_fd = os.pipe()
+    with open(read_fd) as stream:
+        reader = TerminalReader(stream)
+        assert reader.has_input() is False
+
+        os.write(write_fd, b"answer\n")
+        assert reader.has_input() is True
+        assert reader.readline() == "answer\n"
+        assert reader.has_input() is False
+
+        # Line read after its request was cancelled is kept
+        reader.cancel(reader.request())
+        os.write(write_fd, b"late\n")
+        time.sleep(0.2)
+        assert reader.has_input() is True
+        os.close(write_fd)
+
+    # Stream without file descriptor is expected to have input
+    assert TerminalReader(StringIO("")).has_input() is True
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from src.output_input_controllers.responder import Responder
+
+
+@pytest.fixture
+def responder():
+    return Responder([(r"Name\?", "Alice"), (r"Continue\? \[Y/n\]", "y")])
+
+
+def test_feed(responder):
+    responder.feed("a_0.sh", "Name? ")
+    responder.feed("b_0.sh", "Continue? [Y/n] ")
+
+    assert responder.take_response("a_0.sh") == "Alice"
+    assert responder.take_response("b_0.sh") == "y"
+    # Answered prompt is not matched again
+    assert responder.take_response("a_0.sh") is None
+
+
+def test_feed_split_prompt(responder):
+    responder.feed("a_0.sh", "log\r\nContinue? [")
+    assert responder.take_response("a_0.sh") is None
+
+    responder.feed("a_0.sh", "Y/n] ")
+    assert responder.take_response("a_0.sh") == "y"
+
+
+def test_feed_after_prompt(responder):
+    # Whole lines, like output of background processes, keep response
+    responder.feed("a_0.sh", "Name?\r\n")
+    responder.feed("a_0.sh", "background\r\n")
+    assert responder.take_response("a_0.sh") == "Alice"
+
+    # Other prompt cancels it
+    responder.feed("a_0.sh", "Name?\r\n")
+    responder.feed("a_0.sh", "Password: ")
+    assert responder.take_response("a_0.sh") is None
+    assert responder.find_prompt("a_0.sh") == "Password:"
+
+    # Finished line is not a prompt
+    responder.feed("a_0.sh", "\r\nlog\r\n")
+    assert responder.find_prompt("a_0.sh") is None
+
+
+def test_feed_streams(responder):
+    # Output written before the prompt comes after it
+    responder.feed("a_0.sh", "Password: ", "stderr")
+    responder.feed("a_0.sh", "Hello Alice\r\n", "stdout")
+
+    assert responder.find_prompt("a_0.sh") == "Password:"
+
+
+def test_respond(responder):
+    assert responder.respond("Continue? [Y/n] ") == "y"
+    assert responder.respond("Password: ") is None
+    assert Responder().respond("Name?") is None
+
+
+@pytest.mark.parametrize(
+    "rules",
+    [
+        {"prompt": "Name?"},
+        [{"prompt": "Name?"}],
+        [{"prompt": "(", "response": "y"}],
+    ],
+)
+def test_from_file_invalid(tmp_path, rules):
+    path = tmp_path.joinpath("rules.json")
+    path.write_text(json.dumps(rules))
+
+    with pytest.raises(ValueError):
+        Responder.from_file(path)
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        Responder(policy="ignore")
@@ -1,4 +1,81 @@
+import pytest
+
+from src.output_input_controllers.controllers import TerminalOutputInput
+from src.module import Module
+from src.shell import BashShell
+from src.app import Runner
+
+
 def test_sorted_scripts(module):
     script_list = module._list_sorted_scripts()
     for i, script in enumerate(module):
         assert script.name.find_script_number() == script_list[i][0]
+
+
+def test_stages(module):
+    stages = list(module.stages())
+    assert sum(len(stage) for stage in stages) == len(list(module))
+    for stage in stages:
+        numbers = {script.name.find_script_number() for script in stage}
+        assert len(numbers) == 1
+    stages_numbers = [stage[0].name.find_script_number() for stage in stages]
+    assert stages_numbers == sorted(stages_numbers)
+
+
+def write_stage_scripts(directory, scripts):
+    for name, body in scripts.items():
+        directory.joinpath(name).write_text(
+            f"#!/bin/bash\n# interactive: no\n\ncd {directory}\n{body}"
+        )
+
+
+def test_execute_stages(tmp_path, monkeypatch, capfd):
+    monkeypatch.setattr(TerminalOutputInput, "scripts_statuses", [])
+    # Scripts sharing a number wait for each other, so they run at the same time
+    wait_for = (
+        "for i in $(seq 20); do [ -e {0} ] && break; sleep 0.1; done\n"
+        + "[ -e {0} ] || exit 1\n"
+    )
+    write_stage_scripts(
+        tmp_path,
+        {
+            "first_1.sh": "touch first\n"
+            + wait_for.format("second")
+            + "touch first_done\n",
+            "second_1.sh": "touch second\n"
+            + wait_for.format("first")
+            + "sleep 0.2\ntouch second_done\n",
+            "next_2.sh": "[ -e first_done ] && [ -e second_done ] && touch next_done\n",
+        },
+    )
+
+    runner = Runner(BashShell(), TerminalOutputInput(), tmp_path)
+    runner.execute_stages(Module(tmp_path))
+
+    # Next stage waited for both scripts
+    assert tmp_path.joinpath("next_done").exists()
+    assert TerminalOutputInput.scripts_statuses == [
+        {"first_1.sh": 0},
+        {"second_1.sh": 0},
+        {"next_2.sh": 0},
+    ]
+
+
+def test_execute_stages_exit(tmp_path, monkeypatch, capfd):
+    monkeypatch.setattr(TerminalOutputInput, "scripts_statuses", [])
+    # User chooses to stop execution after failure
+    monkeypatch.setattr(
+        TerminalOutputInput, "ask_to_exit", classmethod(lambda cls, name: exit(-1))
+    )
+    write_stage_scripts(
+        tmp_path,
+        {"fail_1.sh": "exit 1\n", "pass_1.sh": "", "next_2.sh": "touch next_done\n"},
+    )
+
+    runner = Runner(BashShell(), TerminalOutputInput(), tmp_path)
+    with pytest.raises(SystemExit):
+        runner.execute_stages(Module(tmp_path))
+
+    # Other script of the stage is finished, next stage is not started
+    assert {"pass_1.sh": 0} in TerminalOutputInput.scripts_statuses
+    assert not tmp_path.joinpath("next_done").exists()
@@ -1,7 +1,44 @@
-from colorama import Fore
+from types import SimpleNamespace
+import json
+import gzip
+
+import pytest
 
-from src.output_input_controllers.utils import get_log_file_path, create_log_name
+from colorama import Fore
 
+from src.output_input_controllers.events import (
+    Event,
+    ORPHANS,
+    STATUS,
+    STDERR,
+    STDOUT,
+    TIMEOUT,
+    TIMING,
+    USAGE,
+)
+from src.output_input_controllers.log_codecs import GzipLogCodec
+from src.output_input_controllers.base import OutputInputController
+from src.output_input_controllers.controllers import (
+    AutoResponderOutputInput,
+    TerminalStoreOutputInput,
+    TerminalFileOutputInput,
+    TerminalOutputInput,
+)
+
+from src.output_input_controllers.utils import (
+    get_events_log_path,
+    get_summary_path,
+    close_log_stores,
+    LOG_SINK,
+    get_log_file_path,
+    create_log_name,
+    flush_terminal,
+    close_logs,
+)
+
+from src.output_input_controllers.responder import Responder
+from src.log_store import LogReader, LogStore
+from src.process import ResourceUsage
 from tests.config import replace_stdin, open_log_with_cleanup
 
 
@@ -11,6 +48,7 @@ def test_terminal_oi_stdout(script_executor_terminal_oi, capfd):
 
     with script_executor.shell:
         script_executor.oi_controller.stdout = script_executor, OUTPUT
+        flush_terminal()
         out, err = capfd.readouterr()
         assert OUTPUT in out
 
@@ -32,6 +70,7 @@ def test_terminal_oi_stderr(script_executor_terminal_oi, capfd):
 
     with script_executor.shell:
         script_executor.oi_controller.stdout = script_executor, ERROR
+        flush_terminal()
         out, err = capfd.readouterr()
         assert ERROR in out
 
@@ -42,6 +81,7 @@ def test_terminal_color_oi_stdout(script_executor_terminal_color_oi, capfd):
 
     with script_executor.shell:
         script_executor.oi_controller.stdout = script_executor, OUTPUT
+        flush_terminal()
         out, err = capfd.readouterr()
         assert OUTPUT in out
 
@@ -63,6 +103,7 @@ def test_terminal_color_oi_stderr(script_executor_terminal_color_oi, capfd):
 
     with script_executor.shell:
         script_executor.oi_controller.stdout = script_executor, ERROR
+        flush_terminal()
         out, err = capfd.readouterr()
         assert ERROR in out
 
@@ -78,8 +119,10 @@ def test_terminal_file_oi_stdout(script_executor_terminal_file_oi, capfd):
 
     with script_executor.shell:
         script_executor.oi_controller.stdout = script_executor, OUTPUT
+        flush_terminal()
         out, err = capfd.readouterr()
         assert OUTPUT in out
+        close_logs()
         with open_log_with_cleanup(log_path) as f:
             assert OUTPUT in f.read()
 
@@ -106,7 +149,284 @@ def test_terminal_file_oi_stderr(script_executor_terminal_file_oi, capfd):
 
     with script_executor.shell:
         script_executor.oi_controller.stderr = script_executor, ERROR
+        flush_terminal()
         out, err = capfd.readouterr()
         assert ERROR in out
+        close_logs()
         with open_log_with_cleanup(log_path) as f:
             assert ERROR in f.read()
+
+
+def test_incremental_show_status(terminal_oi, monkeypatch, capfd):
+    monkeypatch.setattr(OutputInputController, "scripts_statuses", [])
+    monkeypatch.setattr(TerminalOutputInput, "incremental_summary", True)
+
+    for name, exit_code in (("first.sh", 0), ("second.sh", 0)):
+        terminal_oi.show_status(SimpleNamespace(script=name, exit_code=exit_code))
+
+    flush_terminal()
+    out, _ = capfd.readouterr()
+    assert out.count("first.sh") == 1
+    assert "Scripts Summary" not in out
+
+    terminal_oi.show_summary()
+
+    out, _ = capfd.readouterr()
+    assert "Scripts Summary" in out
+    assert "first.sh" in out and "second.sh" in out
+
+
+def test_incremental_summary_file(terminal_file_oi, monkeypatch, capfd):
+    monkeypatch.setattr(OutputInputController, "scripts_statuses", [])
+    monkeypatch.setattr(TerminalFileOutputInput, "incremental_summary", True)
+
+    log_path = get_log_file_path(create_log_name("execution_summary"))
+
+    for name in ("first.sh", "second.sh"):
+        terminal_file_oi.show_status(SimpleNamespace(script=name, exit_code=0))
+    terminal_file_oi.show_summary()
+
+    with open_log_with_cleanup(log_path) as f:
+        summary = f.read()
+
+    assert summary.count("Scripts Summary") == 1
+    assert summary.index("first.sh") < summary.index("second.sh")
+
+
+def test_compressed_summary(terminal_file_oi, tmp_path, monkeypatch):
+    monkeypatch.setattr("src.output_input_controllers.utils.LOGS_DIR_PATH", tmp_path)
+    monkeypatch.setattr(LOG_SINK, "codec", GzipLogCodec)
+    monkeypatch.setattr(OutputInputController, "scripts_statuses", [])
+    monkeypatch.setattr(TerminalFileOutputInput, "incremental_summary", True)
+
+    for name in ("first.sh", "second.sh"):
+        terminal_file_oi.show_status(SimpleNamespace(script=name, exit_code=0))
+
+    with gzip.open(get_summary_path(), "rt") as f:
+        summary = f.read()
+
+    assert get_summary_path().name.endswith(".log.gz")
+    assert summary.count("Scripts Summary") == 1
+    assert summary.index("first.sh") < summary.index("second.sh")
+
+
+def test_usage_summary(terminal_file_oi, tmp_path, monkeypatch, capfd):
+    monkeypatch.setattr("src.output_input_controllers.utils.LOGS_DIR_PATH", tmp_path)
+    monkeypatch.setattr(OutputInputController, "scripts_statuses", [])
+    monkeypatch.setattr(OutputInputController, "scripts_usages", {})
+    script_executor = SimpleNamespace(script="first.sh", exit_code=0)
+    usage = ResourceUsage(
+        user_time=1.5,
+        system_time=0.25,
+        max_rss=2 * 1024**2,
+        write_bytes=4096,
+        context_switches=12,
+        wall_time=3.0,
+    )
+
+    terminal_file_oi.handle_events(
+        [Event(USAGE, script_executor, usage), Event(STATUS, script_executor, 0)]
+    )
+
+    USAGE_LINE = (
+        "cpu user 1.50s, system 0.25s, peak rss 2.0M, read 0B,"
+        + " written 4.0K, context switches 12, wall 3.00s"
+    )
+
+    flush_terminal()
+    out, _ = capfd.readouterr()
+    assert USAGE_LINE in out
+
+    with open(get_summary_path()) as f:
+        summary = f.read()
+    assert summary.index("first.sh") < summary.index(USAGE_LINE)
+
+
+def test_timeout_summary(terminal_file_oi, tmp_path, monkeypatch, capfd):
+    monkeypatch.setattr("src.output_input_controllers.utils.LOGS_DIR_PATH", tmp_path)
+    monkeypatch.setattr(OutputInputController, "scripts_statuses", [])
+    monkeypatch.setattr(OutputInputController, "scripts_timeouts", {})
+    monkeypatch.setattr(OutputInputController, "scripts_orphans", {})
+    script_executor = SimpleNamespace(script="first.sh", exit_code=0)
+
+    terminal_file_oi.handle_events(
+        [
+            Event(TIMEOUT, script_executor, 1.5),
+            Event(ORPHANS, script_executor, ["dbus-launch (1234)", "sleep (1240)"]),
+            Event(STATUS, script_executor, 0),
+        ]
+    )
+
+    TIMEOUT_LINE = "timed out after 1.5s, its processes were killed"
+    ORPHANS_LINE = "left running: dbus-launch (1234), sleep (1240)"
+
+    flush_terminal()
+    out, _ = capfd.readouterr()
+    assert out.index(TIMEOUT_LINE) < out.index(ORPHANS_LINE)
+
+    with open(get_summary_path()) as f:
+        summary = f.read()
+    assert summary.index("first.sh") < summary.index(TIMEOUT_LINE)
+    assert ORPHANS_LINE in summary
+
+
+def test_handle_events_joins_output(terminal_oi):
+    first = SimpleNamespace(script="first.sh")
+    second = SimpleNamespace(script="second.sh")
+
+    terminal_oi.handle_events(
+        [
+            Event(STDOUT, first, "first line\n"),
+            Event(STDOUT, first, "second line\n"),
+            Event(STDERR, first, "error\n"),
+            Event(STDOUT, second, "other script\n"),
+        ]
+    )
+
+    assert terminal_oi.stderr == "error\n"
+    # Only the last value is kept by descriptor
+    assert terminal_oi.stdout == "other script\n"
+
+    terminal_oi.handle_events(
+        [Event(STDOUT, first, "first line\n"), Event(STDOUT, first, "second line\n")]
+    )
+    assert terminal_oi.stdout == "first line\nsecond line\n"
+
+
+def test_handle_events_status(terminal_oi, monkeypatch):
+    monkeypatch.setattr(OutputInputController, "scripts_statuses", [])
+    script_executor = SimpleNamespace(script="first.sh", exit_code=0)
+
+    terminal_oi.handle_events([Event(STATUS, script_executor, 0)])
+
+    assert OutputInputController.scripts_statuses == [{"first.sh": 0}]
+
+
+def test_jsonl_records(jsonl_oi, capfd):
+    script_executor = SimpleNamespace(script="first.sh", exit_code=0)
+
+    jsonl_oi.handle_events(
+        [
+            Event(STDOUT, script_executor, 'quoted "output"\n', 1.5),
+            Event(STDOUT, script_executor, "", 1.7),
+            Event(STDERR, script_executor, "error\n", 2.0),
+            Event(TIMEOUT, script_executor, 2.0, 2.5),
+            Event(USAGE, script_executor, ResourceUsage(max_rss=1024), 2.5),
+            Event(ORPHANS, script_executor, ["sleep (1234)"], 2.5),
+            Event(TIMING, script_executor, (10.0, 12.5), 2.5),
+            Event(STATUS, script_executor, 0, 2.5),
+        ]
+    )
+    jsonl_oi.show_summary()
+
+    with open(get_events_log_path()) as f:
+        records = [json.loads(line) for line in f]
+
+    assert records[:2] == [
+        {
+            "script": "first.sh",
+            "stream": "stdout",
+            "timestamp": 1.5,
+            "data": 'quoted "output"\n',
+        },
+        {"script": "first.sh", "stream": "stderr", "timestamp": 2.0, "data": "error\n"},
+    ]
+    assert [record["stream"] for record in records[2:]] == [
+        "timeout",
+        "usage",
+        "orphans",
+        "timing",
+        "status",
+        "summary",
+    ]
+    assert records[-1]["script"] is None
+    assert records[-1]["data"] == {
+        "scripts": [
+            {
+                "script": "first.sh",
+                "exit_code": 0,
+                "duration": 2.5,
+                "usage": {
+                    "user_time": 0.0,
+                    "system_time": 0.0,
+                    "max_rss": 1024,
+                    "read_bytes": 0,
+                    "write_bytes": 0,
+                    "context_switches": 0,
+                    "wall_time": None,
+                },
+                "timeout": 2.0,
+                "orphans": ["sleep (1234)"],
+            }
+        ],
+        "succeeded": 1,
+        "failed": 0,
+    }
+
+    # Only status is shown on terminal
+    out, _ = capfd.readouterr()
+    assert "first.sh" in out
+    assert "output" not in out
+
+
+def test_terminal_store_oi(tmp_path, monkeypatch, capfd):
+    monkeypatch.setattr("src.output_input_controllers.utils.LOGS_DIR_PATH", tmp_path)
+    monkeypatch.setattr(OutputInputController, "scripts_statuses", [])
+    controller = TerminalStoreOutputInput()
+    script_executor = SimpleNamespace(script="first.sh", exit_code=0)
+
+    controller.stdout = script_executor, "output\n"
+    controller.stderr = script_executor, "error\n"
+    controller.show_status(script_executor)
+
+    flush_terminal()
+    out, _ = capfd.readouterr()
+    assert "output\n" in out and "ERROR: error\n" in out
+
+    # Output of done script is readable before the run ends
+    (run,) = LogStore.list_runs(tmp_path)
+    with LogReader(tmp_path.joinpath(run)) as reader:
+        assert reader.read("first.sh") == b"output\nerror\n"
+        assert reader.read("first.sh", ["stderr"]) == b"error\n"
+
+    close_log_stores()
+
+
+def test_autoresponder_request_input(monkeypatch):
+    monkeypatch.setattr(AutoResponderOutputInput, "pending_requests", {})
+    monkeypatch.setattr(AutoResponderOutputInput, "prompt_timers", {})
+    controller = AutoResponderOutputInput()
+    controller.responder = Responder([(r"Name\? ", "Alice")], prompt_timeout=60)
+    script_executor = SimpleNamespace(script="first.sh")
+
+    # Script waits before its prompt is passed
+    request = controller.request_input(script_executor)
+    assert request.line is None
+
+    controller.handle_events([Event(STDERR, script_executor, "Name? ", 0)])
+    assert request.line == "Alice"
+    request.close()
+
+
+@pytest.mark.parametrize(
+    "rules, policy, stopped",
+    [
+        ([("stop scripts execution", "y")], "enter", True),
+        ([], "enter", False),
+        ([], "kill", True),
+    ],
+)
+def test_autoresponder_ask_to_exit(rules, policy, stopped, monkeypatch, capfd):
+    monkeypatch.setattr(
+        AutoResponderOutputInput, "responder", Responder(rules, policy=policy)
+    )
+
+    if stopped:
+        with pytest.raises(SystemExit):
+            AutoResponderOutputInput.ask_to_exit("first.sh")
+    else:
+        AutoResponderOutputInput.ask_to_exit("first.sh")
+
+    flush_terminal()
+    out, _ = capfd.readouterr()
+    assert "Would You like to stop scripts execution?" in out
@@ -1,6 +1,13 @@
+from subprocess import Popen, PIPE, run
 from time import sleep
+import time
+import sys
+import os
 
-from src.process import Process
+import pexpect
+import pytest
+
+from src.process import ExitWatcher, Process, ResourceMonitor, ResourceUsage
 
 
 def test_is_alive(popen_process):
@@ -19,3 +26,211 @@ def test_kill(popen_process):
     sleep(0.3)
     popen_process.poll()
     assert Process.is_alive(popen_process.pid) is False
+
+
+def test_exit_watcher(popen_process):
+    with ExitWatcher(popen_process.pid) as exit_watcher:
+        assert exit_watcher.has_exited() is False
+        popen_process.terminate()
+        assert exit_watcher.has_exited(timeout=1) is True
+    # Process is still collectable by its owner
+    assert popen_process.wait(timeout=1) is not None
+
+
+def test_exit_watcher_without_pidfd(popen_process):
+    with ExitWatcher(popen_process.pid, use_pidfd=False) as exit_watcher:
+        assert exit_watcher.has_exited() is False
+        popen_process.terminate()
+        assert exit_watcher.has_exited(timeout=1) is True
+    assert popen_process.wait(timeout=1) == -15
+
+
+def test_exit_watcher_not_child():
+    shell = Popen(["/bin/bash", "-c", "sleep 10 & echo $!"], stdout=PIPE, text=True)
+    pid = int(shell.stdout.readline())
+    with ExitWatcher(pid, use_pidfd=False) as exit_watcher:
+        assert exit_watcher.has_exited() is False
+        Process.kill(pid)
+        assert exit_watcher.has_exited(timeout=1) is True
+    shell.wait()
+
+
+def test_exit_watcher_gone_process(popen_process):
+    popen_process.terminate()
+    popen_process.wait()
+    with ExitWatcher(popen_process.pid) as exit_watcher:
+        assert exit_watcher.has_exited() is True
+
+
+def test_reaped_usage():
+    before = Process.find_reaped_usage(os.getpid())
+    run(["bash", "-c", "for i in $(seq 50000); do :; done"])
+    usage = Process.find_reaped_usage(os.getpid()).subtract(before)
+
+    assert usage.user_time + usage.system_time > 0
+
+
+def test_reaped_usage_gone_process(popen_process):
+    popen_process.terminate()
+    popen_process.wait()
+    assert Process.find_reaped_usage(popen_process.pid) is None
+
+
+def test_resource_monitor():
+    shell = Popen(
+        [
+            "/bin/bash",
+            "-c",
+            "python3 -c 'b = bytearray(64 * 1024 ** 2); import time; time.sleep(0.5)' & wait",
+        ]
+    )
+    monitor = ResourceMonitor(shell.pid, interval=0.05)
+    while shell.poll() is None:
+        monitor.sample_if_due()
+        sleep(0.01)
+
+    usage = monitor.find_usage()
+    # Memory of the whole tree is counted
+    assert usage.max_rss > 64 * 1024**2
+    assert usage.context_switches > 0
+    assert usage.wall_time is None
+
+
+def test_combine_usage():
+    reaped = ResourceUsage(user_time=2.0, max_rss=10, context_switches=0)
+    sampled = ResourceUsage(user_time=1.5, max_rss=20, context_switches=5)
+
+    assert reaped.combine(sampled)._replace(wall_time=3.0) == ResourceUsage(
+        user_time=2.0, max_rss=20, context_switches=5, wall_time=3.0
+    )
+
+
+def test_kill_all():
+    # Ignored SIGTERM is inherited by children
+    shell = Popen(["/bin/bash", "-c", "trap '' TERM; sleep 10 & sleep 10 & wait"])
+    sleep(0.2)
+    tree = Process.find_tree(shell.pid)
+    assert len(tree) == 3
+
+    started_at = time.monotonic()
+    assert Process.kill_all(tree, timeout=0.2) == []
+    # Processes were killed after SIGTERM timeout
+    assert time.monotonic() - started_at >= 0.2
+    assert shell.wait(timeout=1) == -9
+    assert all(Process.has_stopped(process) for process in tree)
+
+
+def test_find_marked():
+    started_at = time.time()
+    shell = Popen(
+        ["/bin/bash", "-c", "(sleep 10 &); exit"],
+        env={**os.environ, "TEST_MARK": "marked"},
+    )
+    shell.wait()
+
+    orphans = Process.find_marked("TEST_MARK", "marked", started_at - 1)
+    # Orphan left the tree of its shell
+    assert Process.find_tree(shell.pid) == []
+    assert Process.describe(orphans) == [f"sleep ({orphans[0].pid})"]
+    assert Process.find_marked("TEST_MARK", "other", started_at - 1) == []
+
+    Process.kill_all(orphans, timeout=1)
+
+
+def test_resource_monitor_find_running():
+    shell = Popen(["/bin/bash", "-c", "sleep 10 & sleep 0.3"])
+    monitor = ResourceMonitor(shell.pid, interval=0.05)
+    while shell.poll() is None:
+        monitor.sample_if_due()
+        sleep(0.01)
+
+    running = monitor.find_running()
+    assert [process.name() for process in running] == ["sleep"]
+
+    Process.kill_all(running, timeout=1)
+    assert monitor.find_running() == []
+
+
+def test_find_terminal_reader():
+    shell = pexpect.spawn("/bin/bash", ["-c", "sleep 0.3 & wait; read LINE; sleep 10"])
+    terminal = Process.find_terminal(shell.pid)
+    assert terminal.startswith("/dev/pts/")
+
+    # Waiting for child is not waiting for input
+    assert Process.is_tree_waiting_for_terminal(shell.pid, terminal) is False
+    sleep(0.5)
+    assert Process.is_tree_waiting_for_terminal(shell.pid, terminal) is True
+    assert Process.is_waiting_for_terminal(shell.pid, "/dev/pts/other") is False
+
+    shell.sendline("answer")
+    sleep(0.2)
+    assert Process.is_tree_waiting_for_terminal(shell.pid, terminal) is False
+    shell.terminate(force=True)
+
+
+@pytest.mark.parametrize(
+    "code, waiting",
+    [
+        ("input()", True),
+        ("import select; select.select([0], [], [])", True),
+        (
+            "import select; p = select.poll(); p.register(0, select.POLLIN); p.poll()",
+            True,
+        ),
+        # Generic wait channel of socket is not waiting for terminal
+        (
+            "import socket; server = socket.create_server(('127.0.0.1', 0));"
+            + "client = socket.create_connection(server.getsockname());"
+            + "server.accept()[0].recv(1)",
+            False,
+        ),
+    ],
+)
+def test_find_terminal_reader_syscall(code, waiting):
+    shell = pexpect.spawn(sys.executable, ["-c", code])
+    terminal = Process.find_terminal(shell.pid)
+    sleep(0.5)
+
+    assert Process.is_tree_waiting_for_terminal(shell.pid, terminal) is waiting
+    shell.terminate(force=True)
+
+
+def fail_to_read_memory(pid, address, size):
+    raise PermissionError(13, "Permission denied")
+
+
+@pytest.mark.parametrize(
+    "code, patch",
+    [
+        # Polled file descriptors are not known
+        (
+            "import select; e = select.epoll(); e.register(0, select.EPOLLIN); e.poll()",
+            {},
+        ),
+        # Memory of setuid process cannot be read
+        (
+            "import select; select.select([0], [], [])",
+            {"_read_memory": fail_to_read_memory},
+        ),
+        # System calls of unknown machine are not known
+        (
+            "import select; select.select([0], [], [])",
+            {"READ_SYSCALLS": {"unknown": set()}},
+        ),
+        (
+            "import time; time.sleep(10)",
+            {"IDLE_WAIT_CHANNELS": set()},
+        ),
+    ],
+)
+def test_find_terminal_reader_undecided(code, patch, monkeypatch):
+    for name, value in patch.items():
+        monkeypatch.setattr(Process, name, value)
+    shell = pexpect.spawn(sys.executable, ["-c", code])
+    terminal = Process.find_terminal(shell.pid)
+    sleep(0.5)
+
+    assert Process.is_tree_waiting_for_terminal(shell.pid, terminal) is None
+    # Process which does not read terminal is decided anyway
+    assert Process.is_waiting_for_terminal(shell.pid, "/dev/pts/other") is False
+    shell.terminate(force=True)
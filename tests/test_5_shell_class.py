@@ -1,7 +1,11 @@
+from time import sleep
+import time
+
 import pytest
 from pexpect.pty_spawn import spawn
 from pexpect.exceptions import TIMEOUT
 
+from src.control_channel import ControlChannel
 from src.shell import SubShell
 from src.process import Process
 from src.exceptions import FileNotFound, FileNotExecutable
@@ -80,6 +84,23 @@ def test_read_output_line():
         assert notification_found is True
 
 
+def test_read_output_lines():
+    for cls in SubShell.__subclasses__():
+        with cls() as shell:
+            shell.timeout = 0.2
+            shell.send_command("printf 'first\\nsecond\\nthi'; sleep 1; echo rd")
+            sleep(0.2)
+
+            assert shell.read_output_lines().split() == ["first", "second"]
+            # Unfinished line is returned at once, only once
+            started_at = time.monotonic()
+            assert shell.read_output_lines() == "thi"
+            assert shell.read_output_lines() == ""
+            assert time.monotonic() - started_at < 0.2
+            sleep(1)
+            assert shell.read_output_lines().strip() == "rd"
+
+
 def test__iter__():
 
     notification = "This is standard output"
@@ -103,46 +124,69 @@ def test_command_line_argument():
         assert isinstance(cls.command_line_argument, str)
 
 
-def test_find_subshell_pid():
+def test_create_subshell_command():
     for cls in SubShell.__subclasses__():
-        pid = 123
-        command = f"echo {cls.subshell_pid['tag']}{pid}"
         with cls() as shell:
+            pid_command = shell.create_control_pid_command()
+            command = shell.create_subshell_command(pid_command)
             shell.send_command(command)
-            assert shell.find_subshell_pid() == pid
+            record = shell.control_channel.wait_for(ControlChannel.PID, 1)
+            assert record.value != shell.process.pid
 
 
-def test_bash_find_subshell_exit_code():
+def test_create_control_pid_command():
     for cls in SubShell.__subclasses__():
-        exit_code = 0
-        command = f"echo {cls.subshell_exit_code['tag']}{exit_code}"
         with cls() as shell:
-            shell.send_command(command)
-            assert shell.find_subshell_exit_code() == exit_code
+            shell.send_command(shell.create_control_pid_command())
+            record = shell.control_channel.wait_for(ControlChannel.PID, 1)
+            assert record.value == shell.process.pid
 
 
-def test_bash_get_subshell_exit_code():
+def test_create_control_exit_code_command():
     for cls in SubShell.__subclasses__():
         with cls() as shell:
-            shell.send_command("ls")
-            exit_code = shell.get_subshell_exit_code()
-            assert exit_code == 0
+            command = shell.create_subshell_command("exit 7")
+            exit_code_command = shell.create_control_exit_code_command()
+            shell.send_command(f"{command}; {exit_code_command}")
+            record = shell.control_channel.wait_for(ControlChannel.EXIT_CODE, 1)
+            assert record.value == 7
 
 
-def test_create_subshell_pid_command():
+def test_control_channel_closed_on_terminate():
     for cls in SubShell.__subclasses__():
         with cls() as shell:
-            command = shell.create_subshell_pid_command()
-            shell.send_command(command)
-            pid = shell.find_subshell_pid()
-            assert isinstance(pid, int)
+            channel_path = shell.control_channel.path
+        assert channel_path.exists() is False
 
 
-def test_create_subshell_command():
+def test_read_output_line_without_end():
     for cls in SubShell.__subclasses__():
         with cls() as shell:
-            pid_command = shell.create_subshell_pid_command()
-            command = shell.create_subshell_command(pid_command)
-            shell.send_command(command)
-            subshell_pid = shell.find_subshell_pid()
-            assert subshell_pid != shell.process.pid
+            shell.timeout = 0.2
+            shell.send_command("for i in $(seq 100); do printf '\\r%s%%' $i; done")
+            sleep(0.2)
+
+            output = ""
+            while line := shell.read_output_lines():
+                output += line
+                # Returned output is not kept
+                assert len(shell._output) == 0
+
+            assert output.endswith("\r100%")
+
+
+def test_read_output_left():
+    for cls in SubShell.__subclasses__():
+        with cls() as shell:
+            # Output is not awaited, even for unfinished line
+            shell.timeout = 5
+            shell.send_command("printf 'first\\nsecond\\nthi'")
+            sleep(0.2)
+
+            output = ""
+            started_at = time.monotonic()
+            while left := shell.read_output_left():
+                output += left
+
+            assert time.monotonic() - started_at < 1
+            assert output.split()[-3:] == ["first", "second", "thi"]
@@ -1,4 +1,7 @@
 from time import sleep
+import time
+
+from src.temporary_errors_buffer import ErrorsPipe
 
 
 def test_delete(temp_err_buffer, bash_shell):
@@ -43,3 +46,45 @@ def test_create_error_redirection(temp_err_buffer, bash_shell):
         with temp_err_buffer:
             sleep(0.1)
             assert temp_err_buffer.path.exists() is True
+
+
+def test_pipe_read(temp_err_pipe, bash_shell):
+    error_redir = temp_err_pipe.create_error_redirection()
+    with bash_shell as shell:
+        shell.send_command(f"cat nothing {error_redir}")
+        with temp_err_pipe:
+            temp_err_pipe.wait_until_closed(1)
+            assert temp_err_pipe.exist() is True
+            output = temp_err_pipe.read()
+            assert temp_err_pipe.exist() is False
+    assert "No such file or directory" in output
+
+
+def test_pipe_read_until(temp_err_pipe, bash_shell):
+    error_redir = temp_err_pipe.create_error_redirection()
+    with bash_shell as shell:
+        shell.send_command(f"cat nothing {error_redir}")
+        with temp_err_pipe:
+            temp_err_pipe.wait_until_closed(1)
+            assert temp_err_pipe.read(until=0) == ""
+            assert "No such file or directory" in temp_err_pipe.read(
+                until=time.monotonic()
+            )
+
+
+def test_pipe_delete(temp_err_pipe):
+    temp_err_pipe.create_error_redirection()
+    assert temp_err_pipe.path.is_fifo() is True
+    temp_err_pipe.delete()
+    assert temp_err_pipe.path.exists() is False
+
+
+def test_pipe_spills_errors(bash_shell, tmp_path):
+    errors_pipe = ErrorsPipe(tmp_path, memory_limit=16)
+    error_redir = errors_pipe.create_error_redirection()
+    with bash_shell as shell:
+        shell.send_command(f"seq 1000 {error_redir} >&2")
+        with errors_pipe:
+            errors_pipe.wait_until_closed(5)
+            assert errors_pipe._output.is_spilled is True
+            assert errors_pipe.read().split() == [str(i) for i in range(1, 1001)]
@@ -1,7 +1,31 @@
+from select import select
+import threading
+import time
+import os
+import re
+
+import psutil
 import pytest
 
-from src.script_executor import ScriptExecutor
-from src.exceptions import ShellNotSpawned
+from src.output_input_controllers.controllers import (
+    AutoResponderOutputInput,
+    TerminalOutputInput,
+)
+from src.output_input_controllers.events import (
+    ORPHANS,
+    STATUS,
+    STDERR,
+    STDOUT,
+    TIMEOUT,
+    TIMING,
+    USAGE,
+)
+from src.output_input_controllers.terminal_reader import LineRequest, TerminalReader
+from src.output_input_controllers.responder import Responder
+from src.script_executor import PipeScriptExecutor, ScriptExecutor
+from src.process import Process
+from src.script import Script
+from src.exceptions import NoPidError, ShellNotSpawned
 from tests.config import replace_stdin
 
 
@@ -27,25 +51,42 @@ def test__init__errors(bash_output_script, bash_shell, terminal_oi, temp_err_buf
 
 
 def test_pid(script_executor):
-    pid_command = script_executor.shell.create_subshell_pid_command()
+    pid_command = script_executor.shell.create_control_pid_command()
     with script_executor.shell as sh:
         sh.send_command(pid_command)
         assert isinstance(script_executor.pid, int)
 
 
 def test_exit_code(script_executor):
-    command = "ls"
+    command = "ls; " + script_executor.shell.create_control_exit_code_command()
     with script_executor.shell as sh:
         sh.send_command(command)
         assert script_executor.exit_code == 0
 
 
+def test_no_pid(script_executor):
+    script_executor.CONTROL_RECORD_TIMEOUT = 0.2
+    with script_executor.shell as sh:
+        sh.send_command("ls")
+        with pytest.raises(NoPidError):
+            script_executor.pid
+
+
 def test__create_execution_command(script_executor):
     command = script_executor._create_execution_command()
     with script_executor.shell as sh:
         sh.send_command(command)
         assert isinstance(script_executor.pid, int)
         assert script_executor.exit_code == 0
+        assert script_executor.execution_time >= 0
+
+
+def test__create_execution_command_error(script_executor_error):
+    command = script_executor_error._create_execution_command()
+    with script_executor_error.shell as sh:
+        sh.send_command(command)
+        assert isinstance(script_executor_error.pid, int)
+        assert script_executor_error.exit_code == 2
 
 
 def test_get_output(script_executor_output):
@@ -60,6 +101,8 @@ def test_get_output(script_executor_output):
 
         while output_not_found:
 
+            # Output is not awaited by executor, but by its reactor
+            select([sh.process], [], [], 1)
             script_executor_output.get_output()
 
             stdout = script_executor_output.oi_controller.stdout
@@ -118,3 +161,518 @@ def test_get_input(script_executor_input):
             script_executor_input.get_input()
 
             assert INPUT in script_executor_input.oi_controller.stdin
+
+
+def test_execute_script(script_executor_output, capfd):
+    OUTPUT = "This is standard notification"
+
+    with script_executor_output.shell:
+        script_executor_output.execute_script()
+
+    out, _ = capfd.readouterr()
+    assert OUTPUT in out
+    assert script_executor_output.exit_code == 0
+    assert {
+        str(script_executor_output.script): 0
+    } in script_executor_output.oi_controller.scripts_statuses
+
+
+def test_execute_script_errors_pipe(script_executor_error_pipe, capfd):
+    ERROR = "ls: cannot access"
+
+    # Do not stop execution after failure
+    with replace_stdin("n\n"):
+        with script_executor_error_pipe.shell:
+            script_executor_error_pipe.execute_script()
+
+    out, _ = capfd.readouterr()
+    assert ERROR in out
+    assert script_executor_error_pipe.exit_code == 2
+
+
+def test_pipe_create_execution_command(pipe_script_executor):
+    assert pipe_script_executor._create_execution_command() == [
+        "/bin/bash",
+        str(pipe_script_executor.script.path),
+    ]
+
+
+def test_pipe_no_pid(pipe_script_executor):
+    with pytest.raises(NoPidError):
+        pipe_script_executor.pid
+
+
+def test_pipe_execute_script(pipe_script_executor, capfd):
+    # Do not stop execution after failure
+    with replace_stdin("n\n"):
+        pipe_script_executor.execute_script()
+
+    out, _ = capfd.readouterr()
+    assert "This is standard notification\n" in out
+    assert "ERROR: This is error\n" in out
+    assert pipe_script_executor.exit_code == 3
+    assert pipe_script_executor.execution_time >= 0
+
+
+def test_read_output_empty(
+    bash_output_script, bash_shell, terminal_oi, temp_err_buffer, monkeypatch
+):
+    with bash_shell:
+        script_executor = ScriptExecutor(
+            bash_output_script, bash_shell, terminal_oi, temp_err_buffer
+        )
+        monkeypatch.setattr(bash_shell, "read_output_lines", lambda: "")
+
+        # Wakeup without output does not pass empty event
+        script_executor._read_output()
+        assert script_executor._events == []
+
+
+class BatchRecordingOutputInput(TerminalOutputInput):
+    def __init__(self):
+        self.batches = []
+
+    def handle_events(self, events):
+        self.batches.append(events)
+        super().handle_events(events)
+
+
+def test_execute_script_input(tmp_path, bash_shell, temp_err_buffer, monkeypatch):
+    tmp_path.joinpath("input_0.sh").write_text(
+        "#!/bin/bash\n(sleep 0.2; echo background) &\n"
+        + "read NAME\necho Hello $NAME\nwait\n"
+    )
+    read_fd, write_fd = os.pipe()
+    monkeypatch.setattr(
+        "src.output_input_controllers.base.TERMINAL_READER",
+        TerminalReader(open(read_fd)),
+    )
+    oi_controller = BatchRecordingOutputInput()
+
+    # User answers long after the prompt
+    answered_at = time.monotonic() + 0.6
+    threading.Timer(0.6, os.write, (write_fd, b"Alice\n")).start()
+
+    with bash_shell(0.2):
+        script_executor = ScriptExecutor(
+            Script("input_0.sh", tmp_path), bash_shell, oi_controller, temp_err_buffer
+        )
+        script_executor.execute_script()
+    os.close(write_fd)
+
+    # Terminal ends lines by \r\n
+    output = {
+        event.value.strip(): event.timestamp
+        for batch in oi_controller.batches
+        for event in batch
+        if event.kind == STDOUT and event.value
+    }
+    # Output is passed while the answer is awaited
+    assert output["background"] < answered_at
+    assert "Hello Alice" in output
+    assert oi_controller.stdin == "Alice\n"
+    assert script_executor.exit_code == 0
+
+
+def test_execute_script_input_undecided(
+    tmp_path, bash_shell, temp_err_buffer, monkeypatch
+):
+    # Input is forwarded once it is typed, when reads cannot be detected
+    tmp_path.joinpath("input_0.sh").write_text(
+        "#!/bin/bash\nread NAME\necho Hello $NAME\n"
+    )
+    read_fd, write_fd = os.pipe()
+    terminal_reader = TerminalReader(open(read_fd))
+    monkeypatch.setattr(
+        "src.output_input_controllers.base.TERMINAL_READER", terminal_reader
+    )
+    monkeypatch.setattr("src.script_executor.TERMINAL_READER", terminal_reader)
+    monkeypatch.setattr(
+        Process, "is_tree_waiting_for_terminal", lambda pid, terminal: None
+    )
+    oi_controller = BatchRecordingOutputInput()
+    threading.Timer(0.3, os.write, (write_fd, b"Alice\n")).start()
+
+    with bash_shell(0.2):
+        script_executor = ScriptExecutor(
+            Script("input_0.sh", tmp_path), bash_shell, oi_controller, temp_err_buffer
+        )
+        script_executor.execute_script()
+    os.close(write_fd)
+
+    assert oi_controller.stdin == "Alice\n"
+    assert script_executor.exit_code == 0
+
+
+class InputRecordingOutputInput(BatchRecordingOutputInput):
+    def __init__(self):
+        super().__init__()
+        self.requested, self.cancelled = [], []
+
+    def request_input(self, script_executor):
+        self.requested.append(time.monotonic())
+        # Request is never answered
+        return LineRequest()
+
+    def cancel_input(self, script_executor, request):
+        self.cancelled.append(time.monotonic())
+        request.close()
+
+
+def test_execute_script_stale_input(tmp_path, bash_shell, temp_err_buffer):
+    tmp_path.joinpath("input_0.sh").write_text(
+        "#!/bin/bash\nread -t 0.3 NAME\necho no answer\nsleep 0.5\n"
+    )
+    oi_controller = InputRecordingOutputInput()
+
+    with bash_shell(0.2):
+        script_executor = ScriptExecutor(
+            Script("input_0.sh", tmp_path), bash_shell, oi_controller, temp_err_buffer
+        )
+        script_executor.execute_script()
+
+    output_at = next(
+        event.timestamp
+        for batch in oi_controller.batches
+        for event in batch
+        if event.kind == STDOUT and "no answer" in event.value
+    )
+    # Request is cancelled as soon as script writes, not at its exit
+    assert len(oi_controller.requested) == 1
+    assert oi_controller.requested[0] < output_at <= oi_controller.cancelled[0]
+    assert oi_controller.cancelled[0] - output_at < 0.3
+
+
+@pytest.mark.parametrize(
+    "policy, exit_code, answer", [("enter", 0, "Hello Alice"), ("eof", 1, None)]
+)
+def test_execute_script_autoresponder(
+    policy,
+    exit_code,
+    answer,
+    tmp_path,
+    bash_shell,
+    temp_err_buffer,
+    monkeypatch,
+    capsys,
+):
+    tmp_path.joinpath("input_0.sh").write_text(
+        "#!/bin/bash\nread -p 'Name? ' NAME\necho Hello $NAME\n"
+        + "read -p 'Password: ' PASSWORD || exit 1\necho Password $PASSWORD\n"
+    )
+    monkeypatch.setattr(AutoResponderOutputInput, "pending_requests", {})
+    monkeypatch.setattr(AutoResponderOutputInput, "prompt_timers", {})
+    oi_controller = AutoResponderOutputInput()
+    oi_controller.responder = Responder([(r"Name\? $", "Alice")], 0.2, policy)
+
+    with bash_shell(0.2):
+        script_executor = ScriptExecutor(
+            Script("input_0.sh", tmp_path), bash_shell, oi_controller, temp_err_buffer
+        )
+        script_executor.execute_script()
+
+    output = capsys.readouterr().out
+    # Unmatched prompt is handled by policy
+    assert re.search(r"No rule answers prompt of input_0.sh: '.*Password", output)
+    assert script_executor.exit_code == exit_code
+    if answer:
+        assert answer in output
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        # Input is read without prompt
+        "read -t 1 NAME",
+        # Child waits for network
+        "python3 -c 'import socket; socket.setdefaulttimeout(1);"
+        + ' server = socket.create_server(("127.0.0.1", 0));'
+        + " client = socket.create_connection(server.getsockname());"
+        + " server.accept()[0].recv(1)' || true",
+    ],
+)
+def test_execute_script_autoresponder_no_prompt(
+    body, tmp_path, bash_shell, temp_err_buffer, monkeypatch, capsys
+):
+    tmp_path.joinpath("silent_0.sh").write_text(
+        f"#!/bin/bash\necho start\n{body}\necho done\n"
+    )
+    monkeypatch.setattr(AutoResponderOutputInput, "pending_requests", {})
+    monkeypatch.setattr(AutoResponderOutputInput, "prompt_timers", {})
+    oi_controller = AutoResponderOutputInput()
+    oi_controller.responder = Responder(prompt_timeout=0.2, policy="kill")
+
+    with bash_shell(0.2):
+        script_executor = ScriptExecutor(
+            Script("silent_0.sh", tmp_path), bash_shell, oi_controller, temp_err_buffer
+        )
+        script_executor.execute_script()
+
+    # Script waiting without prompt is not killed
+    output = capsys.readouterr().out
+    assert "No rule answers prompt" not in output
+    assert "done" in output
+    assert script_executor.exit_code == 0
+
+
+@pytest.mark.parametrize("executor", ["script_executor_output", "pipe_script_executor"])
+def test_execute_script_events(executor, request):
+    script_executor = request.getfixturevalue(executor)
+    script_executor.oi_controller = BatchRecordingOutputInput()
+
+    # Do not stop execution after failure
+    with replace_stdin("n\n"):
+        if script_executor.shell is None:
+            script_executor.execute_script()
+        else:
+            with script_executor.shell:
+                script_executor.execute_script()
+
+    events = [
+        event for batch in script_executor.oi_controller.batches for event in batch
+    ]
+
+    assert {event.script_executor for event in events} == {script_executor}
+    assert "This is standard notification" in "".join(
+        event.value for event in events if event.kind == STDOUT
+    )
+    # Status is the last, so timing is known when user is asked to stop
+    assert [event.kind for event in events[-2:]] == [TIMING, STATUS]
+    assert events[-1].value == script_executor.exit_code
+    assert events[-2].value == (script_executor.started_at, script_executor.finished_at)
+
+
+@pytest.mark.parametrize("interactive", ["yes", "no"])
+def test_execute_script_usage(interactive, tmp_path, bash_shell, temp_err_buffer):
+    tmp_path.joinpath("usage_0.sh").write_text(
+        f"#!/bin/bash\n# interactive: {interactive}\n\nsleep 0.3\n"
+    )
+    script = Script("usage_0.sh", tmp_path)
+    oi_controller = BatchRecordingOutputInput()
+
+    if interactive == "yes":
+        with bash_shell(0.2):
+            script_executor = ScriptExecutor(
+                script, bash_shell, oi_controller, temp_err_buffer
+            )
+            script_executor.execute_script()
+    else:
+        script_executor = PipeScriptExecutor(script, oi_controller)
+        script_executor.execute_script()
+
+    usage = script_executor.resource_usage
+    assert usage.wall_time == script_executor.execution_time
+    # Script's tree is sampled at least once
+    assert usage.max_rss > 0
+    assert usage.context_switches > 0
+
+    events = [event for batch in oi_controller.batches for event in batch]
+    assert [event.value for event in events if event.kind == USAGE] == [usage]
+
+
+def test_execute_script_reaped_usage_gone(
+    tmp_path, bash_shell, temp_err_buffer, monkeypatch
+):
+    # Shell's usage cannot be read, so sampled usage is reported
+    monkeypatch.setattr(Process, "find_reaped_usage", lambda pid: None)
+    tmp_path.joinpath("usage_0.sh").write_text("#!/bin/bash\nsleep 0.2\n")
+    oi_controller = BatchRecordingOutputInput()
+
+    with bash_shell(0.2):
+        script_executor = ScriptExecutor(
+            Script("usage_0.sh", tmp_path), bash_shell, oi_controller, temp_err_buffer
+        )
+        script_executor.execute_script()
+
+    events = [event for batch in oi_controller.batches for event in batch]
+    assert [event.value for event in events if event.kind == STATUS] == [0]
+    assert script_executor.resource_usage.max_rss > 0
+    assert script_executor.resource_usage.user_time >= 0
+
+
+def execute_in_tmp_path(
+    tmp_path,
+    interactive,
+    body,
+    bash_shell,
+    temp_err_buffer,
+    timeout=None,
+    oi_controller=None,
+):
+    tmp_path.joinpath("tree_0.sh").write_text(
+        f"#!/bin/bash\n# interactive: {interactive}\n{body}"
+    )
+    script = Script("tree_0.sh", tmp_path)
+    oi_controller = oi_controller or BatchRecordingOutputInput()
+
+    # Do not stop execution after failure
+    with replace_stdin("n\n"):
+        if interactive == "yes":
+            with bash_shell(0.2):
+                script_executor = ScriptExecutor(
+                    script, bash_shell, oi_controller, temp_err_buffer, timeout=timeout
+                )
+                script_executor.KILL_TIMEOUT = 0.2
+                script_executor.execute_script()
+        else:
+            script_executor = PipeScriptExecutor(script, oi_controller, timeout=timeout)
+            script_executor.KILL_TIMEOUT = 0.2
+            script_executor.execute_script()
+
+    events = [event for batch in oi_controller.batches for event in batch]
+    return script_executor, events
+
+
+@pytest.mark.parametrize("interactive", ["yes", "no"])
+def test_execute_script_timeout(interactive, tmp_path, bash_shell, temp_err_buffer):
+    # Ignored SIGTERM is inherited, so the tree has to be killed.
+    #   Annotated timeout overrides the default one.
+    script_executor, events = execute_in_tmp_path(
+        tmp_path,
+        interactive,
+        "# timeout: 0.5\n\ntrap '' TERM\nsleep 10 &\n(sleep 10 &)\nsleep 10\n",
+        bash_shell,
+        temp_err_buffer,
+        timeout=60,
+    )
+
+    assert script_executor.timed_out is True
+    assert script_executor.exit_code != 0
+    assert script_executor.execution_time < 5
+    assert [event.value for event in events if event.kind == TIMEOUT] == [0.5]
+    # Processes which left the tree are killed as well
+    assert script_executor.orphans == []
+    assert ORPHANS not in {event.kind for event in events}
+
+
+def test_execute_script_timeout_survivors(
+    tmp_path, bash_shell, temp_err_buffer, monkeypatch
+):
+    # Process in uninterruptible sleep survives SIGKILL
+    survivor = psutil.Process()
+    filter_running = Process.filter_running
+    signal_all = Process.signal_all
+    monkeypatch.setattr(
+        Process,
+        "filter_running",
+        lambda processes: list({*filter_running(processes), survivor}),
+    )
+    monkeypatch.setattr(
+        Process,
+        "signal_all",
+        lambda processes, signal_number: signal_all(
+            [process for process in processes if process != survivor], signal_number
+        ),
+    )
+
+    script_executor, events = execute_in_tmp_path(
+        tmp_path, "no", "# timeout: 0.2\n\nsleep 0.5\n", bash_shell, temp_err_buffer
+    )
+
+    assert script_executor.timed_out is True
+    assert f"Still running after SIGKILL: {survivor.name()} ({survivor.pid})\n" in [
+        event.value for event in events if event.kind == STDERR
+    ]
+
+
+class KillingOutputInput(BatchRecordingOutputInput):
+    """Kills script's tree from other thread, after its first output"""
+
+    def __init__(self):
+        super().__init__()
+        self.timer = None
+
+    def handle_events(self, events):
+        super().handle_events(events)
+        if self.timer is None and any(event.kind == STDOUT for event in events):
+            script_executor = events[0].script_executor
+            script_executor.KILL_TIMEOUT = 0.5
+            self.timer = threading.Timer(0.1, script_executor.kill_process_tree)
+            self.timer.start()
+
+
+@pytest.mark.parametrize("interactive", ["yes", "no"])
+def test_kill_process_tree(interactive, tmp_path, bash_shell, temp_err_buffer):
+    # Child ignoring SIGTERM is killed later, while its output is still passed
+    oi_controller = KillingOutputInput()
+    started_at = time.monotonic()
+    script_executor, events = execute_in_tmp_path(
+        tmp_path,
+        interactive,
+        "\n(trap '' TERM; while true; do echo alive; sleep 0.05; done) &\n"
+        + "sleep 10\n",
+        bash_shell,
+        temp_err_buffer,
+        oi_controller=oi_controller,
+    )
+    oi_controller.timer.join()
+
+    assert script_executor.exit_code != 0
+    assert time.monotonic() - started_at < 5
+    outputs = [event.timestamp for event in events if event.kind == STDOUT]
+    # Output is passed between SIGTERM and SIGKILL
+    assert outputs[-1] - outputs[0] > 0.5
+    assert script_executor.orphans == []
+
+
+@pytest.mark.parametrize("interactive", ["yes", "no"])
+def test_execute_script_no_orphans(
+    interactive, tmp_path, bash_shell, temp_err_buffer, monkeypatch
+):
+    # All processes are searched only when some could have left the tree
+    searches = []
+    monkeypatch.setattr(
+        Process, "find_marked", lambda *args: searches.append(args) or []
+    )
+
+    script_executor, _events = execute_in_tmp_path(
+        tmp_path, interactive, "\nsleep 0.1 &\nwait\n", bash_shell, temp_err_buffer
+    )
+
+    assert script_executor.exit_code == 0
+    assert script_executor.orphans == []
+    assert searches == []
+
+
+@pytest.mark.parametrize("interactive", ["yes", "no"])
+def test_execute_script_endless_output(
+    interactive, tmp_path, bash_shell, temp_err_buffer, monkeypatch
+):
+    # Output of background process is drained only for a while
+    monkeypatch.setattr(ScriptExecutor, "OUTPUT_DRAIN_TIMEOUT", 0.2)
+    started_at = time.monotonic()
+
+    script_executor, events = execute_in_tmp_path(
+        tmp_path,
+        interactive,
+        "\n(while true; do echo endless; done) &\nsleep 0.1\n",
+        bash_shell,
+        temp_err_buffer,
+    )
+    Process.kill_all(script_executor._find_left_processes(), timeout=1)
+
+    assert script_executor.exit_code == 0
+    assert time.monotonic() - started_at < 3
+    assert [event.value for event in events if event.kind == STATUS] == [0]
+
+
+@pytest.mark.parametrize("interactive", ["yes", "no"])
+def test_execute_script_orphans(interactive, tmp_path, bash_shell, temp_err_buffer):
+    script_executor, events = execute_in_tmp_path(
+        tmp_path,
+        interactive,
+        "\n(sleep 10 &)\n",
+        bash_shell,
+        temp_err_buffer,
+        timeout=60,
+    )
+
+    assert script_executor.timed_out is False
+    assert script_executor.exit_code == 0
+    assert [event.value for event in events if event.kind == ORPHANS] == [
+        script_executor.orphans
+    ]
+    assert [orphan.split()[0] for orphan in script_executor.orphans] == ["sleep"]
+    assert TIMEOUT not in {event.kind for event in events}
+
+    Process.kill_all(script_executor._find_left_processes(), timeout=1)
@@ -0,0 +1,142 @@
+from threading import Barrier, Lock
+from time import sleep
+
+import pytest
+
+from src.output_input_controllers.controllers import TerminalOutputInput
+from src.exceptions import DependencyCycleError, DependencyNotFound
+from src.scheduler import DependencyGraph, Scheduler
+from src.shell import BashShell
+from src.module import Module
+from src.app import main
+
+
+def test_dependencies(dependency_graph):
+    assert dependency_graph.dependencies["update_0.sh"] == set()
+    assert dependency_graph.dependencies["install_xorg_1.sh"] == {"update_0.sh"}
+    assert dependency_graph.dependencies["set_up_xfce_3.sh"] == {"install_xorg_1.sh"}
+
+
+def test_not_annotated_dependencies(dependency_graph):
+    assert dependency_graph.dependencies["reboot_4.sh"] == {
+        "update_0.sh",
+        "install_xorg_1.sh",
+        "install_lightdm_2.sh",
+        "set_up_xfce_3.sh",
+    }
+
+
+def test_not_annotated_module(module):
+    graph = DependencyGraph(module)
+    scripts = list(module)
+    for i, script in enumerate(scripts):
+        number = script.name.find_script_number()
+        assert graph.dependencies[str(script)] == {
+            str(other)
+            for other in scripts[:i]
+            if other.name.find_script_number() < number
+        }
+
+
+def test_dependents(dependency_graph):
+    assert dependency_graph.dependents["update_0.sh"] == {
+        "install_xorg_1.sh",
+        "install_lightdm_2.sh",
+        "reboot_4.sh",
+    }
+
+
+def test_cycle(cyclic_scripts_dir):
+    with pytest.raises(DependencyCycleError):
+        DependencyGraph(Module(cyclic_scripts_dir))
+
+
+def test_dependency_not_found(annotated_scripts_dir):
+    annotated_scripts_dir.joinpath("extra_5.sh").write_text(
+        "#!/bin/bash\n# needs: missing_0.sh\n"
+    )
+    with pytest.raises(DependencyNotFound):
+        DependencyGraph(Module(annotated_scripts_dir))
+
+
+def test_scheduler_order(dependency_graph):
+    executed = []
+
+    Scheduler(dependency_graph, 3).run(lambda script: executed.append(str(script)))
+
+    for name, dependencies in dependency_graph.dependencies.items():
+        for dependency in dependencies:
+            assert executed.index(dependency) < executed.index(name)
+
+
+def test_scheduler_concurrency(dependency_graph):
+    # xorg and lightdm are ready at the same time
+    barrier = Barrier(2, timeout=5)
+
+    def execute(script):
+        if str(script) in ("install_xorg_1.sh", "install_lightdm_2.sh"):
+            barrier.wait()
+
+    Scheduler(dependency_graph, 2).run(execute)
+
+
+def test_scheduler_jobs_limit(dependency_graph):
+    lock, running, peak = Lock(), [0], [0]
+
+    def execute(_script):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        sleep(0.01)
+        with lock:
+            running[0] -= 1
+
+    Scheduler(dependency_graph, 1).run(execute)
+
+    assert peak[0] == 1
+
+
+def test_scheduler_errors(dependency_graph):
+    def execute(_script):
+        raise SystemExit(-1)
+
+    with pytest.raises(SystemExit):
+        Scheduler(dependency_graph, 2).run(execute)
+
+
+def test_main_jobs(tmp_path, monkeypatch, capfd):
+    monkeypatch.setattr(TerminalOutputInput, "scripts_statuses", [])
+    scripts_dir = tmp_path.joinpath("scripts")
+    scripts_dir.mkdir()
+    # Scripts ready at the same time wait for each other in theirs own shells
+    wait_for = (
+        "for i in $(seq 20); do [ -e {0} ] && break; sleep 0.1; done\n"
+        + "[ -e {0} ] || exit 1\n"
+    )
+    scripts = {
+        "base_0.sh": ("", "touch base\n"),
+        "left_1.sh": (
+            "# needs: base_0.sh\n",
+            "touch left\n" + wait_for.format("right"),
+        ),
+        "right_2.sh": (
+            "# needs: base_0.sh\n",
+            "touch right\n" + wait_for.format("left"),
+        ),
+        "last_3.sh": ("# needs: left_1.sh, right_2.sh\n", "touch last\n"),
+    }
+    for name, (header, body) in scripts.items():
+        scripts_dir.joinpath(name).write_text(
+            f"#!/bin/bash\n# interactive: yes\n{header}\ncd {tmp_path}\n{body}"
+        )
+
+    main(BashShell(), scripts_dir, TerminalOutputInput(), tmp_path, jobs=2)
+
+    # Last script waited for both scripts it needs
+    assert TerminalOutputInput.scripts_statuses[-1] == {"last_3.sh": 0}
+    assert {
+        name: exit_code
+        for status in TerminalOutputInput.scripts_statuses
+        for name, exit_code in status.items()
+    } == {"base_0.sh": 0, "left_1.sh": 0, "right_2.sh": 0, "last_3.sh": 0}
+    assert tmp_path.joinpath("last").exists()
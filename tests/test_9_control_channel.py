@@ -0,0 +1,45 @@
+import os
+
+from src.control_channel import ControlChannel, ControlRecord
+
+
+def write(channel, record: str):
+    with open(channel.path, "w") as fifo:
+        fifo.write(record)
+
+
+def test_parse_record():
+    assert ControlChannel.parse_record("PID 123 1650000000.5") == ControlRecord(
+        "PID", 123, 1650000000.5
+    )
+    assert ControlChannel.parse_record("EXIT 1 1650000000,5").timestamp == 1650000000.5
+    assert ControlChannel.parse_record("EXIT 1").timestamp is None
+
+
+def test_wait_for(control_channel):
+    write(control_channel, "PID 123 1.0\nEXIT 0 2.0\n")
+    assert control_channel.wait_for(ControlChannel.EXIT_CODE, 1).value == 0
+    assert control_channel.wait_for(ControlChannel.PID, 1).value == 123
+
+
+def test_wait_for_partial_record(control_channel):
+    write(control_channel, "PID 12")
+    assert control_channel.wait_for(ControlChannel.PID, 0.1) is None
+    write(control_channel, "3 1.0\n")
+    assert control_channel.wait_for(ControlChannel.PID, 0.1).value == 123
+
+
+def test_wait_for_timeout(control_channel):
+    assert control_channel.wait_for(ControlChannel.PID, 0.1) is None
+
+
+def test_clear(control_channel):
+    write(control_channel, "PID 123 1.0\n")
+    control_channel.clear()
+    assert control_channel.wait_for(ControlChannel.PID, 0.1) is None
+
+
+def test_close(control_channel):
+    directory = control_channel.directory
+    control_channel.close()
+    assert os.path.exists(directory) is False